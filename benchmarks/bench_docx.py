@@ -0,0 +1,98 @@
+"""Benchmark the streaming DOCX extractor against the python-docx object model
+
+Each extraction runs in a fresh process so peak RSS reflects that path alone.
+
+Usage:
+    python benchmarks/bench_docx.py
+"""
+import io
+import os
+import resource
+import sys
+import time
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")  # No upstream calls are made
+
+from docx import Document  # noqa: E402
+
+from utils.file_parser import FileParser  # noqa: E402
+
+SENTENCE = "Students read the syllabus carefully before the first seminar of the term. "
+
+
+def make_docx(paragraphs: int) -> bytes:
+    """Build a DOCX with the given number of paragraphs and a table every 50"""
+    doc = Document()
+    for i in range(paragraphs):
+        doc.add_paragraph(SENTENCE * 4)
+        if i % 50 == 49:
+            table = doc.add_table(rows=5, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = "Week 1"
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def extract_python_docx(data: bytes) -> str:
+    """The python-docx extraction used before the streaming extractor"""
+    doc = Document(io.BytesIO(data))
+    return "\n\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+
+def extract_streaming(data: bytes) -> str:
+    return FileParser.parse_docx(io.BytesIO(data))
+
+
+def reset_peak_rss() -> None:
+    """Reset the kernel's peak RSS counter for this process (Linux)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_kb() -> int:
+    """Peak RSS of this process in KB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(name: str, data: bytes) -> tuple:
+    """Run one extraction and return (milliseconds, peak RSS growth in MB, characters)"""
+    extract = {"python-docx": extract_python_docx, "streaming": extract_streaming}[name]
+    reset_peak_rss()
+    baseline = peak_rss_kb()
+    start = time.perf_counter()
+    text = extract(data)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms, (peak_rss_kb() - baseline) / 1024, len(text)
+
+
+def main():
+    ctx = get_context("spawn")
+    print(f"{'paragraphs':>10} {'size (KB)':>10} {'path':>12} {'time (ms)':>10} {'RSS +MB':>8} {'chars':>9}")
+    for paragraphs in (1_000, 10_000, 50_000):
+        data = make_docx(paragraphs)
+        for name in ("python-docx", "streaming"):
+            with ctx.Pool(1) as pool:
+                elapsed_ms, rss_mb, chars = pool.apply(measure, (name, data))
+            print(
+                f"{paragraphs:>10} {len(data) // 1024:>10} {name:>12} "
+                f"{elapsed_ms:>10.1f} {rss_mb:>8.1f} {chars:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark the single-pass statistics engine against the previous implementation
+
+Usage:
+    python benchmarks/bench_statistics.py
+"""
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")  # No upstream calls are made
+
+from services.simplification.readability import analyze_text  # noqa: E402
+
+VOCABULARY = (
+    "the a of and to in is was for on that with as it by this be are from "
+    "information development government education environment community "
+    "understanding responsibility organization particularly significant "
+    "dyslexia reading students teachers learning simple clear short words"
+).split()
+
+
+def legacy_statistics(text: str) -> tuple:
+    """The split-based statistics used before the single-pass engine"""
+    word_count = len(text.split())
+    sentences = [s.strip() for s in text.replace('!', '.').replace('?', '.').split('.') if s.strip()]
+    avg = sum(len(s.split()) for s in sentences) / len(sentences) if sentences else 0.0
+    return word_count, avg
+
+
+def make_text(chars: int, seed: int = 7) -> str:
+    """Generate prose of roughly the given length"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < chars:
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(6, 24)))
+        sentence = sentence.capitalize() + rng.choice([".", ".", ".", "?", "!"])
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)[:chars]
+
+
+def main():
+    print(f"{'chars':>8} {'legacy (ms)':>12} {'single-pass (ms)':>17} {'ratio':>7}")
+    for chars in (1_000, 10_000, 100_000):
+        text = make_text(chars)
+        runs = max(5, 200_000 // chars)
+        legacy = min(timeit.repeat(lambda: legacy_statistics(text), number=runs, repeat=9)) / runs
+        single = min(timeit.repeat(lambda: analyze_text(text), number=runs, repeat=9)) / runs
+        print(f"{chars:>8} {legacy * 1000:>12.3f} {single * 1000:>17.3f} {single / legacy:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
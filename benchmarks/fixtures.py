@@ -0,0 +1,102 @@
+"""Generated inputs for the benchmark suite
+
+Everything is deterministic for a given size, so runs on the same machine
+are comparable without checking large files into the repository.
+"""
+import math
+import random
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_docx import make_docx  # noqa: E402,F401
+
+VOCABULARY = (
+    "the a of and to in is was for on that with as it by this be are from "
+    "information development government education environment community "
+    "understanding responsibility organization particularly significant "
+    "dyslexia reading students teachers learning simple clear short words "
+    "well-known self-assessment teacher's co-operation 2024 3.5"
+).split()
+
+PUNCTUATION = [".", ".", ".", ",", ",", "?", "!", ";", ":", "..."]
+
+# 16-bit mono PCM as produced by the TTS model
+SAMPLE_RATE = 24000
+BYTES_PER_SAMPLE = 2
+
+
+def make_words(words: int, seed: int = 7) -> str:
+    """Prose of exactly the given number of words, in paragraphs of about 120 words"""
+    rng = random.Random(seed)
+    paragraphs, sentence, paragraph = [], [], []
+    for _ in range(words):
+        sentence.append(rng.choice(VOCABULARY))
+        if len(sentence) >= rng.randint(6, 24):
+            sentence[0] = sentence[0].capitalize()
+            paragraph.append(" ".join(sentence) + rng.choice(PUNCTUATION))
+            sentence = []
+            if sum(len(s.split()) for s in paragraph) >= 120:
+                paragraphs.append(" ".join(paragraph))
+                paragraph = []
+    if sentence:
+        paragraph.append(" ".join(sentence) + ".")
+    if paragraph:
+        paragraphs.append(" ".join(paragraph))
+    return "\n\n".join(paragraphs)
+
+
+def make_pcm(seconds: float) -> bytes:
+    """Mono 24 kHz 16-bit PCM of a tone with a slow amplitude envelope"""
+    # One second is built sample by sample and repeated to keep generation fast
+    second = bytearray()
+    for i in range(SAMPLE_RATE):
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * i / SAMPLE_RATE)
+        second += struct.pack("<h", int(12000 * envelope * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)))
+    whole, fraction = divmod(seconds, 1)
+    return bytes(second) * int(whole) + bytes(second[:int(fraction * SAMPLE_RATE) * BYTES_PER_SAMPLE])
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 7) -> bytes:
+    """A PDF with numbered pages of Helvetica text, a running header and a page number"""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(pages):
+        lines = ["Lexy Benchmark Report"]
+        lines += [
+            " ".join(rng.choice(VOCABULARY[:60]) for _ in range(12)) + "."
+            for _ in range(lines_per_page)
+        ]
+        lines.append(str(page + 1))
+        commands = ["BT /F1 10 Tf 14 TL 72 760 Td"]
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            commands.append(f"({escaped}) Tj T*")
+        commands.append("ET")
+        stream = " ".join(commands).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+    
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
@@ -0,0 +1,278 @@
+"""Open-loop load generator for the API, with latency percentiles per route
+
+Requests are started on a fixed schedule (or a Poisson process) at the
+target rate whether or not earlier ones have finished, and latency is
+measured from each request's scheduled start, so queueing inside the
+server shows up in the percentiles instead of slowing the generator down.
+
+Against a running server:
+    python benchmarks/loadgen.py --url http://localhost:8000 --rps 20 --duration 60
+
+In process, with the fake upstream (no API key or quota needed):
+    python benchmarks/loadgen.py --in-process --rps 50 --duration 30 --poisson
+    FAKE_UPSTREAM_LATENCY=lognormal:1500,0.6 FAKE_UPSTREAM_RATE_LIMIT_RATE=0.05 \\
+        python benchmarks/loadgen.py --in-process --mix simplify_text=3,tts_generate=1
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from fixtures import make_pdf  # noqa: E402
+
+# Dense enough that the readability fast path still calls the upstream model
+COMPLEX_TEXT = (
+    "The municipality's comprehensive infrastructure development initiative necessitates "
+    "substantial intergovernmental collaboration, particularly regarding environmental "
+    "sustainability assessments and the prioritization of transportation investments. "
+)
+
+_request_ids = itertools.count(1)
+
+
+def _text(repeats: int) -> str:
+    """Complex text, numbered so the result cache does not hide upstream latency"""
+    return f"Case {next(_request_ids)}. " + COMPLEX_TEXT * repeats
+
+
+# Requests are (method, path, keyword arguments for httpx)
+Scenario = Callable[[], tuple]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "health": lambda: ("GET", "/health", {}),
+    "modes": lambda: ("GET", "/simplify/modes", {}),
+    "simplify_text": lambda: ("POST", "/simplify/text", {
+        "json": {"text": _text(4), "mode": "general", "intensity": "medium"}
+    }),
+    "simplify_file": lambda: ("POST", "/simplify/file", {
+        "files": {"file": ("report.txt", _text(20).encode(), "text/plain")}
+    }),
+    "simplify_pdf": lambda: ("POST", "/simplify/file", {
+        "files": {"file": ("report.pdf", _pdf(), "application/pdf")}
+    }),
+    "larf_annotate": lambda: ("POST", "/larf/annotate", {
+        "json": {"text": _text(4)}
+    }),
+    "tts_generate": lambda: ("POST", "/tts/generate", {
+        "json": {"text": _text(2)}
+    }),
+    "tts_simplify": lambda: ("POST", "/tts/simplify", {
+        "json": {"text": _text(2)}
+    }),
+}
+
+DEFAULT_MIX = "health=1,modes=1,simplify_text=4,simplify_file=1,simplify_pdf=1,larf_annotate=2,tts_generate=2,tts_simplify=1"
+
+_pdf_bytes: Optional[bytes] = None
+
+
+def _pdf() -> bytes:
+    global _pdf_bytes
+    if _pdf_bytes is None:
+        _pdf_bytes = make_pdf(5)
+    return _pdf_bytes
+
+
+@dataclass
+class Result:
+    scenario: str
+    status: int  # 0 when the request failed without a response
+    latency_s: float
+    error: Optional[str] = None
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Scenario weights from "name=weight,..." ("name" alone has weight 1)"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.strip().partition("=")
+        if not name:
+            continue
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}, expected one of {sorted(SCENARIOS)}")
+        mix[name] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one scenario with a positive weight")
+    return mix
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted values"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(results: List[Result], elapsed_s: float) -> dict:
+    """Latency percentiles, throughput and status counts, overall and per scenario"""
+    def stats(group: List[Result]) -> dict:
+        latencies_ms = [r.latency_s * 1000 for r in group]
+        ok = [r for r in group if 200 <= r.status < 400]
+        return {
+            "requests": len(group),
+            "throughput_rps": round(len(ok) / elapsed_s, 2) if elapsed_s else 0.0,
+            "error_rate": round(1 - len(ok) / len(group), 4),
+            "p50_ms": round(percentile(latencies_ms, 50), 2),
+            "p95_ms": round(percentile(latencies_ms, 95), 2),
+            "p99_ms": round(percentile(latencies_ms, 99), 2),
+            "mean_ms": round(statistics.fmean(latencies_ms), 2),
+            "max_ms": round(max(latencies_ms), 2),
+            "status": dict(sorted(Counter(str(r.status) for r in group).items())),
+            "errors": dict(Counter(r.error for r in group if r.error).most_common(5))
+        }
+    
+    by_scenario: Dict[str, List[Result]] = defaultdict(list)
+    for result in results:
+        by_scenario[result.scenario].append(result)
+    return {
+        "elapsed_s": round(elapsed_s, 2),
+        "overall": stats(results) if results else {},
+        "scenarios": {name: stats(group) for name, group in sorted(by_scenario.items())}
+    }
+
+
+async def run_load(
+    client,
+    mix: Dict[str, float],
+    rps: float,
+    duration: float,
+    poisson: bool = False,
+    max_in_flight: int = 1000,
+    seed: Optional[int] = None
+) -> dict:
+    """
+    Drive the client at rps for duration seconds and summarize the results.
+    
+    Requests over max_in_flight are not sent and count as status 0 with
+    the error "client overloaded", so a saturated server shows up as errors
+    rather than as a generator that quietly falls behind.
+    """
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    results: List[Result] = []
+    in_flight = set()
+    
+    async def fire(name: str, scheduled: float):
+        method, path, kwargs = SCENARIOS[name]()
+        try:
+            response = await client.request(method, path, **kwargs)
+            await response.aread()
+            error = None if response.status_code < 400 else response.text[:120]
+            results.append(Result(name, response.status_code, time.perf_counter() - scheduled, error))
+        except Exception as e:
+            results.append(Result(name, 0, time.perf_counter() - scheduled, f"{type(e).__name__}: {e}"[:120]))
+    
+    start = time.perf_counter()
+    next_at = start
+    while next_at - start < duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = rng.choices(names, weights)[0]
+        if len(in_flight) >= max_in_flight:
+            results.append(Result(name, 0, 0.0, "client overloaded"))
+        else:
+            task = asyncio.create_task(fire(name, next_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        next_at += rng.expovariate(rps) if poisson else 1 / rps
+    if in_flight:
+        await asyncio.wait(in_flight)
+    return summarize(results, time.perf_counter() - start)
+
+
+def print_report(report: dict) -> None:
+    print(f"{'scenario':<16} {'reqs':>6} {'ok/s':>8} {'err%':>6} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}  status")
+    rows = list(report["scenarios"].items()) + [("overall", report["overall"])]
+    for name, row in rows:
+        if not row:
+            continue
+        status = " ".join(f"{code}:{count}" for code, count in row["status"].items())
+        print(
+            f"{name:<16} {row['requests']:>6} {row['throughput_rps']:>8.2f} {row['error_rate']:>6.1%} "
+            f"{row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f} {row['p99_ms']:>10.1f}  {status}"
+        )
+    errors = Counter()
+    for row in report["scenarios"].values():
+        errors.update(row["errors"])
+    for error, count in errors.most_common(5):
+        print(f"  {count} x {error}")
+
+
+@contextlib.asynccontextmanager
+async def open_client(url: Optional[str], timeout: float):
+    """An httpx client for a server URL, or for the app itself with the fake upstream"""
+    import httpx
+    
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+            yield client
+        return
+    
+    os.environ.setdefault("GEMINI_API_KEY", "loadtest")
+    sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+    from core.config import settings
+    from main import app
+    
+    # Settings may already be loaded by the fixtures, so switch the backend directly
+    settings.upstream_backend = "fake"
+    
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=timeout) as client:
+            yield client
+
+
+async def _main(args) -> dict:
+    mix = parse_mix(args.mix)
+    async with open_client(args.url, args.timeout) as client:
+        return await run_load(client, mix, args.rps, args.duration, args.poisson, args.max_in_flight, args.seed)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running server")
+    target.add_argument("--in-process", action="store_true", help="run the app in this process with UPSTREAM_BACKEND=fake")
+    parser.add_argument("--rps", type=float, default=10.0, help="target request rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to send requests for")
+    parser.add_argument("--poisson", action="store_true", help="exponential gaps between requests instead of a fixed rate")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario weights, from {', '.join(SCENARIOS)}")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, help="seed for the scenario choice and arrival times")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    
+    report = asyncio.run(_main(args))
+    report["config"] = {
+        "target": args.url or "in-process",
+        "rps": args.rps,
+        "duration_s": args.duration,
+        "poisson": args.poisson,
+        "mix": parse_mix(args.mix)
+    }
+    print_report(report)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"wrote {args.output}")
+    return 0 if report["overall"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""CPU and allocation benchmarks for the local hot paths, with JSON baselines
+
+Each case is timed with repeated runs (best and median per operation) and
+then run once more under tracemalloc for its peak and retained allocation.
+Results are written as JSON; two result files can be compared to spot
+regressions.
+
+Usage:
+    python benchmarks/suite.py run                        # all cases, results/<timestamp>.json
+    python benchmarks/suite.py run --quick -k timestamps  # smallest sizes, matching cases
+    python benchmarks/suite.py run --save-baseline main   # also write baselines/main.json
+    python benchmarks/suite.py run --compare main         # run and compare with a baseline
+    python benchmarks/suite.py compare main results/20260101-120000.json --fail-on-regression
+"""
+import argparse
+import base64
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")  # No upstream calls are made
+
+from fixtures import make_docx, make_pcm, make_pdf, make_words  # noqa: E402
+
+BASELINE_DIR = BENCH_DIR / "baselines"
+RESULTS_DIR = BENCH_DIR / "results"
+
+# Each timed repeat runs the case for at least this long
+MIN_REPEAT_SECONDS = 0.2
+
+# Relative change in best time or peak allocation reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+TEXT_WORDS = (1_000, 10_000, 100_000)
+PDF_PAGES = (50, 300)
+DOCX_PARAGRAPHS = (1_000, 10_000)
+AUDIO_SECONDS = (60, 600)
+
+
+@dataclass
+class Case:
+    """A benchmark: build builds the fixture and returns the call to time"""
+    name: str
+    unit: str
+    units: float
+    build: Callable[[], Callable[[], object]]
+
+
+def _timestamps_case(words: int) -> Callable[[], object]:
+    from services.tts.timestamp import calculate_timestamps
+    
+    text = make_words(words)
+    duration = words / 2.5
+    return lambda: calculate_timestamps(text, duration)
+
+
+def _tokenize_case(words: int) -> Callable[[], object]:
+    from services.tts.timestamp import tokenize_text
+    
+    text = make_words(words)
+    return lambda: tokenize_text(text)
+
+
+def _statistics_case(words: int) -> Callable[[], object]:
+    from services.simplification import SimplificationService
+    
+    service = SimplificationService()
+    original = make_words(words, seed=7)
+    simplified = make_words(words, seed=11)
+    return lambda: service._calculate_statistics(original, simplified)
+
+
+def _prompt_case(words: int, cold: bool) -> Callable[[], object]:
+    from api.schemas.common import SimplificationIntensity, SimplificationMode
+    from services.simplification.prompts import _render_system_prompt, get_simplification_prompt
+    
+    text = make_words(words)
+    
+    def render():
+        if cold:
+            _render_system_prompt.cache_clear()
+        return get_simplification_prompt(text, SimplificationMode.ACADEMIC, SimplificationIntensity.HEAVY, 12, {})
+    return render
+
+
+def _wav_case(seconds: int) -> Callable[[], object]:
+    from services.tts import TTSService
+    
+    service = TTSService()
+    pcm = make_pcm(seconds)
+    return lambda: service._wrap_in_wav(pcm, 24000)
+
+
+def _base64_case(seconds: int) -> Callable[[], object]:
+    from services.tts import TTSService
+    
+    wav = TTSService()._wrap_in_wav(make_pcm(seconds), 24000)
+    return lambda: base64.b64encode(wav).decode("utf-8")
+
+
+def _pdf_case(pages: int) -> Callable[[], object]:
+    from utils.file_parser import FileParser
+    
+    data = make_pdf(pages)
+    return lambda: FileParser.parse_pdf(io.BytesIO(data))
+
+
+def _docx_case(paragraphs: int) -> Callable[[], object]:
+    from utils.file_parser import FileParser
+    
+    data = make_docx(paragraphs)
+    return lambda: FileParser.parse_docx(io.BytesIO(data))
+
+
+def build_cases(quick: bool = False) -> List[Case]:
+    """All benchmark cases; quick keeps the smallest size of each"""
+    def sizes(values):
+        return values[:1] if quick else values
+    
+    cases = []
+    for words in sizes(TEXT_WORDS):
+        cases += [
+            Case(f"timestamps.calculate[{words}w]", "words", words, lambda w=words: _timestamps_case(w)),
+            Case(f"timestamps.tokenize[{words}w]", "words", words, lambda w=words: _tokenize_case(w)),
+            Case(f"simplification.statistics[{words}w]", "words", 2 * words, lambda w=words: _statistics_case(w)),
+            Case(f"prompt.simplification[{words}w]", "words", words, lambda w=words: _prompt_case(w, cold=False)),
+        ]
+    cases.append(Case("prompt.render_cold", "prompts", 1, lambda: _prompt_case(100, cold=True)))
+    for seconds in sizes(AUDIO_SECONDS):
+        cases += [
+            Case(f"tts.wrap_wav[{seconds}s]", "audio_s", seconds, lambda s=seconds: _wav_case(s)),
+            Case(f"tts.base64[{seconds}s]", "audio_s", seconds, lambda s=seconds: _base64_case(s)),
+        ]
+    for pages in sizes(PDF_PAGES):
+        cases.append(Case(f"parse.pdf[{pages}p]", "pages", pages, lambda p=pages: _pdf_case(p)))
+    for paragraphs in sizes(DOCX_PARAGRAPHS):
+        cases.append(Case(f"parse.docx[{paragraphs}par]", "paragraphs", paragraphs, lambda p=paragraphs: _docx_case(p)))
+    return cases
+
+
+def time_call(fn: Callable[[], object], repeats: int) -> List[float]:
+    """Seconds per call for each repeat, with enough calls per repeat to be measurable"""
+    start = time.perf_counter()
+    fn()  # Warm-up, also sizes the repeat
+    once = time.perf_counter() - start
+    number = max(1, int(MIN_REPEAT_SECONDS / max(once, 1e-9)))
+    
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def measure_allocations(fn: Callable[[], object]) -> Dict[str, int]:
+    """Peak and retained Python allocations of one call"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_alloc_bytes": peak - before, "result_bytes": after - before}
+
+
+def run_case(case: Case, repeats: int) -> dict:
+    fn = case.build()
+    timings = time_call(fn, repeats)
+    median = statistics.median(timings)
+    return {
+        "unit": case.unit,
+        "units": case.units,
+        "repeats": repeats,
+        "min_ms": round(min(timings) * 1000, 6),
+        "median_ms": round(median * 1000, 6),
+        "throughput_per_s": round(case.units / median, 2),
+        **measure_allocations(fn)
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(cases: List[Case], repeats: int) -> dict:
+    results = {}
+    print(f"{'case':<38} {'median (ms)':>12} {'throughput':>24} {'peak alloc (MB)':>16}")
+    for case in cases:
+        result = results[case.name] = run_case(case, repeats)
+        throughput = f"{result['throughput_per_s']:.0f} {case.unit}/s"
+        print(
+            f"{case.name:<38} {result['median_ms']:>12.3f} {throughput:>24} "
+            f"{result['peak_alloc_bytes'] / 1024 / 1024:>16.2f}"
+        )
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results
+    }
+
+
+def resolve(name_or_path: str) -> Path:
+    """A result file path, or the name of a saved baseline"""
+    path = Path(name_or_path)
+    if path.exists():
+        return path
+    return BASELINE_DIR / f"{name_or_path}.json"
+
+
+def _change(base: float, new: float) -> float:
+    return (new - base) / base if base else 0.0
+
+
+def compare(base: dict, new: dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Print a comparison of two result sets.
+    
+    Times are compared on the best repeat, which is less affected by
+    other load on the machine than the median.
+    
+    Returns:
+        Names of cases whose best time or peak allocation grew by more than threshold
+    """
+    print(f"base: {base.get('git_commit')} {base['created_at']}   new: {new.get('git_commit')} {new['created_at']}")
+    if base.get("platform") != new.get("platform") or base.get("python") != new.get("python"):
+        print("warning: results come from different machines or Python versions")
+    print(f"{'case':<38} {'base (ms)':>11} {'new (ms)':>11} {'time':>8} {'alloc':>8}  verdict")
+    
+    regressions = []
+    for name, result in new["results"].items():
+        previous = base["results"].get(name)
+        if previous is None:
+            print(f"{name:<38} {'-':>11} {result['min_ms']:>11.3f} {'':>8} {'':>8}  new")
+            continue
+        time_change = _change(previous["min_ms"], result["min_ms"])
+        alloc_change = _change(previous["peak_alloc_bytes"], result["peak_alloc_bytes"])
+        if time_change > threshold or alloc_change > threshold:
+            verdict = "REGRESSION"
+            regressions.append(name)
+        elif time_change < -threshold:
+            verdict = "faster"
+        else:
+            verdict = "~"
+        print(
+            f"{name:<38} {previous['min_ms']:>11.3f} {result['min_ms']:>11.3f} "
+            f"{time_change:>+8.1%} {alloc_change:>+8.1%}  {verdict}"
+        )
+    for name in base["results"].keys() - new["results"].keys():
+        print(f"{name:<38} {base['results'][name]['min_ms']:>11.3f} {'-':>11} {'':>8} {'':>8}  not run")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("-k", dest="pattern", help="only cases whose name contains this")
+    run.add_argument("--quick", action="store_true", help="smallest fixture size of each case")
+    run.add_argument("--repeats", type=int, default=5)
+    run.add_argument("--output", type=Path, help="result file (default: results/<timestamp>.json)")
+    run.add_argument("--save-baseline", metavar="NAME", help="also save as baselines/NAME.json")
+    run.add_argument("--compare", metavar="BASELINE", help="compare with a baseline name or result file")
+    
+    report = commands.add_parser("compare", help="compare two result files or baselines")
+    report.add_argument("base")
+    report.add_argument("new")
+    
+    for command in (run, report):
+        command.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+        command.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+    
+    if args.command == "run":
+        cases = [case for case in build_cases(args.quick) if not args.pattern or args.pattern in case.name]
+        new = run_suite(cases, args.repeats)
+        
+        output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+        targets = [output] + ([BASELINE_DIR / f"{args.save_baseline}.json"] if args.save_baseline else [])
+        for target in targets:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(json.dumps(new, indent=2) + "\n")
+            print(f"wrote {target}")
+        if not args.compare:
+            return 0
+        base = json.loads(resolve(args.compare).read_text())
+    else:
+        base = json.loads(resolve(args.base).read_text())
+        new = json.loads(resolve(args.new).read_text())
+    
+    regressions = compare(base, new, args.threshold)
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
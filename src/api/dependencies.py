@@ -1,30 +1,124 @@
 """Dependency injection for API routes"""
+import asyncio
+import contextlib
+import logging
+import threading
+from typing import Dict, Optional, Type, TypeVar
+
+from fastapi import Header
+
+from core.config import settings
+from core.exceptions import AdminAccessException
+from core.profiling import is_admin
+from services.client import close_client, get_client, upstream_backend, warm_up_client
 from services.simplification import SimplificationService
+from services.simplification.service import SIMPLIFICATION_MODEL
 from services.tts import TTSService
 from services.larf import LarfService
-# Global service instances (lazy loaded)
-_simplification_service = None
-_tts_service = None
-_larf_service = None
+from utils.file_parser import shutdown_parse_pool
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SERVICE_TYPES = (SimplificationService, TTSService, LarfService)
+
+
+class ServiceRegistry:
+    """
+    Process-wide service instances managed by the application lifespan.
+    
+    Services are built at startup so the first request doesn't pay for
+    construction, and resources they share (the upstream client and the
+    parse pool) are released at shutdown. Outside a lifespan (tests,
+    scripts) services are still created on first use. Creation is guarded
+    by a lock because sync dependencies run in worker threads.
+    """
+    
+    def __init__(self):
+        self._services: Dict[type, object] = {}
+        self._lock = threading.Lock()
+        self._warm_up_task: Optional[asyncio.Task] = None
+    
+    def get(self, service_type: Type[T]) -> T:
+        """Get a service, building it on first use"""
+        service = self._services.get(service_type)
+        if service is None:
+            with self._lock:
+                service = self._services.get(service_type)
+                if service is None:
+                    service = service_type()
+                    self._services[service_type] = service
+        return service
+    
+    async def startup(self, warm_up: bool = True) -> None:
+        """
+        Build every service and start warming them in the background.
+        
+        Warm-up runs as a task, so the app starts serving (health checks
+        included) without waiting for the upstream SDK import or a round
+        trip; requests arriving before it finishes warm up on first use.
+        
+        Args:
+            warm_up: Build the shared client, pre-render prompt templates
+                and open the upstream connection
+        """
+        upstream_backend()  # Fail fast on a misconfigured backend
+        for service_type in SERVICE_TYPES:
+            self.get(service_type)
+        
+        if warm_up:
+            self._warm_up_task = asyncio.create_task(self._warm_up())
+    
+    async def _warm_up(self) -> None:
+        try:
+            rendered = sum(
+                service.prerender_prompts()
+                for service in self._services.values()
+                if hasattr(service, "prerender_prompts")
+            )
+            # Importing the upstream SDK takes a while; keep it off the event loop
+            await asyncio.to_thread(get_client)
+            connected = await warm_up_client(
+                SIMPLIFICATION_MODEL, timeout=settings.warm_up_timeout_seconds
+            )
+            logger.info("Warm-up rendered %s prompts, upstream connected: %s", rendered, connected)
+        except Exception as e:
+            logger.warning("Warm-up failed: %s", e)
+    
+    async def shutdown(self) -> None:
+        """Stop warming up, then close the shared client and the parse pool, forgetting all services"""
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._warm_up_task
+            self._warm_up_task = None
+        with self._lock:
+            self._services.clear()
+        await close_client()
+        await asyncio.to_thread(shutdown_parse_pool)
+
+
+# Global registry instance
+registry = ServiceRegistry()
+
 
 def get_simplification_service() -> SimplificationService:
-    """Get or create SimplificationService instance"""
-    global _simplification_service
-    if _simplification_service is None:
-        _simplification_service = SimplificationService()
-    return _simplification_service
+    """Get the SimplificationService instance"""
+    return registry.get(SimplificationService)
 
 
 def get_tts_service() -> TTSService:
-    """Get or create TTSService instance"""
-    global _tts_service
-    if _tts_service is None:
-        _tts_service = TTSService()
-    return _tts_service
+    """Get the TTSService instance"""
+    return registry.get(TTSService)
+
 
 def get_larf_service() -> LarfService:
-    """Get or create LarfService instance"""
-    global _larf_service
-    if _larf_service is None:
-        _larf_service = LarfService()
-    return _larf_service
\ No newline at end of file
+    """Get the LarfService instance"""
+    return registry.get(LarfService)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests without the configured admin token"""
+    if not is_admin(x_admin_token):
+        raise AdminAccessException()
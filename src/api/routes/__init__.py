@@ -2,4 +2,6 @@
 from .simplify import router as simplify_router
 from .tts import router as tts_router
 from .larf import router as larf_router
-__all__ = ["simplify_router", "tts_router", "larf_router"]  
\ No newline at end of file
+from .metrics import router as metrics_router
+from .admin import router as admin_router
+__all__ = ["simplify_router", "tts_router", "larf_router", "metrics_router", "admin_router"]  
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Admin API routes"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+
+from api.dependencies import require_admin
+from api.schemas import ProfileInfo, ProfilesResponse
+from core.exceptions import NotFoundException
+from core.middleware import TimedRoute
+from core.profiling import profile_store
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    route_class=TimedRoute,
+    dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("/profiles", response_model=ProfilesResponse)
+async def list_profiles():
+    """
+    List recent request profiles, newest first.
+    
+    Profile a request by sending it with **X-Admin-Token** and
+    **X-Profile: cprofile** (or **sample**); its id is returned in the
+    X-Profile-Id response header.
+    """
+    return ProfilesResponse(
+        profiles=[ProfileInfo(**record.summary()) for record in profile_store.list()]
+    )
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """
+    Download a profile as an attachment.
+    
+    cProfile output opens with `python -m pstats` or snakeviz; sampled
+    stacks are in the collapsed format read by speedscope and flamegraph.pl.
+    """
+    record = profile_store.get(profile_id)
+    if record is None:
+        raise NotFoundException("Profile", profile_id)
+    
+    return Response(
+        content=record.data,
+        media_type=record.content_type,
+        headers={"Content-Disposition": f'attachment; filename="{record.filename}"'}
+    )
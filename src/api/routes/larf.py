@@ -1,17 +1,19 @@
 import logging
-import io
 from typing import Optional
 from fastapi import APIRouter, Depends, UploadFile, File, Query
 
 from api.schemas.larf import LarfAnnotateRequest, LarfResponse
+from api.schemas.common import DocumentInfo, ChapterInfo
 from api.dependencies import get_larf_service
 from services.larf.service import LarfService
-from core.exceptions import validate_text_length
-from utils import FileParser, validate_uploaded_file
+from core.exceptions import validate_text_length, MAX_TEXT_LENGTH
+from core.admission import admission, estimate_request_mb
+from core.middleware import TimedRoute
+from utils import validate_uploaded_file, parse_page_ranges, stream_upload
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/larf", tags=["LARF (Let AI Read First)"])
+router = APIRouter(prefix="/larf", tags=["LARF (Let AI Read First)"], route_class=TimedRoute)
 
 @router.post("/annotate", response_model=LarfResponse)
 async def annotate_text(
@@ -23,10 +25,11 @@ async def annotate_text(
     """
     validate_text_length(request.text)
     
-    annotated_html, processing_time = await service.annotate_text(
-        text=request.text,
-        custom_focus=request.custom_focus
-    )
+    async with admission.admit(estimate_request_mb(text_chars=len(request.text)), "larf"):
+        annotated_html, processing_time = await service.annotate_text(
+            text=request.text,
+            custom_focus=request.custom_focus
+        )
     
     return LarfResponse(
         original_text=request.text,
@@ -36,30 +39,56 @@ async def annotate_text(
 
 @router.post("/file", response_model=LarfResponse)
 async def annotate_file(
-    file: UploadFile = File(..., description="File to annotate (TXT, PDF, DOCX, max 10MB)"),
+    file: UploadFile = File(..., description="File to annotate (TXT, PDF, DOCX, HTML, Markdown, EPUB, max 10MB)"),
     custom_focus: Optional[str] = Query(
         None, 
         description="Optional custom focus (e.g., 'names', 'dates')"
     ),
+    pages: Optional[str] = Query(
+        None,
+        description="Optional PDF page selection (e.g., '1-5,8')"
+    ),
     service: LarfService = Depends(get_larf_service)
 ):
     """
     Upload a file and annotate its content for dyslexia support.
     
-    - **file**: The document file (PDF, DOCX, or TXT).
+    - **file**: The document file (PDF, DOCX, TXT, HTML, Markdown or EPUB).
     - **custom_focus**: Optional instructions on what to prioritize highlighting.
+    - **pages**: Optional PDF page selection; extraction stops at the text limit.
     """
-    content = await validate_uploaded_file(file)
-    text = FileParser.parse_file(io.BytesIO(content), file.filename)
-    validate_text_length(text)
+    page_indices = parse_page_ranges(pages)
     
-    annotated_html, processing_time = await service.annotate_text(
-        text=text,
-        custom_focus=custom_focus
-    )
+    # Annotate pages while later ones are still being extracted
+    with await validate_uploaded_file(file) as upload:
+        cost_mb = estimate_request_mb(
+            text_chars=min(upload.size, MAX_TEXT_LENGTH),
+            file_bytes=upload.size,
+            file_type=file.filename.split(".")[-1]
+        )
+        async with admission.admit(cost_mb, "larf_file"):
+            stream = await stream_upload(
+                upload, file.filename, max_chars=MAX_TEXT_LENGTH, pages=page_indices
+            )
+            text, annotated_html, processing_time = await service.annotate_stream(
+                stream,
+                custom_focus=custom_focus
+            )
+    document = stream.document
     
     return LarfResponse(
         original_text=text,
         annotated_html=annotated_html,
-        processing_time_ms=processing_time
+        processing_time_ms=processing_time,
+        document=DocumentInfo(
+            filename=file.filename,
+            characters=len(text),
+            page_count=document.page_count,
+            pages_parsed=document.pages_parsed,
+            truncated=document.truncated,
+            characters_removed=document.chars_removed,
+            chapters=[
+                ChapterInfo(title=c.title, start=c.start, end=c.end) for c in document.chapters
+            ] if document.chapters else None
+        )
     )
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Metrics API routes"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.dependencies import get_simplification_service
+from core.metrics import (
+    metrics,
+    CACHE_HITS,
+    CACHE_MISSES,
+    CACHE_HIT_RATIO,
+    DOCUMENT_CACHE_BYTES_SAVED,
+    CONTEXT_CACHE_HANDLES,
+    PROCESS_RSS
+)
+from core.middleware import TimedRoute, check_memory_usage
+from services.context_cache import context_cache
+from utils.document_cache import document_cache
+from utils.shared_cache import shared_cache
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(tags=["Monitoring"], route_class=TimedRoute)
+
+
+def _collect_cache_metrics():
+    """Copy cache counters into the registry at scrape time"""
+    documents = document_cache.stats()
+    caches = {
+        "documents": documents,
+        "simplification_paragraphs": get_simplification_service().cache_stats()
+    }
+    if shared_cache.enabled:
+        caches["shared"] = shared_cache.stats()
+    for name, stats in caches.items():
+        CACHE_HITS.set_total(stats["hits"], cache=name)
+        CACHE_MISSES.set_total(stats["misses"], cache=name)
+        CACHE_HIT_RATIO.set(stats["hit_ratio"], cache=name)
+    
+    DOCUMENT_CACHE_BYTES_SAVED.set_total(documents["bytes_saved"])
+    CONTEXT_CACHE_HANDLES.set(context_cache.stats()["fresh"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Metrics in the Prometheus text format.
+    
+    Request and upstream latency histograms, in-flight requests, cache
+    hit ratios, audio produced and process memory.
+    """
+    _collect_cache_metrics()
+    PROCESS_RSS.set(check_memory_usage() * 1024 * 1024)
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
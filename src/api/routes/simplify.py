@@ -1,23 +1,27 @@
 """Simplification API routes"""
-import io
 import logging
 from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, UploadFile, File
 from fastapi.responses import JSONResponse
 
 from api.schemas import (
     TextSimplifyRequest,
     SimplifyResponse,
-    ModesResponse
+    ModesResponse,
+    DocumentInfo,
+    ChapterInfo
 )
 from api.dependencies import get_simplification_service
 from services.simplification import SimplificationService, get_mode_descriptions
-from core.exceptions import validate_text_length
-from utils import FileParser, validate_uploaded_file
+from core.exceptions import validate_text_length, MAX_TEXT_LENGTH
+from core.admission import admission, estimate_request_mb
+from core.middleware import TimedRoute
+from utils import validate_uploaded_file, parse_page_ranges, stream_upload
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/simplify", tags=["Simplification"])
+router = APIRouter(prefix="/simplify", tags=["Simplification"], route_class=TimedRoute)
 
 
 @router.post("/text", response_model=SimplifyResponse)
@@ -38,13 +42,14 @@ async def simplify_text(
     validate_text_length(request.text)
     
     # Simplify text
-    simplified_text, statistics, processing_time_ms = await service.simplify_text(
-        text=request.text,
-        mode=request.mode,
-        intensity=request.intensity,
-        custom_sentence_length=request.custom_sentence_length,
-        options=request.options
-    )
+    async with admission.admit(estimate_request_mb(text_chars=len(request.text)), "simplify"):
+        simplified_text, statistics, processing_time_ms = await service.simplify_text(
+            text=request.text,
+            mode=request.mode,
+            intensity=request.intensity,
+            custom_sentence_length=request.custom_sentence_length,
+            options=request.options
+        )
     
     return SimplifyResponse(
         original_text=request.text,
@@ -59,35 +64,45 @@ async def simplify_text(
 
 @router.post("/file", response_model=SimplifyResponse)
 async def simplify_file(
-    file: UploadFile = File(..., description="File to simplify (TXT, PDF, DOCX, max 10MB)"),
+    file: UploadFile = File(..., description="File to simplify (TXT, PDF, DOCX, HTML, Markdown, EPUB, max 10MB)"),
     mode: str = "general",
     intensity: str = "medium",
+    pages: Optional[str] = None,
     service: SimplificationService = Depends(get_simplification_service)
 ):
     """
     Simplify text from uploaded file.
     
-    - **file**: File to upload (TXT, PDF, or DOCX, max 10MB)
+    - **file**: File to upload (TXT, PDF, DOCX, HTML, Markdown or EPUB, max 10MB)
     - **mode**: Simplification mode
     - **intensity**: Simplification intensity
-    """
-    # Validate and read file
-    content = await validate_uploaded_file(file)
+    - **pages**: Optional PDF page selection (e.g. "1-5,8")
     
-    # Parse file content
-    text = FileParser.parse_file(io.BytesIO(content), file.filename)
-    
-    # Validate extracted text
-    validate_text_length(text)
+    Extraction stops at the text limit; `document.truncated` reports whether
+    later content was skipped.
+    """
+    page_indices = parse_page_ranges(pages)
     
-    # Simplify text
     from api.schemas.common import SimplificationMode, SimplificationIntensity
     
-    simplified_text, statistics, processing_time_ms = await service.simplify_text(
-        text=text,
-        mode=SimplificationMode(mode),
-        intensity=SimplificationIntensity(intensity)
-    )
+    # Validate and spool file, then simplify pages while later ones are still
+    # being extracted (extraction stops at the text limit)
+    with await validate_uploaded_file(file) as upload:
+        cost_mb = estimate_request_mb(
+            text_chars=min(upload.size, MAX_TEXT_LENGTH),
+            file_bytes=upload.size,
+            file_type=file.filename.split(".")[-1]
+        )
+        async with admission.admit(cost_mb, "simplify_file"):
+            stream = await stream_upload(
+                upload, file.filename, max_chars=MAX_TEXT_LENGTH, pages=page_indices
+            )
+            text, simplified_text, statistics, processing_time_ms = await service.simplify_stream(
+                stream,
+                mode=SimplificationMode(mode),
+                intensity=SimplificationIntensity(intensity)
+            )
+    document = stream.document
     
     return SimplifyResponse(
         original_text=text,
@@ -96,7 +111,18 @@ async def simplify_file(
         timestamp=datetime.utcnow(),
         mode_used=SimplificationMode(mode),
         intensity_used=SimplificationIntensity(intensity),
-        statistics=statistics
+        statistics=statistics,
+        document=DocumentInfo(
+            filename=file.filename,
+            characters=len(text),
+            page_count=document.page_count,
+            pages_parsed=document.pages_parsed,
+            truncated=document.truncated,
+            characters_removed=document.chars_removed,
+            chapters=[
+                ChapterInfo(title=c.title, start=c.start, end=c.end) for c in document.chapters
+            ] if document.chapters else None
+        )
     )
 
 
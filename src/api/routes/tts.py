@@ -14,10 +14,12 @@ from api.dependencies import get_tts_service, get_simplification_service
 from services.tts import TTSService
 from services.simplification import SimplificationService
 from core.exceptions import validate_text_length
+from core.admission import admission, estimate_request_mb
+from core.middleware import TimedRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/tts", tags=["Text-to-Speech"])
+router = APIRouter(prefix="/tts", tags=["Text-to-Speech"], route_class=TimedRoute)
 
 
 @router.post("/generate", response_model=TTSResponse)
@@ -38,11 +40,16 @@ async def generate_tts(
     validate_text_length(request.text)
     
     # Generate TTS
-    audio_base64, duration, timestamps, processing_time_ms = await service.generate_speech(
-        text=request.text,
-        voice=request.voice,
-        sample_rate=request.sample_rate
+    cost_mb = estimate_request_mb(
+        text_chars=len(request.text),
+        audio_seconds=service.estimate_audio_seconds(request.text)
     )
+    async with admission.admit(cost_mb, "tts"):
+        audio_base64, duration, timestamps, processing_time_ms = await service.generate_speech(
+            text=request.text,
+            voice=request.voice,
+            sample_rate=request.sample_rate
+        )
     
     return TTSResponse(
         audio_base64=audio_base64,
@@ -85,21 +92,27 @@ async def simplify_and_generate_tts(
         custom_length = request.simplification.custom_sentence_length
         options = request.simplification.options
     
-    # Simplify text
-    simplified_text, _, simplify_time = await simplification_service.simplify_text(
-        text=request.text,
-        mode=mode,
-        intensity=intensity,
-        custom_sentence_length=custom_length,
-        options=options
-    )
-    
-    # Generate TTS from simplified text
-    audio_base64, duration, timestamps, tts_time = await tts_service.generate_speech(
-        text=simplified_text,
-        voice=request.voice,
-        sample_rate=request.sample_rate
+    # Simplified text runs about as long as the original, so project audio from it
+    cost_mb = estimate_request_mb(
+        text_chars=len(request.text),
+        audio_seconds=tts_service.estimate_audio_seconds(request.text)
     )
+    async with admission.admit(cost_mb, "tts_simplify"):
+        # Simplify text
+        simplified_text, _, simplify_time = await simplification_service.simplify_text(
+            text=request.text,
+            mode=mode,
+            intensity=intensity,
+            custom_sentence_length=custom_length,
+            options=options
+        )
+        
+        # Generate TTS from simplified text
+        audio_base64, duration, timestamps, tts_time = await tts_service.generate_speech(
+            text=simplified_text,
+            voice=request.voice,
+            sample_rate=request.sample_rate
+        )
     
     total_time = simplify_time + tts_time
     
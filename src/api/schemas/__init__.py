@@ -6,7 +6,9 @@ from .common import (
     ReplaceComplexWords,
     TTSVoice,
     WordTimestamp,
-    TextStatistics
+    TextStatistics,
+    DocumentInfo,
+    ChapterInfo
 )
 from .requests import (
     SimplificationOptions,
@@ -21,7 +23,9 @@ from .responses import (
     ErrorResponse,
     HealthResponse,
     ModesResponse,
-    VoicesResponse
+    VoicesResponse,
+    ProfileInfo,
+    ProfilesResponse
 )
 
 __all__ = [
@@ -33,6 +37,8 @@ __all__ = [
     "TTSVoice",
     "WordTimestamp",
     "TextStatistics",
+    "DocumentInfo",
+    "ChapterInfo",
     # Requests
     "SimplificationOptions",
     "TextSimplifyRequest",
@@ -46,4 +52,6 @@ __all__ = [
     "HealthResponse",
     "ModesResponse",
     "VoicesResponse",
+    "ProfileInfo",
+    "ProfilesResponse",
 ]
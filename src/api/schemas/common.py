@@ -1,6 +1,6 @@
 """Common schemas used across the API"""
 from enum import Enum
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -59,3 +59,42 @@ class TextStatistics(BaseModel):
     simplified_word_count: int
     original_avg_sentence_length: float
     simplified_avg_sentence_length: float
+    original_sentence_count: int = 0
+    simplified_sentence_count: int = 0
+    original_syllable_count: int = 0
+    simplified_syllable_count: int = 0
+    original_flesch_kincaid_grade: float = 0.0
+    simplified_flesch_kincaid_grade: float = 0.0
+    original_long_word_percentage: float = 0.0
+    simplified_long_word_percentage: float = 0.0
+    already_simple: bool = Field(
+        default=False,
+        description="Text already met the readability targets and was returned unchanged"
+    )
+
+
+class ChapterInfo(BaseModel):
+    """Chapter boundary within extracted document text"""
+    title: Optional[str] = None
+    start: int = Field(..., description="Offset of the chapter's first character in original_text")
+    end: int = Field(..., description="Offset just past the chapter's last character")
+
+
+class DocumentInfo(BaseModel):
+    """Metadata about text extracted from an uploaded file"""
+    filename: str
+    characters: int = Field(..., description="Characters of text extracted")
+    page_count: Optional[int] = Field(default=None, description="Pages in the document (PDF only)")
+    pages_parsed: Optional[int] = Field(default=None, description="Pages extracted (PDF only)")
+    truncated: bool = Field(
+        default=False,
+        description="Extraction stopped at the text limit; later content was not processed"
+    )
+    characters_removed: int = Field(
+        default=0,
+        description="Characters of headers, footers, page numbers and whitespace removed"
+    )
+    chapters: Optional[List[ChapterInfo]] = Field(
+        default=None,
+        description="Chapter boundaries (EPUB only)"
+    )
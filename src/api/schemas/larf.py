@@ -1,5 +1,6 @@
 from typing import Optional
 from pydantic import BaseModel, Field
+from .common import DocumentInfo
 
 class LarfAnnotateRequest(BaseModel):
     """Request to annotate text for dyslexia support"""
@@ -13,4 +14,8 @@ class LarfResponse(BaseModel):
     """Response containing annotated HTML"""
     original_text: str
     annotated_html: str
-    processing_time_ms: float
\ No newline at end of file
+    processing_time_ms: float
+    document: Optional[DocumentInfo] = Field(
+        default=None,
+        description="Extraction metadata (file uploads only)"
+    )
\ No newline at end of file
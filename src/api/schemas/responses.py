@@ -6,7 +6,8 @@ from .common import (
     SimplificationMode,
     SimplificationIntensity,
     WordTimestamp,
-    TextStatistics
+    TextStatistics,
+    DocumentInfo
 )
 
 
@@ -19,6 +20,10 @@ class SimplifyResponse(BaseModel):
     mode_used: SimplificationMode
     intensity_used: SimplificationIntensity
     statistics: TextStatistics
+    document: Optional[DocumentInfo] = Field(
+        default=None,
+        description="Extraction metadata (file uploads only)"
+    )
 
 
 class TTSResponse(BaseModel):
@@ -68,3 +73,21 @@ class VoicesResponse(BaseModel):
     """Available TTS voices"""
     voices: List[str]
     default_voice: str
+
+
+class ProfileInfo(BaseModel):
+    """A stored request profile"""
+    id: str
+    mode: str = Field(..., description="Profiler used: cprofile or sample")
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    created_at: float = Field(..., description="Unix time the profile was stored")
+    filename: str
+    size_bytes: int
+
+
+class ProfilesResponse(BaseModel):
+    """Recent request profiles, newest first"""
+    profiles: List[ProfileInfo]
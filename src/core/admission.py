@@ -0,0 +1,254 @@
+"""Memory-aware admission control for heavy requests"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Optional, Set
+
+from core.config import settings
+from core.exceptions import ServiceOverloadedException
+from core.metrics import MEMORY_RESERVED, REQUEST_MEMORY_GROWTH, REQUESTS_QUEUED
+from core.middleware import process_memory_mb
+from core.tracing import trace_span
+
+logger = logging.getLogger(__name__)
+
+# Fixed cost of any request: framework objects, buffers, logging
+BASE_REQUEST_MB = 2.0
+
+# Text is held several times over: request model, paragraphs, prompts,
+# upstream responses, the result and its JSON encoding
+TEXT_BYTES_PER_CHAR = 40
+
+# Peak memory per byte of upload while parsing, by file type. PDF pages are
+# extracted in worker processes that each hold a copy of the file.
+FILE_MEMORY_FACTOR = {"pdf": 8.0, "docx": 4.0, "epub": 4.0}
+DEFAULT_FILE_MEMORY_FACTOR = 3.0
+
+# 16-bit mono PCM at 24 kHz, held as chunks, joined PCM, WAV, base64 and JSON
+AUDIO_BYTES_PER_SECOND = 24000 * 2
+AUDIO_MEMORY_FACTOR = 6.0
+
+# How often memory is sampled while requests are admitted; an older sample
+# is refreshed before admitting onto an idle instance
+SAMPLE_INTERVAL_SECONDS = 0.05
+
+MB = 1024 * 1024
+
+
+def estimate_request_mb(
+    text_chars: int = 0,
+    file_bytes: int = 0,
+    file_type: Optional[str] = None,
+    audio_seconds: float = 0.0
+) -> float:
+    """
+    Estimate the peak memory a request adds to the instance.
+    
+    Args:
+        text_chars: Characters of input text
+        file_bytes: Size of the uploaded file
+        file_type: Upload extension, selecting the parse cost factor
+        audio_seconds: Projected length of generated speech
+    
+    Returns:
+        Estimated cost in MB
+    """
+    factor = FILE_MEMORY_FACTOR.get((file_type or "").lower(), DEFAULT_FILE_MEMORY_FACTOR)
+    return (
+        BASE_REQUEST_MB
+        + text_chars * TEXT_BYTES_PER_CHAR / MB
+        + file_bytes * factor / MB
+        + audio_seconds * AUDIO_BYTES_PER_SECOND * AUDIO_MEMORY_FACTOR / MB
+    )
+
+
+@dataclass(eq=False)
+class Ticket:
+    """An admitted request's memory reservation and observed peak"""
+    kind: str
+    cost_mb: float
+    start_mb: float
+    peak_mb: float = field(init=False)
+    
+    def __post_init__(self):
+        self.peak_mb = self.start_mb
+
+
+class AdmissionController:
+    """
+    Admit requests only while projected memory stays under a limit.
+    
+    The projection is the larger of current RSS and the idle RSS plus
+    all outstanding reservations (admitted requests may not have
+    allocated yet), plus the new request's estimate. Requests that don't
+    fit wait in a FIFO queue and are admitted as earlier ones finish. A
+    full queue or a wait past the timeout is refused with 503 and
+    Retry-After. A request is always admitted when nothing else is
+    running, so large documents still work on an idle instance.
+    
+    Memory is sampled in a thread (psutil scans /proc for the parse
+    workers) and admission decisions read the latest sample.
+    """
+    
+    def __init__(
+        self,
+        limit_mb: float,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: int
+    ):
+        self.limit_mb = limit_mb
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._reserved_mb = 0.0
+        self._idle_mb: Optional[float] = None
+        self._memory_mb: Optional[float] = None
+        self._sampled_at = 0.0
+        self._active: Set[Ticket] = set()
+        self._waiters: Deque[list] = deque()
+        self._sampler: Optional[asyncio.Task] = None
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._active)
+    
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+    
+    def projected_mb(self, cost_mb: float, current_mb: Optional[float] = None) -> float:
+        """Instance memory if a request costing cost_mb were admitted now"""
+        if current_mb is None:
+            current_mb = self._memory_mb or 0.0
+        return max(current_mb, (self._idle_mb or 0.0) + self._reserved_mb) + cost_mb
+    
+    def _fits(self, cost_mb: float) -> bool:
+        return not self._active or self.projected_mb(cost_mb) <= self.limit_mb
+    
+    def _admit(self, kind: str, cost_mb: float) -> Ticket:
+        ticket = Ticket(kind=kind, cost_mb=cost_mb, start_mb=self._memory_mb or 0.0)
+        if not self._active:
+            self._idle_mb = ticket.start_mb
+        self._active.add(ticket)
+        self._reserved_mb += cost_mb
+        MEMORY_RESERVED.set(self._reserved_mb * MB)
+        
+        if self._sampler is None or self._sampler.done():
+            self._sampler = asyncio.get_running_loop().create_task(self._sample())
+        return ticket
+    
+    async def _refresh(self) -> float:
+        self._memory_mb = await asyncio.to_thread(process_memory_mb)
+        self._sampled_at = time.monotonic()
+        return self._memory_mb
+    
+    def _overloaded(self, reason: str) -> ServiceOverloadedException:
+        return ServiceOverloadedException(reason, self.retry_after)
+    
+    async def acquire(self, cost_mb: float, kind: str = "request") -> Ticket:
+        """
+        Reserve memory for a request, waiting for room if needed.
+        
+        Raises:
+            ServiceOverloadedException: Queue full or no room within the timeout
+        """
+        if self._memory_mb is None or (
+            not self._active and time.monotonic() - self._sampled_at > SAMPLE_INTERVAL_SECONDS
+        ):
+            await self._refresh()  # The sampler only runs while requests do
+        if not self._waiters and self._fits(cost_mb):
+            return self._admit(kind, cost_mb)
+        
+        if len(self._waiters) >= self.max_queue:
+            raise self._overloaded("too many requests waiting for memory")
+        
+        future = asyncio.get_running_loop().create_future()
+        entry = [future, kind, cost_mb]
+        self._waiters.append(entry)
+        REQUESTS_QUEUED.inc()
+        logger.info(
+            "Queued %s request needing %.1f MB (%.1f MB reserved, %d waiting)",
+            kind, cost_mb, self._reserved_mb, len(self._waiters)
+        )
+        try:
+            return await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._overloaded("not enough free memory")
+        except asyncio.CancelledError:
+            # Admitted just as the client went away
+            if future.done() and not future.cancelled():
+                self.release(future.result())
+            raise
+        finally:
+            REQUESTS_QUEUED.dec()
+            if entry in self._waiters:
+                # Left without being admitted; requests queued behind it may fit
+                self._waiters.remove(entry)
+                self._wake()
+    
+    def release(self, ticket: Ticket) -> None:
+        """Return a request's reservation and admit waiters that now fit"""
+        if ticket not in self._active:
+            return
+        self._active.discard(ticket)
+        self._reserved_mb = max(0.0, self._reserved_mb - ticket.cost_mb)
+        MEMORY_RESERVED.set(self._reserved_mb * MB)
+        
+        growth_mb = max(0.0, ticket.peak_mb - ticket.start_mb)
+        REQUEST_MEMORY_GROWTH.observe(growth_mb * MB, kind=ticket.kind)
+        logger.info(
+            "Released %s request: estimated %.1f MB, peak RSS %.1f MB (+%.1f MB)",
+            ticket.kind, ticket.cost_mb, ticket.peak_mb, growth_mb
+        )
+        self._wake()
+    
+    def _wake(self) -> None:
+        while self._waiters:
+            future, kind, cost_mb = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(cost_mb):
+                break
+            self._waiters.popleft()
+            future.set_result(self._admit(kind, cost_mb))
+    
+    async def _sample(self) -> None:
+        """Track each admitted request's peak RSS while any are running"""
+        while self._active:
+            current_mb = await self._refresh()
+            for ticket in list(self._active):
+                ticket.peak_mb = max(ticket.peak_mb, current_mb)
+            await asyncio.sleep(SAMPLE_INTERVAL_SECONDS)
+    
+    @asynccontextmanager
+    async def admit(self, cost_mb: float, kind: str = "request") -> AsyncIterator[Optional[Ticket]]:
+        """
+        Hold a memory reservation for the duration of the block.
+        
+        The reservation ends when the route returns; response encoding is
+        covered by the estimate, not the reservation.
+        """
+        if not settings.admission_enabled:
+            yield None
+            return
+        
+        with trace_span("admission.wait", kind=kind, cost_mb=round(cost_mb, 1)):
+            ticket = await self.acquire(cost_mb, kind)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+
+# Global controller instance
+admission = AdmissionController(
+    limit_mb=settings.admission_memory_limit_mb,
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout_seconds,
+    retry_after=settings.admission_retry_after_seconds
+)
@@ -1,7 +1,9 @@
 """Configuration and settings for Lexy-AI"""
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from core.logging_config import parse_sample_rates
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
@@ -11,15 +13,97 @@ class Settings(BaseSettings):
     
     # Optional with defaults
     max_file_size_mb: float = 10.0
+    upload_spool_max_bytes: int = 1024 * 1024  # Uploads larger than this spool to disk
     cors_origins: str = "http://localhost:3000,http://localhost:8000"
     log_level: str = "INFO"
     
+    # Logging is written by a background thread
+    log_format: str = "json"  # "json" or "text"
+    log_sample_rates: str = ""  # e.g. "core.middleware=0.1" keeps 1 in 10 INFO lines
+    
+    # Skip the upstream call when text already meets the readability targets
+    simplification_fast_path: bool = True
+    
+    # Simplified paragraphs kept for incremental re-simplification
+    simplification_cache_size: int = 4096
+    
+    # File parsing
+    parser_workers: Optional[int] = None  # Process pool size; None = min(4, CPUs), 0 = threads only
+    parser_pages_per_task: int = 25  # PDF pages extracted per worker task
+    normalize_extracted_text: bool = True  # Strip headers/footers and reflow PDF and TXT text
+    
+    # Parsed documents cached by upload hash
+    document_cache_enabled: bool = True
+    document_cache_max_mb: float = 64.0  # In-memory tier, measured in text characters
+    document_cache_dir: Optional[str] = None  # Enables the disk tier when set
+    document_cache_disk_max_mb: float = 512.0
+    
+    # Host-wide second-tier cache shared by all workers (a SQLite file), off unless a
+    # path is set; src/server.py sets one when it runs more than one worker
+    shared_cache_path: Optional[str] = None
+    shared_cache_max_mb: float = 256.0
+    shared_cache_lease_seconds: float = 30.0  # Longest wait for another worker computing the same result
+    
+    # Request tracing: exported when a file or OTLP endpoint is set
+    tracing_file: Optional[str] = None  # JSONL file of OTLP/JSON export requests
+    tracing_otlp_endpoint: Optional[str] = None  # e.g. http://localhost:4318/v1/traces
+    tracing_sample_rate: float = 0.01  # Share of ordinary requests exported
+    tracing_slow_ms: Optional[float] = 2000.0  # Slower requests are always exported
+    
+    # Admin endpoints and per-request profiling, enabled when a token is set
+    admin_token: Optional[str] = None
+    profile_store_size: int = 20  # Recent profiles kept in memory
+    profile_store_dir: Optional[str] = None  # Also write profiles here when set
+    
+    # Upstream backend: "gemini", or "fake" for load tests without quota
+    upstream_backend: str = "gemini"
+    fake_upstream_latency: str = "lognormal:800,0.5"  # fixed:MS, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA
+    fake_upstream_error_rate: float = 0.0  # Share of calls failing with 500
+    fake_upstream_rate_limit_rate: float = 0.0  # Share of calls failing with 429
+    fake_upstream_seed: Optional[int] = None
+    
+    # Self-hosted server (python src/server.py): pre-forked uvicorn workers
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: Optional[int] = None  # None = one per CPU
+    server_preload: bool = True  # Import the app once in the master, before forking
+    server_max_requests: int = 0  # Recycle a worker after this many requests; 0 = never
+    server_max_requests_jitter: int = 0  # Up to this many extra, so workers don't recycle together
+    server_max_rss_mb: float = 0.0  # Recycle a worker whose memory passes this; 0 = never
+    server_graceful_timeout_seconds: float = 30.0  # Time a stopping worker gets to finish requests
+    
+    # Warm-up in the background after startup: build the client, pre-render
+    # prompts and open the upstream connection
+    warm_up_on_startup: bool = True
+    warm_up_timeout_seconds: float = 5.0
+    
+    # Admission control: queue or reject work that would push memory past the limit
+    admission_enabled: bool = True
+    admission_memory_limit_mb: float = 900.0  # Vercel functions are stopped at 1024 MB
+    admission_max_queue: int = 16
+    admission_queue_timeout_seconds: float = 5.0
+    admission_retry_after_seconds: int = 5
+    
+    # Token budgeting
+    max_input_tokens: int = 50000
+    verify_token_counts: bool = False  # Confirm near-limit estimates with count_tokens
+    
+    # Upstream context caching of static prompt prefixes
+    context_cache_enabled: bool = True
+    context_cache_ttl_seconds: int = 3600
+    context_cache_min_tokens: int = 4096  # Provider minimum for cached content
+    
     # Computed properties
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins from comma-separated string"""
         return [origin.strip() for origin in self.cors_origins.split(",")]
     
+    @property
+    def log_sample_rates_map(self) -> Dict[str, float]:
+        """Parse per-logger sample rates from 'logger=rate' pairs"""
+        return parse_sample_rates(self.log_sample_rates)
+    
     @property
     def max_file_size_bytes(self) -> int:
         """Convert MB to bytes"""
@@ -1,5 +1,5 @@
 """Custom exceptions and error handlers for Lexy-AI"""
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Sequence
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from datetime import datetime
@@ -7,6 +7,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Maximum characters of text accepted for processing
+MAX_TEXT_LENGTH = 100000
+
 
 # Custom Exception Classes
 class LexyAIException(Exception):
@@ -15,11 +18,13 @@ class LexyAIException(Exception):
         self,
         message: str,
         status_code: int = 500,
-        details: Optional[Dict[str, Any]] = None
+        details: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
     ):
         self.message = message
         self.status_code = status_code
         self.details = details or {}
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -39,13 +44,23 @@ class FileSizeException(LexyAIException):
         )
 
 
+class TokenLimitException(LexyAIException):
+    """Input exceeds the token budget"""
+    def __init__(self, tokens: int, max_tokens: int):
+        super().__init__(
+            f"Input of about {tokens} tokens exceeds limit of {max_tokens} tokens",
+            status_code=413,
+            details={"estimated_tokens": tokens, "max_tokens": max_tokens}
+        )
+
+
 class UnsupportedFileException(LexyAIException):
     """Unsupported file type"""
-    def __init__(self, file_type: str):
+    def __init__(self, file_type: str, supported: Sequence[str]):
         super().__init__(
-            f"Unsupported file type: {file_type}",
+            f"Unsupported file type: {file_type} (supported: {', '.join(supported)})",
             status_code=415,
-            details={"file_type": file_type, "supported": ["txt", "pdf", "docx"]}
+            details={"file_type": file_type, "supported": list(supported)}
         )
 
 
@@ -69,6 +84,33 @@ class TTSGenerationException(LexyAIException):
         )
 
 
+class AdminAccessException(LexyAIException):
+    """Missing or wrong admin token"""
+    def __init__(self):
+        super().__init__("Admin token required", status_code=403)
+
+
+class NotFoundException(LexyAIException):
+    """Requested resource does not exist"""
+    def __init__(self, resource: str, identifier: str):
+        super().__init__(
+            f"{resource} not found: {identifier}",
+            status_code=404,
+            details={"resource": resource, "id": identifier}
+        )
+
+
+class ServiceOverloadedException(LexyAIException):
+    """Not enough memory headroom to take the request now"""
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(
+            f"Server is busy: {reason}",
+            status_code=503,
+            details={"reason": reason, "retry_after_seconds": retry_after},
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
 # Exception Handlers
 async def lexyai_exception_handler(
     request: Request,
@@ -76,7 +118,7 @@ async def lexyai_exception_handler(
 ) -> JSONResponse:
     """Handle custom Lexy-AI exceptions"""
     logger.error(
-        f"LexyAI Exception: {exc.message}",
+        "LexyAI Exception: %s", exc.message,
         extra={"details": exc.details, "path": request.url.path}
     )
     
@@ -88,7 +130,8 @@ async def lexyai_exception_handler(
             "details": exc.details,
             "timestamp": datetime.utcnow().isoformat(),
             "path": str(request.url.path)
-        }
+        },
+        headers=exc.headers
     )
 
 
@@ -98,7 +141,7 @@ async def general_exception_handler(
 ) -> JSONResponse:
     """Handle unexpected exceptions"""
     logger.exception(
-        f"Unexpected exception: {str(exc)}",
+        "Unexpected exception: %s", exc,
         extra={"path": request.url.path}
     )
     
@@ -114,7 +157,7 @@ async def general_exception_handler(
 
 
 # Utility Functions
-def validate_text_length(text: str, max_length: int = 100000):
+def validate_text_length(text: str, max_length: int = MAX_TEXT_LENGTH):
     """Validate text length"""
     if not text or not text.strip():
         raise ValidationException(
@@ -141,11 +184,8 @@ def validate_file_size(file_size_bytes: int, max_bytes: int):
         raise FileSizeException(size_mb, max_mb)
 
 
-def validate_file_type(filename: str, allowed_types: list = None):
+def validate_file_type(filename: str, allowed_types: Sequence[str]):
     """Validate file type"""
-    if allowed_types is None:
-        allowed_types = ["txt", "pdf", "docx"]
-    
     extension = filename.split(".")[-1].lower()
     if extension not in allowed_types:
-        raise UnsupportedFileException(extension)
+        raise UnsupportedFileException(extension, allowed_types)
@@ -0,0 +1,217 @@
+"""Non-blocking structured logging through a queue and a background writer"""
+import atexit
+import copy
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO, Tuple
+
+# Format used when LOG_FORMAT=text
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Argument types whose rendering can't change between the log call and the
+# writer thread, so formatting them can safely be deferred
+_DEFERRABLE_ARGS = (str, int, float, bool, type(None))
+
+# Attributes present on every record; anything else came from extra=
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and extra fields"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in N records at INFO and below for selected loggers.
+    
+    Rates apply to a logger and its children, the most specific name
+    winning. Each message template is counted separately and every Nth
+    record is kept, so paired lines like "Request started"/"Request
+    completed" are both represented and bursts aren't dropped wholesale.
+    Kept records carry sample_rate so counts can be scaled back up.
+    Warnings and errors always pass.
+    """
+    
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = {name: min(1.0, max(0.0, rate)) for name, rate in rates.items()}
+        self._counters: Dict[Tuple[str, str], itertools.count] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+    
+    def _rule(self, logger_name: str) -> Optional[str]:
+        rule = self._resolved.get(logger_name, "")
+        if rule != "":
+            return rule
+        
+        rule = None
+        for name in self.rates:
+            if logger_name == name or logger_name.startswith(name + "."):
+                if rule is None or len(name) > len(rule):
+                    rule = name
+        self._resolved[logger_name] = rule
+        return rule
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        
+        rule = self._rule(record.name)
+        if rule is None:
+            return True
+        rate = self.rates[rule]
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        
+        counter = self._counters.setdefault((record.name, str(record.msg)), itertools.count())
+        if next(counter) % round(1 / rate):
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Enqueue records without formatting them on the calling thread.
+    
+    The stock QueueHandler renders the message before enqueuing; here
+    records whose arguments are plain values are passed through as-is
+    and formatted by the listener thread. Records with other arguments,
+    which could change before the writer gets to them, and exception
+    tracebacks are rendered up front.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        deferrable = isinstance(args, tuple) and all(
+            isinstance(arg, _DEFERRABLE_ARGS) for arg in args
+        )
+        if deferrable and not record.exc_info:
+            return record
+        
+        record = copy.copy(record)
+        if not deferrable:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse 'logger=rate' pairs from a comma-separated string"""
+    rates = {}
+    for pair in value.split(","):
+        name, sep, rate = pair.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(
+    level: str = "INFO",
+    log_format: str = "json",
+    sample_rates: Optional[Dict[str, float]] = None,
+    stream: Optional[TextIO] = None
+) -> QueueListener:
+    """
+    Route all logging through a queue drained by a background thread.
+    
+    The root logger gets a single LazyQueueHandler, so a log call costs
+    a level check, the sampling filter and an enqueue; formatting and
+    the write happen on the listener thread. Calling again replaces the
+    previous configuration.
+    
+    Args:
+        level: Root log level
+        log_format: "json" for one object per line, "text" for plain lines
+        sample_rates: Logger name to fraction of INFO/DEBUG records kept
+        stream: Output stream (default: stderr)
+    
+    Returns:
+        The running queue listener
+    """
+    global _listener
+    stop_logging()
+    
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JSONFormatter() if log_format.lower() == "json" else logging.Formatter(TEXT_FORMAT))
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    """
+    Give a forked child (server worker, parse worker) its own writer.
+    
+    Only the forking thread survives a fork, so the inherited listener
+    is dead, and the inherited queue may be stuck mid-get. The child
+    switches its queue handlers to a new queue with a new listener;
+    records queued before the fork are left to the parent.
+    """
+    global _listener
+    inherited = _listener
+    if inherited is None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, QueueHandler) and handler.queue is inherited.queue:
+            handler.queue = log_queue
+    _listener = QueueListener(log_queue, *inherited.handlers, respect_handler_level=inherited.respect_handler_level)
+    _listener.start()
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
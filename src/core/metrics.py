@@ -0,0 +1,259 @@
+"""In-process metrics registry rendered in the Prometheus text format"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Request latency buckets in seconds: fast endpoints up to slow LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Upstream calls are rarely faster than 100 ms
+UPSTREAM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+# Request memory growth buckets in bytes: 1 MB to 512 MB
+MEMORY_BUCKETS = tuple(float(2 ** n * 1024 * 1024) for n in range(10))
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for metrics keyed by label values, each with its own lock"""
+    
+    kind = ""
+    
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+    
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing total"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        # Unlabelled metrics report zero before their first update
+        self._values: Dict[LabelValues, float] = {} if self.labels else {(): 0.0}
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def set_total(self, value: float, **labels: str) -> None:
+        """Mirror a total kept elsewhere, such as a cache's own hit count"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down, or be set at scrape time"""
+    
+    kind = "gauge"
+    
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+    
+    def set(self, value: float, **labels: str) -> None:
+        self.set_total(value, **labels)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observations over fixed buckets.
+    
+    Each observation increments one bucket. Buckets are made cumulative
+    only when rendered, so recording costs a bisect and one increment.
+    """
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[LabelValues, list] = {}
+    
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for scraping"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, description, labels))
+    
+    def gauge(self, name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, description, labels))
+    
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, description, labels, buckets))
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Global registry instance
+metrics = MetricsRegistry()
+
+REQUEST_DURATION = metrics.histogram(
+    "lexy_request_duration_seconds",
+    "Request latency by route template",
+    labels=("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = metrics.gauge(
+    "lexy_requests_in_flight", "Requests currently being handled"
+)
+REQUESTS_QUEUED = metrics.gauge(
+    "lexy_requests_queued", "Requests waiting for admission"
+)
+UPSTREAM_DURATION = metrics.histogram(
+    "lexy_upstream_duration_seconds",
+    "Gemini call latency by model",
+    labels=("model",),
+    buckets=UPSTREAM_BUCKETS
+)
+UPSTREAM_ERRORS = metrics.counter(
+    "lexy_upstream_errors_total", "Failed Gemini calls by model and error type", labels=("model", "error")
+)
+AUDIO_SECONDS = metrics.counter(
+    "lexy_audio_seconds_total", "Seconds of speech audio generated"
+)
+AUDIO_BYTES = metrics.counter(
+    "lexy_audio_bytes_total", "Bytes of WAV audio generated"
+)
+CACHE_HITS = metrics.counter(
+    "lexy_cache_hits_total", "Cache hits", labels=("cache",)
+)
+CACHE_MISSES = metrics.counter(
+    "lexy_cache_misses_total", "Cache misses", labels=("cache",)
+)
+CACHE_HIT_RATIO = metrics.gauge(
+    "lexy_cache_hit_ratio", "Share of cache lookups that hit", labels=("cache",)
+)
+DOCUMENT_CACHE_BYTES_SAVED = metrics.counter(
+    "lexy_document_cache_bytes_saved_total", "Upload bytes served from the parsed-document cache instead of parsed"
+)
+CONTEXT_CACHE_HANDLES = metrics.gauge(
+    "lexy_context_cache_handles", "Fresh upstream cached-content handles"
+)
+MEMORY_RESERVED = metrics.gauge(
+    "lexy_memory_reserved_bytes", "Memory reserved by admitted requests"
+)
+REQUEST_MEMORY_GROWTH = metrics.histogram(
+    "lexy_request_memory_growth_bytes",
+    "Peak RSS growth observed while a request ran, by request kind",
+    labels=("kind",),
+    buckets=MEMORY_BUCKETS
+)
+PROCESS_RSS = metrics.gauge(
+    "lexy_process_resident_memory_bytes", "Resident set size of the process"
+)
+
+
+@contextmanager
+def track_upstream(model: str) -> Iterator[None]:
+    """Record latency and failures of a Gemini call"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(model=model, error=type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_DURATION.observe(time.perf_counter() - start, model=model)
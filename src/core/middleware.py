@@ -1,56 +1,237 @@
 """Middleware for Lexy-AI"""
+import asyncio
+import functools
 import logging
 import time
-import psutil
 import os
+from typing import Callable
+
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.exceptions import FileSizeException, lexyai_exception_handler
+from core.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT
+from core.timing import current_timings, request_timings
+from core.tracing import record_span, tracer
 
 logger = logging.getLogger(__name__)
 
+# Allowance for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Log all requests and responses with timing"""
+
+class LoggingMiddleware:
+    """
+    Log all requests and responses with timing.
+    
+    A pure ASGI middleware, so responses (including streamed ones) pass
+    through without an extra task or body buffering. Spans recorded by
+    services during the request are reported in a Server-Timing header
+    alongside the total, which is also sent as X-Process-Time. When
+    tracing is enabled the request is the root span of a trace.
+    """
     
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        path = scope["path"]
+        start_time = time.perf_counter()
+        status_code = 500
         
         # Log request
         logger.info(
-            f"Request started: {request.method} {request.url.path}",
-            extra={"method": request.method, "path": request.url.path}
+            "Request started: %s %s", method, path,
+            extra={"method": method, "path": path}
+        )
+        
+        # Continue the caller's trace when it sends a W3C traceparent
+        traceparent = dict(scope.get("headers") or ()).get(b"traceparent")
+        root = tracer.trace(
+            f"{method} {path}",
+            traceparent.decode("latin-1") if traceparent else None,
+            **{"http.request.method": method, "url.path": path}
         )
         
-        # Process request
-        response = await call_next(request)
+        REQUESTS_IN_FLIGHT.inc()
+        with request_timings() as timings, root as root_span:
+            async def send_with_timing(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    now = time.perf_counter()
+                    if timings.endpoint_done is not None:
+                        serialize_ms = (now - timings.endpoint_done) * 1000
+                        timings.add("serialize", serialize_ms)
+                        now_ns = time.time_ns()
+                        record_span("serialize", now_ns - int(serialize_ms * 1e6), now_ns)
+                    process_time = (now - start_time) * 1000
+                    
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-Process-Time", f"{process_time:.2f}ms")
+                    headers.append("Server-Timing", timings.server_timing(process_time))
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                # Time until the response body has been sent
+                process_time = (time.perf_counter() - start_time) * 1000
+                REQUESTS_IN_FLIGHT.dec()
+                
+                # Label by route template so path parameters don't multiply series
+                route_path = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_DURATION.observe(
+                    process_time / 1000,
+                    method=method,
+                    route=route_path,
+                    status=str(status_code)
+                )
+                
+                extra = {
+                    "method": method,
+                    "path": path,
+                    "status_code": status_code,
+                    "process_time_ms": process_time,
+                    "timings_ms": {name: round(ms, 2) for name, ms in timings.spans.items()}
+                }
+                if root_span is not None:
+                    root_span.name = f"{method} {route_path}"
+                    root_span.set_attribute("http.route", route_path)
+                    root_span.set_attribute("http.response.status_code", status_code)
+                    if status_code >= 500:
+                        root_span.error = f"HTTP {status_code}"
+                    extra["trace_id"] = root_span.trace.trace_id
+                
+                # Log response
+                logger.info(
+                    "Request completed: %s %s - Status: %s - Time: %.2fms",
+                    method, path, status_code, process_time,
+                    extra=extra
+                )
+
+
+def _mark_endpoint_done(endpoint: Callable) -> Callable:
+    """Wrap an async endpoint to note when it returns, before serialization"""
+    if not asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+    
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        timings = current_timings()
+        if timings is not None:
+            timings.endpoint_done = time.perf_counter()
+        return result
+    
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    Route that lets the timing middleware report a "serialize" span.
+    
+    The time from the endpoint returning to the response starting is
+    response validation and JSON encoding.
+    """
+    
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _mark_endpoint_done(endpoint), **kwargs)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject multipart uploads larger than the file limit.
+    
+    A declared Content-Length over the limit is refused before the body
+    is read, so the upload is never received, spooled or parsed. A body
+    sent without one (chunked) is counted as it arrives and refused once
+    it passes the limit; the application then sees a disconnect and
+    stops parsing, and what it had spooled so far is discarded.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            content_type = headers.get(b"content-type", b"")
+            content_length = headers.get(b"content-length", b"")
+            
+            if content_type.startswith(b"multipart/form-data"):
+                if not content_length.isdigit():
+                    await self._limit_body(scope, receive, send)
+                    return
+                if int(content_length) > settings.max_file_size_bytes + MULTIPART_OVERHEAD_BYTES:
+                    await self._refuse(scope, receive, send, int(content_length))
+                    return
         
-        # Calculate processing time
-        process_time = (time.time() - start_time) * 1000
+        await self.app(scope, receive, send)
+    
+    @staticmethod
+    async def _refuse(scope: Scope, receive: Receive, send: Send, size: int) -> None:
+        exc = FileSizeException(size / (1024 * 1024), settings.max_file_size_bytes / (1024 * 1024))
+        response = await lexyai_exception_handler(Request(scope), exc)
+        await response(scope, receive, send)
+    
+    async def _limit_body(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the app on a body of unknown length, refusing it once it passes the limit"""
+        limit = settings.max_file_size_bytes + MULTIPART_OVERHEAD_BYTES
+        received = 0
+        refused = False
         
-        # Log response
-        logger.info(
-            f"Request completed: {request.method} {request.url.path} - "
-            f"Status: {response.status_code} - Time: {process_time:.2f}ms",
-            extra={
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "process_time_ms": process_time
-            }
-        )
+        async def limited_receive() -> Message:
+            nonlocal received, refused
+            if refused:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    refused = True
+                    await self._refuse(scope, receive, send, received)
+                    return {"type": "http.disconnect"}
+            return message
         
-        # Add processing time header
-        response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
+        async def guarded_send(message: Message) -> None:
+            if not refused:  # The app's reply to the cut-off body is dropped
+                await send(message)
         
-        return response
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not refused:
+                raise
+
+
+def process_memory_mb() -> float:
+    """Resident memory of this process and its children (parse workers) in MB"""
+    import psutil  # Deferred: only needed when memory is checked
+    
+    process = psutil.Process(os.getpid())
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.Error:
+            continue  # Worker exited while we looked
+    return rss / 1024 / 1024
 
 
 def check_memory_usage():
     """Check current memory usage"""
-    process = psutil.Process(os.getpid())
-    memory_mb = process.memory_info().rss / 1024 / 1024
+    memory_mb = process_memory_mb()
     
-    if memory_mb > 900:  # 900 MB threshold (Vercel limit is 1024 MB)
-        logger.warning(f"High memory usage: {memory_mb:.2f} MB")
+    if memory_mb > settings.admission_memory_limit_mb:  # Vercel limit is 1024 MB
+        logger.warning("High memory usage: %.2f MB", memory_mb)
     
     return memory_mb
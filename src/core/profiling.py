@@ -0,0 +1,246 @@
+"""Opt-in profiling of individual requests"""
+import io
+import itertools
+import logging
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request header carrying the admin token
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+# Request header (or query parameter "profile") selecting the profiler
+PROFILE_HEADER = "x-profile"
+
+# Profilers: deterministic cProfile, or a stack sampler covering all threads
+PROFILE_MODES = ("cprofile", "sample")
+
+# Interval between stack samples in sample mode
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Whether a presented token matches the configured admin token"""
+    expected = settings.admin_token
+    return bool(expected and token) and secrets.compare_digest(token, expected)
+
+
+@dataclass
+class ProfileRecord:
+    """A stored profile and the request it was taken from"""
+    id: str
+    mode: str
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    created_at: float
+    filename: str
+    content_type: str
+    data: bytes = field(repr=False)
+    
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration_ms, 2),
+            "created_at": self.created_at,
+            "filename": self.filename,
+            "size_bytes": len(self.data)
+        }
+
+
+class ProfileStore:
+    """
+    The most recent profiles, kept in memory.
+    
+    When a directory is given each profile is also written there, so
+    profiles outlive the process and can be opened directly.
+    """
+    
+    def __init__(self, max_profiles: int = 20, directory: Optional[str] = None):
+        self._profiles: Deque[ProfileRecord] = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+        self.directory = Path(directory) if directory else None
+    
+    def add(self, record: ProfileRecord) -> None:
+        with self._lock:
+            self._profiles.append(record)
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                (self.directory / record.filename).write_bytes(record.data)
+            except OSError as e:
+                logger.warning("Failed to write profile %s: %s", record.filename, e)
+    
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        with self._lock:
+            return next((record for record in self._profiles if record.id == profile_id), None)
+    
+    def list(self) -> List[ProfileRecord]:
+        """Stored profiles, newest first"""
+        with self._lock:
+            return list(reversed(self._profiles))
+
+
+class _CProfiler:
+    """Deterministic profile of the event loop thread, saved in pstats format"""
+    
+    extension = "prof"
+    content_type = "application/octet-stream"
+    
+    def __init__(self):
+        import cProfile
+        
+        self._profile = cProfile.Profile()
+    
+    def start(self) -> None:
+        self._profile.enable()
+    
+    def stop(self) -> bytes:
+        import marshal
+        
+        self._profile.disable()
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+
+class _StackSampler:
+    """
+    Sample the stacks of all threads from a background thread.
+    
+    Unlike cProfile this sees work handed to threads (to_thread, parsing
+    without a pool) and adds little overhead to the profiled code. The
+    result is in the collapsed-stack format read by flamegraph.pl and
+    speedscope.
+    """
+    
+    extension = "collapsed"
+    content_type = "text/plain; charset=utf-8"
+    
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+    
+    def stop(self) -> bytes:
+        self._stop.set()
+        self._thread.join()
+        output = io.StringIO()
+        for stack, count in self._stacks.most_common():
+            output.write(f"{stack} {count}\n")
+        return output.getvalue().encode("utf-8")
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that ask for it with a valid admin token.
+    
+    A request is profiled when it carries the X-Admin-Token header and
+    selects a profiler with the X-Profile header or the profile query
+    parameter ("cprofile" or "sample"). The profile is stored and its
+    id returned in the X-Profile-Id response header; download it from
+    /admin/profiles/{id}. Only one request is profiled at a time, and
+    the middleware is only installed when ADMIN_TOKEN is set.
+    """
+    
+    def __init__(self, app: ASGIApp, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.store = store or profile_store
+        self._busy = threading.Lock()
+        self._ids = itertools.count(1)
+    
+    @staticmethod
+    def _requested_mode(scope: Scope) -> Optional[str]:
+        headers: Dict[bytes, bytes] = dict(scope.get("headers") or ())
+        mode = headers.get(PROFILE_HEADER.encode())
+        if mode is None and b"profile=" in scope.get("query_string", b""):
+            mode = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0].encode()
+        if mode is None:
+            return None
+        
+        token = headers.get(ADMIN_TOKEN_HEADER.encode(), b"").decode("latin-1")
+        if not is_admin(token):
+            return None
+        mode = mode.decode("latin-1").lower()
+        return mode if mode in PROFILE_MODES else PROFILE_MODES[0]
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        mode = self._requested_mode(scope)
+        if mode is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = f"{int(time.time())}-{next(self._ids)}"
+        status_code = 500
+        
+        async def send_with_id(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+        
+        profiler = _CProfiler() if mode == "cprofile" else _StackSampler()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            data = profiler.stop()
+            self._busy.release()
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.store.add(ProfileRecord(
+                id=profile_id,
+                mode=mode,
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code,
+                duration_ms=duration_ms,
+                created_at=time.time(),
+                filename=f"profile-{profile_id}.{profiler.extension}",
+                content_type=profiler.content_type,
+                data=data
+            ))
+            logger.info("Stored %s profile %s of %s %s", mode, profile_id, scope["method"], scope["path"])
+
+
+# Global profile store instance
+profile_store = ProfileStore(settings.profile_store_size, settings.profile_store_dir)
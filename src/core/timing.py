@@ -0,0 +1,88 @@
+"""Request-scoped timing spans reported in the Server-Timing header"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from core.tracing import trace_span
+
+
+class RequestTimings:
+    """
+    Named durations recorded while handling one request.
+    
+    Spans with the same name accumulate, so a stage that runs several
+    times (one upstream call per batch) reports its total time and count.
+    Concurrent spans are summed, so a stage can exceed the wall time.
+    """
+    
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.endpoint_done: Optional[float] = None
+    
+    def add(self, name: str, ms: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + ms
+        self.counts[name] = self.counts.get(name, 0) + 1
+    
+    def server_timing(self, total_ms: Optional[float] = None) -> str:
+        """
+        Format the spans as a Server-Timing header value.
+        
+        Args:
+            total_ms: Wall time of the request, reported as "total"
+        
+        Returns:
+            e.g. 'parse;dur=12.4, upstream;desc="3 calls";dur=812.0, total;dur=830.1'
+        """
+        entries: List[str] = []
+        for name, ms in self.spans.items():
+            count = self.counts[name]
+            desc = f';desc="{count} calls"' if count > 1 else ""
+            entries.append(f"{name}{desc};dur={ms:.1f}")
+        if total_ms is not None:
+            entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def request_timings() -> Iterator[RequestTimings]:
+    """Collect spans recorded while the block runs"""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, if any"""
+    return _current.get()
+
+
+def record(name: str, ms: float) -> None:
+    """Add a duration to the current request's span; a no-op outside a request"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, ms)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time a block as a named span of the current request.
+    
+    Works in sync and async code; tasks and threads started from the
+    request inherit its timings through the context. When the request
+    is traced the block is also a trace span of the same name.
+    """
+    start = time.perf_counter()
+    try:
+        with trace_span(name):
+            yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
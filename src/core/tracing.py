@@ -0,0 +1,353 @@
+"""Request tracing with spans exported as OTLP JSON lines"""
+import atexit
+import functools
+import inspect
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Reported as service.name on every exported trace
+SERVICE_NAME = "lexy-ai"
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_CODE_ERROR = 2
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Trace:
+    """Spans of one request, kept until the request ends and the trace is sampled or dropped"""
+    
+    __slots__ = ("trace_id", "sampled", "spans")
+    
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+
+
+class Span:
+    """A timed operation within a trace"""
+    
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+    
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        parent_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None
+    ):
+        self.trace = trace
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+        trace.spans.append(self)
+    
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+    
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        """The span in the OTLP/JSON encoding"""
+        encoded = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()
+            ]
+        }
+        if self.error is not None:
+            encoded["status"] = {"code": STATUS_CODE_ERROR, "message": self.error}
+        return encoded
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def parse_traceparent(header: str) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C traceparent header.
+    
+    Returns:
+        (trace_id, parent_span_id, sampled), or None if malformed
+    """
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def encode_traces(spans: List[Span]) -> str:
+    """Encode finished spans as one OTLP ExportTraceServiceRequest JSON document"""
+    return json.dumps({
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+            },
+            "scopeSpans": [{
+                "scope": {"name": SERVICE_NAME},
+                "spans": [span.to_otlp() for span in spans if span.end_ns is not None]
+            }]
+        }]
+    }, separators=(",", ":"), default=str)
+
+
+class TraceExporter:
+    """
+    Write finished traces from a background thread.
+    
+    Each trace is appended to a JSONL file as one OTLP/JSON export
+    request (the format read by the OpenTelemetry Collector's
+    otlpjsonfile receiver) and/or POSTed to an OTLP/HTTP endpoint.
+    Export failures are logged and never reach requests.
+    """
+    
+    def __init__(self, path: Optional[str] = None, endpoint: Optional[str] = None, timeout: float = 2.0):
+        self.path = path
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(spans)
+    
+    def _run(self) -> None:
+        output = open(self.path, "a", encoding="utf-8") if self.path else None
+        try:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    break
+                line = encode_traces(spans)
+                if output is not None:
+                    output.write(line + "\n")
+                    output.flush()
+                if self.endpoint:
+                    self._post(line)
+        finally:
+            if output is not None:
+                output.close()
+    
+    def _post(self, body: str) -> None:
+        import urllib.request
+        
+        request = urllib.request.Request(
+            self.endpoint,
+            data=body.encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except Exception as e:
+            logger.warning("Trace export to %s failed: %s", self.endpoint, e)
+    
+    def shutdown(self) -> None:
+        """Export queued traces and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=self.timeout + 1)
+
+
+class Tracer:
+    """
+    Start request traces and decide which ones to export.
+    
+    Spans are collected for every request while tracing is enabled, and
+    the decision is made when the request ends: a trace is exported if
+    it was sampled up front (TRACING_SAMPLE_RATE, or the sampled flag of
+    an incoming traceparent), took longer than TRACING_SLOW_MS, or
+    recorded an error. Slow and failed requests are therefore always
+    kept, which is what tail-latency investigations need.
+    """
+    
+    def __init__(
+        self,
+        exporter: Optional[TraceExporter],
+        sample_rate: float = 0.0,
+        slow_ms: Optional[float] = None
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+    
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+    
+    def _keep(self, trace: Trace, root: Span) -> bool:
+        if trace.sampled:
+            return True
+        if self.slow_ms is not None and root.duration_ms >= self.slow_ms:
+            return True
+        return any(span.error is not None for span in trace.spans)
+    
+    @contextmanager
+    def trace(self, name: str, traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Run the block as the root span of a new trace.
+        
+        Args:
+            name: Root span name
+            traceparent: Incoming W3C traceparent header to continue
+            **attributes: Root span attributes
+        
+        Yields:
+            The root span, or None when tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+        
+        parent = parse_traceparent(traceparent) if traceparent else None
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id, sampled = _new_id(128), None, False
+        trace = Trace(trace_id, sampled or random.random() < self.sample_rate)
+        
+        root = Span(trace, name, parent_id, SPAN_KIND_SERVER, attributes)
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            root.end()
+            if self._keep(trace, root):
+                self.exporter.export(list(trace.spans))
+    
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def current_span() -> Optional[Span]:
+    """The innermost span of the current request, if it is being traced"""
+    return _current_span.get()
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a child of the current span.
+    
+    A no-op yielding None outside a traced request. Tasks and threads
+    started inside the block inherit it as their parent.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    
+    span = Span(parent.trace, name, parent.span_id, attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+    """Add an already finished span under the current one, e.g. for work spread over an iterator"""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    span = Span(parent.trace, name, parent.span_id, attributes=attributes, start_ns=start_ns)
+    span.end_ns = end_ns
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorate a function or coroutine function to run inside trace_span(name)"""
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with trace_span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with trace_span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _build_tracer() -> Tracer:
+    exporter = None
+    if settings.tracing_file or settings.tracing_otlp_endpoint:
+        exporter = TraceExporter(settings.tracing_file, settings.tracing_otlp_endpoint)
+    return Tracer(exporter, settings.tracing_sample_rate, settings.tracing_slow_ms)
+
+
+# Global tracer instance
+tracer = _build_tracer()
+atexit.register(tracer.shutdown)
@@ -10,30 +10,47 @@ src_dir = Path(__file__).parent
 if str(src_dir) not in sys.path:
     sys.path.insert(0, str(src_dir))
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import settings
+from core.logging_config import configure_logging
+from core.tracing import tracer
 from core.exceptions import (
     LexyAIException,
     lexyai_exception_handler,
     general_exception_handler
 )
-from core.middleware import LoggingMiddleware
-from api.routes import simplify_router, tts_router, larf_router
+from core.middleware import LoggingMiddleware, UploadSizeLimitMiddleware
+from core.profiling import ProfilingMiddleware
+from api.dependencies import registry
+from api.routes import simplify_router, tts_router, larf_router, metrics_router, admin_router
 from api.schemas import HealthResponse
 
-# Configure logging
-logging.basicConfig(
+# Configure logging: formatted and written off the event loop
+configure_logging(
     level=settings.log_level,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
+    log_format=settings.log_format,
+    sample_rates=settings.log_sample_rates_map
 )
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build services (warming them in the background) and release their resources on shutdown"""
+    await registry.startup(warm_up=settings.warm_up_on_startup)
+    try:
+        yield
+    finally:
+        await registry.shutdown()
+        await asyncio.to_thread(tracer.shutdown)
+
 # Create FastAPI app
 app = FastAPI(
     title="Lexy-AI v2",
@@ -41,9 +58,13 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
+# Reject oversize uploads from their declared size, or while a chunked body arrives
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -53,6 +74,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profile requests on demand; not installed at all without an admin token
+if settings.admin_token:
+    app.add_middleware(ProfilingMiddleware)
+
 # Add custom middleware
 app.add_middleware(LoggingMiddleware)
 
@@ -64,6 +89,8 @@ app.add_exception_handler(Exception, general_exception_handler)
 app.include_router(simplify_router)
 app.include_router(tts_router)
 app.include_router(larf_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
 
 
 @app.get("/", response_model=dict)
@@ -79,6 +106,7 @@ async def root():
             "docs": "/docs",
             "redoc": "/redoc",
             "health": "/health",
+            "metrics": "/metrics",
             "simplify_text": "/simplify/text",
             "simplify_file": "/simplify/file",
             "simplify_modes": "/simplify/modes",
@@ -108,10 +136,9 @@ application = app
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        log_level="info"
-    )
+    # Self-hosted: pre-forked workers, configured with SERVER_* settings. The
+    # server imports the app as "main"; reuse this module instead of a second copy
+    sys.modules.setdefault("main", sys.modules["__main__"])
+    from server import main
+    
+    sys.exit(main())
@@ -0,0 +1,376 @@
+"""Production server for self-hosted deployments
+
+A pre-fork master binds the listening socket, imports the application
+once (so workers share its memory copy-on-write and start fast) and forks
+uvicorn workers that accept on the shared socket. Workers are recycled
+after a number of requests or when their memory passes a threshold, and
+replaced one for one when they exit.
+
+Signals to the master:
+    SIGHUP           start a fresh set of workers, then gracefully stop the old ones
+    SIGTERM, SIGINT  gracefully stop all workers and exit
+    SIGTTIN, SIGTTOU add or remove a worker
+
+Usage:
+    python src/server.py --workers 4 --max-requests 5000 --max-rss-mb 700
+"""
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_dir = Path(__file__).parent
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+import argparse
+import errno
+import importlib.util
+import logging
+import math
+import os
+import random
+import select
+import signal
+import socket
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger("server")
+
+# Worker exit code when the application could not be imported or started;
+# the master stops instead of restarting workers in a loop
+WORKER_BOOT_ERROR = 3
+
+# Master loop wake-up interval when no signal arrives
+MASTER_TICK_SECONDS = 1.0
+
+# Workers check their memory every this many uvicorn ticks (0.1 s each)
+RSS_CHECK_TICKS = 50
+
+# Parse pool size per worker is capped here, as for a single process
+MAX_PARSER_WORKERS = 4
+
+MASTER_SIGNALS = (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD, signal.SIGTTIN, signal.SIGTTOU) \
+    if hasattr(signal, "SIGHUP") else ()
+
+
+@dataclass
+class ServerOptions:
+    """Launcher settings; defaults come from the SERVER_* environment variables"""
+    host: str = field(default_factory=lambda: settings.server_host)
+    port: int = field(default_factory=lambda: settings.server_port)
+    workers: int = field(default_factory=lambda: settings.server_workers or os.cpu_count() or 1)
+    preload: bool = field(default_factory=lambda: settings.server_preload)
+    max_requests: int = field(default_factory=lambda: settings.server_max_requests)
+    max_requests_jitter: int = field(default_factory=lambda: settings.server_max_requests_jitter)
+    max_rss_mb: float = field(default_factory=lambda: settings.server_max_rss_mb)
+    graceful_timeout: float = field(default_factory=lambda: settings.server_graceful_timeout_seconds)
+
+
+def event_loop_and_parser() -> tuple:
+    """The event loop and HTTP parser uvicorn's "auto" settings will pick"""
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+
+def load_app():
+    """Import the application (a no-op in workers when the master preloaded it)"""
+    from main import app
+    
+    return app
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker_server_class():
+    import uvicorn
+    
+    from core.middleware import process_memory_mb
+    
+    class WorkerServer(uvicorn.Server):
+        """uvicorn server that also exits once its memory passes max_rss_mb"""
+        
+        max_rss_mb = 0.0
+        
+        async def on_tick(self, counter: int) -> bool:
+            if await super().on_tick(counter):
+                return True
+            if self.max_rss_mb and counter % RSS_CHECK_TICKS == 0:
+                memory_mb = process_memory_mb()
+                if memory_mb > self.max_rss_mb:
+                    logger.info("Worker using %.0f MB (limit %.0f MB), recycling", memory_mb, self.max_rss_mb)
+                    return True
+            return False
+    
+    return WorkerServer
+
+
+def run_worker(sock: socket.socket, options: ServerOptions) -> int:
+    """
+    Serve requests in a forked worker until it is stopped or recycled.
+    
+    Returns:
+        Exit code: 0 after a normal or recycling shutdown, WORKER_BOOT_ERROR
+        when the application could not start
+    """
+    random.seed()  # Forked workers would otherwise share the master's sequence
+    
+    # Split the CPUs between the workers' parse pools
+    if settings.parser_workers is None:
+        settings.parser_workers = max(1, min(MAX_PARSER_WORKERS, (os.cpu_count() or 1) // options.workers))
+    
+    try:
+        import uvicorn
+        
+        app = load_app()
+        config = uvicorn.Config(
+            app,
+            loop="auto",  # uvloop when installed
+            http="auto",  # httptools when installed
+            lifespan="on",
+            log_config=None,  # Keep the application's queued logging
+            access_log=False,  # LoggingMiddleware already logs each request
+            timeout_graceful_shutdown=math.ceil(options.graceful_timeout),
+            limit_max_requests=(
+                options.max_requests + random.randint(0, options.max_requests_jitter)
+                if options.max_requests else None
+            )
+        )
+        server = _worker_server_class()(config)
+        server.max_rss_mb = options.max_rss_mb
+    except Exception:
+        logger.exception("Worker %s failed to load the application", os.getpid())
+        return WORKER_BOOT_ERROR
+    
+    # uvicorn handles SIGINT and SIGTERM while serving, then re-raises them;
+    # ignoring them afterwards lets the worker exit through its own cleanup
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    try:
+        server.run(sockets=[sock])
+    except SystemExit:
+        return WORKER_BOOT_ERROR  # uvicorn exits when lifespan startup fails
+    return 0 if server.started else WORKER_BOOT_ERROR
+
+
+@dataclass
+class Worker:
+    pid: int
+    started_at: float
+    stopping_since: Optional[float] = None  # Set once the master asked it to stop
+
+
+class Master:
+    """Keep options.workers uvicorn workers running on a shared socket"""
+    
+    def __init__(self, options: ServerOptions):
+        self.options = options
+        self.workers: Dict[int, Worker] = {}
+        self.target = max(1, options.workers)
+        self.stopping = False
+        self.exit_code = 0
+        self._sock: Optional[socket.socket] = None
+        self._wakeup_r = self._wakeup_w = -1
+    
+    def run(self) -> int:
+        self._sock = bind_socket(self.options.host, self.options.port)
+        if self.options.preload:
+            load_app()
+        
+        loop, http = event_loop_and_parser()
+        logger.info(
+            "Serving on %s:%s with %s workers (pid %s, loop=%s, http=%s, preload=%s)",
+            self.options.host, self.options.port, self.target, os.getpid(), loop, http, self.options.preload
+        )
+        self._install_signals()
+        try:
+            while not (self.stopping and not self.workers):
+                self._reap()
+                if not self.stopping:
+                    self._spawn_missing()
+                self._kill_overdue()
+                for signum in self._wait_for_signals(MASTER_TICK_SECONDS):
+                    self._handle_signal(signum)
+        finally:
+            self._stop_all(signal.SIGKILL)
+            self._sock.close()
+            logger.info("Server stopped")
+        return self.exit_code
+    
+    def _install_signals(self) -> None:
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        signal.set_wakeup_fd(self._wakeup_w)
+        for signum in MASTER_SIGNALS:
+            signal.signal(signum, lambda *_: None)  # Delivered through the wake-up pipe
+    
+    def _wait_for_signals(self, timeout: float) -> List[int]:
+        try:
+            ready, _, _ = select.select([self._wakeup_r], [], [], timeout)
+        except InterruptedError:
+            ready = [self._wakeup_r]
+        if not ready:
+            return []
+        try:
+            return list(os.read(self._wakeup_r, 64))
+        except BlockingIOError:
+            return []
+    
+    def _handle_signal(self, signum: int) -> None:
+        if signum in (signal.SIGTERM, signal.SIGINT) and not self.stopping:
+            logger.info("Received %s, stopping %s workers", signal.Signals(signum).name, len(self.workers))
+            self.stopping = True
+            self._stop_all(signal.SIGTERM)
+        elif signum == signal.SIGHUP and not self.stopping:
+            self._reload()
+        elif signum == signal.SIGTTIN:
+            self.target += 1
+            logger.info("Increased workers to %s", self.target)
+        elif signum == signal.SIGTTOU and self.target > 1:
+            self.target -= 1
+            logger.info("Decreased workers to %s", self.target)
+            self._stop_surplus()
+    
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = Worker(pid=pid, started_at=time.monotonic())
+            return
+        
+        # Worker: drop the master's signal handling and serve until stopped
+        code = WORKER_BOOT_ERROR
+        try:
+            signal.set_wakeup_fd(-1)
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
+            for signum in MASTER_SIGNALS:
+                signal.signal(signum, signal.SIG_DFL)
+            code = run_worker(self._sock, self.options)
+        except BaseException:
+            logger.exception("Worker %s crashed", os.getpid())
+        finally:
+            from core.logging_config import stop_logging
+            
+            stop_logging()
+            os._exit(code)
+    
+    def _spawn_missing(self) -> None:
+        running = sum(1 for worker in self.workers.values() if worker.stopping_since is None)
+        for _ in range(self.target - running):
+            self._spawn()
+    
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if worker.stopping_since is not None or self.stopping:
+                logger.info("Worker %s stopped", pid)
+            elif code == WORKER_BOOT_ERROR:
+                logger.error("Worker %s failed to start, shutting down", pid)
+                self.exit_code = WORKER_BOOT_ERROR
+                self.stopping = True
+                self._stop_all(signal.SIGTERM)
+            elif code == 0:
+                logger.info("Worker %s recycled after %.0fs", pid, time.monotonic() - worker.started_at)
+            else:
+                logger.warning("Worker %s exited with code %s, replacing it", pid, code)
+    
+    def _reload(self) -> None:
+        """Start a new set of workers, then stop the old ones once they're up"""
+        old = [worker for worker in self.workers.values() if worker.stopping_since is None]
+        logger.info("Reloading: replacing %s workers", len(old))
+        for worker in old:
+            worker.stopping_since = time.monotonic()  # Excluded from the running count
+        self._spawn_missing()
+        for worker in old:
+            self._signal(worker, signal.SIGTERM)
+    
+    def _stop_surplus(self) -> None:
+        running = [worker for worker in self.workers.values() if worker.stopping_since is None]
+        for worker in sorted(running, key=lambda w: w.started_at)[:max(0, len(running) - self.target)]:
+            worker.stopping_since = time.monotonic()
+            self._signal(worker, signal.SIGTERM)
+    
+    def _stop_all(self, signum: int) -> None:
+        now = time.monotonic()
+        for worker in list(self.workers.values()):
+            if worker.stopping_since is None:
+                worker.stopping_since = now
+            self._signal(worker, signum)
+    
+    def _kill_overdue(self) -> None:
+        """Kill workers still running well after they were asked to stop"""
+        # uvicorn's own graceful timeout covers requests; this covers lifespan shutdown
+        deadline = time.monotonic() - self.options.graceful_timeout - 5
+        for worker in list(self.workers.values()):
+            if worker.stopping_since is not None and worker.stopping_since < deadline:
+                logger.warning("Worker %s did not stop in time, killing it", worker.pid)
+                self._signal(worker, signal.SIGKILL)
+    
+    def _signal(self, worker: Worker, signum: int) -> None:
+        try:
+            os.kill(worker.pid, signum)
+        except OSError as e:
+            if e.errno != errno.ESRCH:
+                raise
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = ServerOptions()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=defaults.preload,
+                        help="import the app in the master before forking (--no-preload: SIGHUP reloads code)")
+    parser.add_argument("--max-requests", type=int, default=defaults.max_requests)
+    parser.add_argument("--max-requests-jitter", type=int, default=defaults.max_requests_jitter)
+    parser.add_argument("--max-rss-mb", type=float, default=defaults.max_rss_mb)
+    parser.add_argument("--graceful-timeout", type=float, default=defaults.graceful_timeout)
+    args = parser.parse_args(argv)
+    options = ServerOptions(**vars(args))
+    
+    if not hasattr(os, "fork"):
+        # No fork (Windows): a single uvicorn process
+        import uvicorn
+        
+        uvicorn.run(load_app(), host=options.host, port=options.port, log_config=None)
+        return 0
+    
+    if not settings.shared_cache_path:
+        # Workers, and the workers replacing recycled ones, share one cache; per port,
+        # so separate servers on a host don't mix results
+        settings.shared_cache_path = os.path.join(tempfile.gettempdir(), f"lexy-cache-{options.port}.sqlite3")
+    
+    if not options.preload:
+        # Workers configure logging when they import the app
+        from core.logging_config import configure_logging
+        
+        configure_logging(settings.log_level, settings.log_format, settings.log_sample_rates_map)
+    return Master(options).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
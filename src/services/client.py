@@ -0,0 +1,98 @@
+"""Shared upstream client"""
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _gemini_client():
+    from google import genai  # Deferred to keep cold starts light
+    
+    return genai.Client(api_key=settings.gemini_api_key)
+
+
+def _fake_client():
+    from services.fake_upstream import FakeGeminiClient
+    
+    return FakeGeminiClient.from_settings()
+
+
+# Upstream backends selectable with UPSTREAM_BACKEND. A backend is any object
+# offering the part of genai.Client the services use: aio.models.generate_content,
+# count_tokens and get, aio.caches.create, aio.aclose() and close().
+UPSTREAM_BACKENDS: Dict[str, Callable[[], Any]] = {
+    "gemini": _gemini_client,
+    "fake": _fake_client
+}
+
+
+def upstream_backend() -> Callable[[], Any]:
+    """The configured backend's client factory; raises ValueError for an unknown UPSTREAM_BACKEND"""
+    backend = UPSTREAM_BACKENDS.get(settings.upstream_backend.lower())
+    if backend is None:
+        raise ValueError(
+            f"Unknown UPSTREAM_BACKEND {settings.upstream_backend!r}, "
+            f"expected one of {sorted(UPSTREAM_BACKENDS)}"
+        )
+    return backend
+
+
+def get_client():
+    """
+    Get the process-wide upstream client, creating it on first use.
+    
+    All services share one client so they share its connection pool.
+    Creation is guarded by a lock, so concurrent first calls from threads
+    or tasks build exactly one client.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = upstream_backend()()
+    return _client
+
+
+async def warm_up_client(model: str, timeout: Optional[float] = None) -> bool:
+    """
+    Open the upstream connection ahead of the first request.
+    
+    Fetches the model's metadata, which completes the DNS lookup and TLS
+    handshake on the client's async pool. Failures are logged, not raised:
+    a cold connection only costs the first request some latency.
+    
+    Args:
+        model: Model to look up
+        timeout: Seconds to wait before giving up
+    
+    Returns:
+        True if the connection was established
+    """
+    try:
+        await asyncio.wait_for(get_client().aio.models.get(model=model), timeout)
+        return True
+    except Exception as e:
+        logger.warning("Upstream warm-up failed: %s", e)
+        return False
+
+
+async def close_client() -> None:
+    """Close the shared client's connection pools"""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is None:
+        return
+    
+    try:
+        await client.aio.aclose()
+        client.close()
+    except Exception as e:
+        logger.warning("Failed to close upstream client: %s", e)
@@ -0,0 +1,179 @@
+"""Registry of upstream cached-content handles for static prompt prefixes"""
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from core.config import settings
+from utils.tokens import token_estimator
+
+logger = logging.getLogger(__name__)
+
+# Refresh handles this long before the provider expires them
+EXPIRY_MARGIN_SECONDS = 60
+
+# After a failed registration, wait this long before trying again
+RETRY_AFTER_FAILURE_SECONDS = 600
+
+
+@dataclass
+class CacheHandle:
+    """A registered cached-content entry"""
+    name: str
+    model: str
+    expires_at: float
+    
+    @property
+    def is_fresh(self) -> bool:
+        return self.expires_at - EXPIRY_MARGIN_SECONDS > time.time()
+
+
+class ContextCacheRegistry:
+    """
+    Track cached-content handles for system instructions.
+    
+    Each distinct (model, system instruction) pair is registered once with
+    the provider's cached-content API and reused until shortly before it
+    expires. Prefixes below the provider's minimum cacheable size, or that
+    fail to register, fall back to an inline system instruction.
+    """
+    
+    def __init__(self):
+        self._handles: Dict[Tuple[str, str], CacheHandle] = {}
+        self._failures: Dict[Tuple[str, str], float] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+    
+    @staticmethod
+    def _key(model: str, system_instruction: str) -> Tuple[str, str]:
+        digest = hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()
+        return model, digest
+    
+    def _cacheable(self, key: Tuple[str, str], system_instruction: str) -> bool:
+        if not settings.context_cache_enabled:
+            return False
+        failed_at = self._failures.get(key)
+        if failed_at and time.time() - failed_at < RETRY_AFTER_FAILURE_SECONDS:
+            return False
+        return token_estimator.estimate(system_instruction) >= settings.context_cache_min_tokens
+    
+    async def get_handle(
+        self,
+        client,
+        model: str,
+        system_instruction: str
+    ) -> Optional[CacheHandle]:
+        """
+        Get a fresh cache handle for a system instruction, registering it if needed.
+        
+        Returns:
+            The cache handle, or None when the prefix should be sent inline
+        """
+        key = self._key(model, system_instruction)
+        handle = self._handles.get(key)
+        if handle and handle.is_fresh:
+            return handle
+        
+        if not self._cacheable(key, system_instruction):
+            return None
+        
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another task may have registered it while we waited
+            handle = self._handles.get(key)
+            if handle and handle.is_fresh:
+                return handle
+            
+            from google.genai import types
+            
+            ttl = settings.context_cache_ttl_seconds
+            try:
+                cached = await client.aio.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        display_name=f"lexy-{key[1][:16]}",
+                        system_instruction=system_instruction,
+                        ttl=f"{ttl}s"
+                    )
+                )
+            except Exception as e:
+                logger.warning("Context cache registration failed, sending prefix inline: %s", e)
+                self._failures[key] = time.time()
+                return None
+            
+            expires_at = time.time() + ttl
+            if cached.expire_time:
+                expires_at = cached.expire_time.timestamp()
+            
+            handle = CacheHandle(name=cached.name, model=model, expires_at=expires_at)
+            self._handles[key] = handle
+            self._failures.pop(key, None)
+            logger.info("Registered context cache %s for %s", handle.name, model)
+            return handle
+    
+    def invalidate(self, name: str) -> None:
+        """Drop a handle the provider no longer recognises"""
+        for key, handle in list(self._handles.items()):
+            if handle.name == name:
+                del self._handles[key]
+    
+    def stats(self) -> dict:
+        """Summary of registered handles"""
+        return {
+            "handles": len(self._handles),
+            "fresh": sum(1 for h in self._handles.values() if h.is_fresh),
+            "failed": len(self._failures)
+        }
+
+
+# Global registry instance
+context_cache = ContextCacheRegistry()
+
+
+async def generate_with_cached_prefix(
+    client,
+    model: str,
+    contents: str,
+    system_instruction: str,
+    **config
+):
+    """
+    Call generate_content with the system instruction served from cache when possible.
+    
+    If the provider rejects a cached handle (for example because it expired
+    early), the handle is dropped and the call is retried with the
+    instruction inline.
+    
+    Args:
+        client: Gemini client
+        model: Model name
+        contents: Per-request user content
+        system_instruction: Static prompt prefix
+        **config: Extra GenerateContentConfig fields
+    
+    Returns:
+        The generate_content response
+    """
+    from google.genai import types  # Deferred to keep cold starts light
+    
+    handle = await context_cache.get_handle(client, model, system_instruction)
+    
+    if handle is not None:
+        try:
+            return await client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=types.GenerateContentConfig(cached_content=handle.name, **config)
+            )
+        except Exception as e:
+            if "cache" not in str(e).lower():
+                raise
+            logger.warning("Cached prefix %s rejected, retrying inline: %s", handle.name, e)
+            context_cache.invalidate(handle.name)
+    
+    return await client.aio.models.generate_content(
+        model=model,
+        contents=contents,
+        config=types.GenerateContentConfig(system_instruction=system_instruction, **config)
+    )
@@ -0,0 +1,204 @@
+"""In-process stand-in for the Gemini client, for load tests and offline runs"""
+import asyncio
+import itertools
+import math
+import random
+import struct
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Tuple
+
+from core.config import settings
+
+# Speech pace of the synthetic audio, matching the timestamp heuristics
+WORDS_PER_SECOND = 2.5
+
+# 16-bit mono PCM at the TTS model's sample rate
+SAMPLE_RATE = 24000
+
+# Words per chunk and delay between chunks of a streamed response
+STREAM_CHUNK_WORDS = 20
+STREAM_CHUNK_INTERVAL_SECONDS = 0.02
+
+_tone: Optional[bytes] = None
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    Upstream latency in milliseconds.
+    
+    Parsed from "fixed:MS", "uniform:LOW,HIGH" or "lognormal:MEDIAN,SIGMA";
+    lognormal gives the long right tail real model latency has.
+    """
+    kind: str
+    params: Tuple[float, ...]
+    
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, _, values = spec.partition(":")
+        kind = kind.strip().lower()
+        params = tuple(float(value) for value in values.split(",") if value.strip())
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if expected.get(kind) != len(params):
+            raise ValueError(f"Invalid latency distribution: {spec!r}")
+        return cls(kind, params)
+    
+    def sample_seconds(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        else:
+            median, sigma = self.params
+            ms = rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+        return max(0.0, ms) / 1000
+
+
+def synthetic_pcm(seconds: float) -> bytes:
+    """A 220 Hz tone of the given length as mono 24 kHz 16-bit PCM"""
+    global _tone
+    if _tone is None:
+        _tone = b"".join(
+            struct.pack("<h", int(8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)))
+            for i in range(SAMPLE_RATE)
+        )
+    samples = int(seconds * SAMPLE_RATE)
+    whole, rest = divmod(samples, SAMPLE_RATE)
+    return _tone * whole + _tone[:rest * 2]
+
+
+class _FakeModels:
+    def __init__(self, upstream: "FakeGeminiClient"):
+        self._upstream = upstream
+    
+    async def generate_content(self, model: str, contents, config=None):
+        await self._upstream._respond(model)
+        modalities = getattr(config, "response_modalities", None) or []
+        if any(str(modality).upper().endswith("AUDIO") for modality in modalities):
+            return _audio_response(str(contents))
+        return _text_response(str(contents))
+    
+    async def generate_content_stream(self, model: str, contents, config=None) -> AsyncIterator:
+        """Stream the echoed text in chunks; the first arrives after the sampled latency"""
+        await self._upstream._respond(model)
+        words = str(contents).split(" ")
+        
+        async def chunks():
+            for start in range(0, len(words), STREAM_CHUNK_WORDS):
+                if start:
+                    await asyncio.sleep(STREAM_CHUNK_INTERVAL_SECONDS)
+                text = " ".join(words[start:start + STREAM_CHUNK_WORDS])
+                yield _text_response(text if start == 0 else " " + text)
+        
+        return chunks()
+    
+    async def count_tokens(self, model: str, contents):
+        from google.genai import types
+        
+        return types.CountTokensResponse(total_tokens=max(1, len(str(contents)) // 4))
+    
+    async def get(self, model: str):
+        from google.genai import types
+        
+        return types.Model(name=f"models/{model}")
+
+
+class _FakeCaches:
+    def __init__(self, upstream: "FakeGeminiClient"):
+        self._upstream = upstream
+    
+    async def create(self, model: str, config=None):
+        from google.genai import types
+        
+        await self._upstream._respond(model)
+        return types.CachedContent(name=f"cachedContents/fake-{next(self._upstream._ids)}", model=model)
+
+
+class _FakeAio:
+    def __init__(self, upstream: "FakeGeminiClient"):
+        self.models = _FakeModels(upstream)
+        self.caches = _FakeCaches(upstream)
+    
+    async def aclose(self) -> None:
+        pass
+
+
+def _text_response(text: str):
+    from google.genai import types
+    
+    return types.GenerateContentResponse(candidates=[
+        types.Candidate(content=types.Content(role="model", parts=[types.Part(text=text)]))
+    ])
+
+
+def _audio_response(text: str):
+    from google.genai import types
+    
+    seconds = max(0.5, len(text.split()) / WORDS_PER_SECOND)
+    blob = types.Blob(mime_type=f"audio/L16;codec=pcm;rate={SAMPLE_RATE}", data=synthetic_pcm(seconds))
+    return types.GenerateContentResponse(candidates=[
+        types.Candidate(content=types.Content(role="model", parts=[types.Part(inline_data=blob)]))
+    ])
+
+
+class FakeGeminiClient:
+    """
+    Answers the calls the services make on a genai.Client, without a network.
+    
+    Text generation echoes the contents (so batch markers survive and
+    output length tracks input), speech returns a tone as long as the
+    text would take to read, and every call waits for a latency drawn
+    from the configured distribution. A share of calls can fail with a
+    429 (RESOURCE_EXHAUSTED) or a 500, raised as the same google.genai
+    errors the real client raises.
+    """
+    
+    def __init__(
+        self,
+        latency: LatencyDistribution = LatencyDistribution("fixed", (0.0,)),
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self.aio = _FakeAio(self)
+    
+    @classmethod
+    def from_settings(cls) -> "FakeGeminiClient":
+        return cls(
+            latency=LatencyDistribution.parse(settings.fake_upstream_latency),
+            error_rate=settings.fake_upstream_error_rate,
+            rate_limit_rate=settings.fake_upstream_rate_limit_rate,
+            seed=settings.fake_upstream_seed
+        )
+    
+    async def _respond(self, model: str) -> None:
+        """Wait out the sampled latency, then fail if this call drew an injected error"""
+        from google.genai import errors
+        
+        self.calls += 1
+        delay = self.latency.sample_seconds(self._rng)
+        roll = self._rng.random()
+        if delay:
+            await asyncio.sleep(delay)
+        
+        if roll < self.rate_limit_rate:
+            raise errors.ClientError(429, {"error": {
+                "code": 429,
+                "message": f"Resource has been exhausted (fake upstream, {model})",
+                "status": "RESOURCE_EXHAUSTED"
+            }})
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise errors.ServerError(500, {"error": {
+                "code": 500,
+                "message": f"Internal error (fake upstream, {model})",
+                "status": "INTERNAL"
+            }})
+    
+    def close(self) -> None:
+        pass
@@ -1,5 +1,7 @@
+from functools import lru_cache
 from typing import Optional
 
+@lru_cache(maxsize=128)
 def get_larf_system_prompt(custom_focus: Optional[str] = None) -> str:
     """
     Generate the system prompt for LARF annotation.
@@ -1,27 +1,87 @@
 import time
+import asyncio
+import hashlib
 import logging
-from google import genai
-from google.genai import types
+from typing import AsyncIterable, List
 
 from core.config import settings
-from core.exceptions import LLMTimeoutException, ValidationException
+from core.metrics import track_upstream
+from core.timing import span
+from core.tracing import traced
+from core.exceptions import (
+    LexyAIException,
+    LLMTimeoutException,
+    TokenLimitException,
+    ValidationException,
+    validate_text_length
+)
 from services.larf.prompts import get_larf_system_prompt
+from services.context_cache import generate_with_cached_prefix
+from services.client import get_client
+from utils.tokens import token_estimator, check_input_tokens, batch_paragraphs
+from utils.shared_cache import shared_cache
 
 logger = logging.getLogger(__name__)
 
+LARF_MODEL = "gemini-2.0-flash-lite"
+
+# Expected output tokens per input token. The text is returned verbatim with
+# <strong>, <mark> and <u> tags injected around entities and key points.
+OUTPUT_TOKEN_RATIO = 1.4
+
 class LarfService:
     """Service for LARF text annotation"""
     
-    def __init__(self):
-        self._client = None
+    def __init__(self, client=None):
+        self._client = client
     
     @property
     def client(self):
-        """Lazy load the Gemini client"""
+        """Gemini client (the shared one unless injected)"""
         if self._client is None:
-            self._client = genai.Client(api_key=settings.gemini_api_key)
+            self._client = get_client()
         return self._client
     
+    def prerender_prompts(self) -> int:
+        """Render the default annotation prompt; returns the number rendered"""
+        get_larf_system_prompt(None)
+        return 1
+    
+    async def _annotate_chunk(self, text: str, system_prompt: str) -> str:
+        """Annotate a chunk, reusing (or waiting for) another worker's result through the host-wide cache"""
+        key = "larf:" + hashlib.sha256(f"{LARF_MODEL}\0{system_prompt}\0{text}".encode("utf-8")).hexdigest()
+        return await shared_cache.get_or_compute(key, lambda: self._annotate_upstream(text, system_prompt))
+    
+    async def _annotate_upstream(self, text: str, system_prompt: str) -> str:
+        """Annotate a single chunk with an output budget sized to its input"""
+        max_output_tokens = token_estimator.output_budget(
+            token_estimator.estimate(text), LARF_MODEL, OUTPUT_TOKEN_RATIO
+        )
+        
+        # Using flash model for speed as this is a formatting task
+        with span("upstream"), track_upstream(LARF_MODEL):
+            response = await generate_with_cached_prefix(
+                self.client,
+                LARF_MODEL,
+                contents=text,
+                system_instruction=system_prompt,
+                temperature=0.0, # Zero temperature for consistent formatting
+                max_output_tokens=max_output_tokens
+            )
+        
+        annotated_html = response.text.strip()
+        
+        # Basic cleanup if model included markdown blocks despite instructions
+        if annotated_html.startswith("```html"):
+            annotated_html = annotated_html[7:]
+        if annotated_html.startswith("```"):
+            annotated_html = annotated_html[3:]
+        if annotated_html.endswith("```"):
+            annotated_html = annotated_html[:-3]
+        
+        return annotated_html.strip()
+    
+    @traced("larf.annotate_text")
     async def annotate_text(self, text: str, custom_focus: str = None) -> tuple[str, float]:
         """
         Annotate text with dyslexia-friendly HTML tags.
@@ -29,38 +89,89 @@ class LarfService:
         """
         start_time = time.time()
         
-        system_prompt = get_larf_system_prompt(custom_focus)
+        with span("prompt"):
+            system_prompt = get_larf_system_prompt(custom_focus)
+        
+        # Reject oversize input before calling upstream
+        await check_input_tokens(text, lambda: self.client, LARF_MODEL)
+        
+        # Split text whose annotated output would not fit in a single response
+        max_chunk_tokens = token_estimator.max_chunk_tokens(LARF_MODEL, OUTPUT_TOKEN_RATIO)
+        chunks = token_estimator.plan_chunks(text, max_chunk_tokens)
         
         try:
-            logger.info("Sending LARF annotation request to Gemini")
+            logger.info("Sending LARF annotation request to Gemini (%s chunk(s))", len(chunks))
             
-            # Using flash model for speed as this is a formatting task
-            response = self.client.models.generate_content(
-                model='gemini-2.0-flash-lite',
-                contents=text,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    temperature=0.0, # Zero temperature for consistent formatting
-                    max_output_tokens=8000
-                )
-            )
-            
-            annotated_html = response.text.strip()
-            
-            # Basic cleanup if model included markdown blocks despite instructions
-            if annotated_html.startswith("```html"):
-                annotated_html = annotated_html[7:]
-            if annotated_html.startswith("```"):
-                annotated_html = annotated_html[3:]
-            if annotated_html.endswith("```"):
-                annotated_html = annotated_html[:-3]
+            results = await asyncio.gather(*(
+                self._annotate_chunk(chunk, system_prompt) for chunk in chunks
+            ))
+            annotated_html = "\n\n".join(results)
                 
             processing_time_ms = (time.time() - start_time) * 1000
             
             return annotated_html.strip(), processing_time_ms
 
         except Exception as e:
-            logger.error(f"LARF annotation failed: {str(e)}")
+            logger.error("LARF annotation failed: %s", e)
             if "timeout" in str(e).lower():
                 raise LLMTimeoutException()
-            raise ValidationException(f"Annotation failed: {str(e)}")
\ No newline at end of file
+            raise ValidationException(f"Annotation failed: {str(e)}")
+    
+    @traced("larf.annotate_stream")
+    async def annotate_stream(
+        self,
+        parts: AsyncIterable[str],
+        custom_focus: str = None
+    ) -> tuple[str, str, float]:
+        """
+        Annotate a document while it is still being extracted.
+        
+        Paragraph batches are sent upstream as soon as they are complete and
+        the annotated chunks are joined in document order.
+        Returns: (original_text, annotated_html, processing_time_ms)
+        """
+        start_time = time.time()
+        
+        with span("prompt"):
+            system_prompt = get_larf_system_prompt(custom_focus)
+        max_chunk_tokens = token_estimator.max_chunk_tokens(LARF_MODEL, OUTPUT_TOKEN_RATIO)
+        
+        paragraphs: List[str] = []
+        tasks: List[asyncio.Task] = []
+        input_tokens = 0
+        
+        try:
+            async for batch in batch_paragraphs(parts, max_chunk_tokens):
+                input_tokens += sum(token_estimator.estimate(p) for p in batch)
+                if input_tokens > settings.max_input_tokens:
+                    raise TokenLimitException(input_tokens, settings.max_input_tokens)
+                
+                paragraphs.extend(batch)
+                # A single oversize paragraph is split further
+                for chunk in token_estimator.plan_chunks("\n\n".join(batch), max_chunk_tokens):
+                    tasks.append(asyncio.create_task(self._annotate_chunk(chunk, system_prompt)))
+            
+            # Batches only hold non-empty paragraphs, so an empty document is
+            # rejected here without any upstream call
+            validate_text_length("\n\n".join(paragraphs))
+            
+            logger.info("Sending LARF annotation request to Gemini (%s chunk(s), streamed)", len(tasks))
+            
+            results = await asyncio.gather(*tasks)
+        except (LexyAIException, asyncio.CancelledError):
+            # Parsing and token-limit errors keep their own status codes
+            for task in tasks:
+                task.cancel()
+            raise
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            logger.error("LARF annotation failed: %s", e)
+            if "timeout" in str(e).lower():
+                raise LLMTimeoutException()
+            raise ValidationException(f"Annotation failed: {str(e)}")
+        
+        annotated_html = "\n\n".join(results)
+        processing_time_ms = (time.time() - start_time) * 1000
+        
+        return "\n\n".join(paragraphs), annotated_html.strip(), processing_time_ms
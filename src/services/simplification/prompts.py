@@ -1,7 +1,72 @@
 """Prompts for text simplification using evidence-based dyslexia guidelines"""
+import re
+from functools import lru_cache
+from typing import List, Optional
 from api.schemas.common import SimplificationMode, SimplificationIntensity
 
 
+def get_simplification_system_prompt(
+    mode: SimplificationMode,
+    intensity: SimplificationIntensity,
+    max_sentence_length: int,
+    options: dict
+) -> str:
+    """
+    Get the static rule block for a mode, intensity and options combination.
+    
+    The rules do not depend on the user text, so they are sent as the
+    system instruction and rendered once per combination.
+    """
+    return _render_system_prompt(
+        mode,
+        intensity,
+        max_sentence_length,
+        tuple(sorted(options.items()))
+    )
+
+
+def get_simplification_user_prompt(text: str) -> str:
+    """Wrap the text to simplify as the per-request user turn"""
+    return f"""**Text to Simplify:**
+{text}"""
+
+
+# Marker line that opens each paragraph in a batched request
+BATCH_MARKER = "<<<P{}>>>"
+_BATCH_MARKER_PATTERN = re.compile(r"^\s*<<<P(\d+)>>>\s*$", re.MULTILINE)
+
+
+def get_simplification_batch_prompt(paragraphs: List[str]) -> str:
+    """Wrap several independent paragraphs as one user turn, each behind a marker line"""
+    sections = "\n\n".join(
+        f"{BATCH_MARKER.format(i)}\n{paragraph}"
+        for i, paragraph in enumerate(paragraphs, start=1)
+    )
+    return f"""**Text to Simplify:**
+The text has {len(paragraphs)} sections. Each section starts with a marker line such as {BATCH_MARKER.format(1)}.
+Simplify each section on its own. Copy every marker line exactly, in the same order, before its simplified section.
+
+{sections}"""
+
+
+def split_batch_output(output: str, count: int) -> Optional[List[str]]:
+    """
+    Split a batched response back into one simplified text per paragraph.
+    
+    Returns:
+        List of simplified paragraphs, or None if the markers were not preserved
+    """
+    markers = list(_BATCH_MARKER_PATTERN.finditer(output))
+    if [int(m.group(1)) for m in markers] != list(range(1, count + 1)):
+        return None
+    
+    sections = []
+    for i, marker in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(output)
+        sections.append(output[marker.end():end].strip())
+    return sections
+
+
 def get_simplification_prompt(
     text: str,
     mode: SimplificationMode,
@@ -9,7 +74,22 @@ def get_simplification_prompt(
     max_sentence_length: int,
     options: dict
 ) -> str:
-    """Generate the appropriate simplification prompt based on mode and settings"""
+    """Generate the full inline simplification prompt (rules followed by text)"""
+    system_prompt = get_simplification_system_prompt(
+        mode, intensity, max_sentence_length, options
+    )
+    return f"{system_prompt}\n\n{get_simplification_user_prompt(text)}"
+
+
+@lru_cache(maxsize=256)
+def _render_system_prompt(
+    mode: SimplificationMode,
+    intensity: SimplificationIntensity,
+    max_sentence_length: int,
+    options_items: tuple
+) -> str:
+    """Render the simplification rules (memoized)"""
+    options = dict(options_items)
     
     # Base rules (British Dyslexia Association guidelines)
     base_rules = f"""
@@ -54,7 +134,7 @@ You are an expert text simplifier for people with dyslexia. Follow these evidenc
 - Use simple, everyday language
 - Break down any complex sentences
 """,
-        SimplificationMode.ACADEMIC: """
+        SimplificationMode.ACADEMIC: f"""
 **Mode: Academic (Educational Materials)**
 - Target: Textbooks, research, educational content
 - Define technical terms, don't remove them
@@ -70,7 +150,7 @@ You are an expert text simplifier for people with dyslexia. Follow these evidenc
 - Include concrete examples for abstract concepts
 - Preserve technical accuracy
 """,
-        SimplificationMode.NARRATIVE: """
+        SimplificationMode.NARRATIVE: f"""
 **Mode: Narrative (Stories & Fiction)**
 - Target: Stories, fiction, creative writing
 - Shorter sentences for faster pacing (max {max_sentence_length} words)
@@ -104,10 +184,8 @@ You are an expert text simplifier for people with dyslexia. Follow these evidenc
 **Intensity Level:**
 {intensity_instructions.get(intensity, intensity_instructions[SimplificationIntensity.MEDIUM])}
 
-**Text to Simplify:**
-{text}
-
 **Instructions:**
+The user message contains the text to simplify.
 Return ONLY the simplified text. Do not include explanations, notes, or metadata.
 Maintain the original meaning while making it accessible for people with dyslexia.
 """
@@ -0,0 +1,254 @@
+"""Local readability statistics and checks for simplified text"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from api.schemas import SimplificationIntensity, SimplificationOptions
+
+# Words with more letters than this count as long (BDA vocabulary rule)
+LONG_WORD_LETTERS = 6
+
+# Highest share of long words a text may have and still count as simple
+LONG_WORD_RATIO_LIMITS = {
+    SimplificationIntensity.LIGHT: 0.25,
+    SimplificationIntensity.MEDIUM: 0.15,
+    SimplificationIntensity.HEAVY: 0.10,
+    SimplificationIntensity.CUSTOM: 0.15,
+}
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_PATTERN = re.compile(r"[^.!?]+[.!?]*")
+
+# "be" auxiliary followed by a past participle, optionally with an adverb
+# in between ("was quickly written", "are given", "been taken")
+_PASSIVE_PATTERN = re.compile(
+    r"\b(?:am|is|are|was|were|be|been|being)\s+(?:\w+ly\s+)?\w+(?:ed|en|wn)\b",
+    re.IGNORECASE
+)
+
+# Three or more consecutive all-caps words read as shouting
+_ALL_CAPS_RUN = re.compile(r"\b[A-Z]{2,}(?:\s+[A-Z]{2,}){2,}\b")
+
+
+def _letter_count(word: str) -> int:
+    return sum(1 for c in word if c.isalpha())
+
+
+def meets_targets(
+    text: str,
+    max_sentence_length: int,
+    intensity: SimplificationIntensity = SimplificationIntensity.MEDIUM,
+    options: Optional[SimplificationOptions] = None
+) -> bool:
+    """
+    Check whether text already satisfies the simplification targets.
+    
+    Checks sentence length, paragraph length, long-word ratio, passive voice
+    and all-caps runs, returning as soon as any check fails.
+    
+    Args:
+        text: Text to check
+        max_sentence_length: Maximum words per sentence
+        intensity: Simplification intensity (sets the long-word limit)
+        options: Advanced options
+    
+    Returns:
+        True if the text can be returned unchanged
+    """
+    if options is None:
+        options = SimplificationOptions()
+    
+    if _ALL_CAPS_RUN.search(text):
+        return False
+    
+    if options.use_active_voice and _PASSIVE_PATTERN.search(text):
+        return False
+    
+    total_words = 0
+    long_words = 0
+    
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        sentences = 0
+        for sentence in _SENTENCE_PATTERN.findall(paragraph):
+            words = sentence.split()
+            if not words:
+                continue
+            if len(words) > max_sentence_length:
+                return False
+            sentences += 1
+            total_words += len(words)
+            long_words += sum(1 for w in words if _letter_count(w) > LONG_WORD_LETTERS)
+        if sentences > options.paragraph_max_sentences:
+            return False
+    
+    if total_words == 0:
+        return False
+    
+    limit = LONG_WORD_RATIO_LIMITS.get(intensity, LONG_WORD_RATIO_LIMITS[SimplificationIntensity.MEDIUM])
+    return long_words / total_words <= limit
+
+
+# Sentence-ending punctuation, and closing marks that may follow it
+SENTENCE_TERMINATORS = ".!?"
+_CLOSING_MARKS = "\"')]}\u201d\u2019"
+_WORD_STRIP = "\"'()[]{}<>,.;:!?*_-\u2014\u2013\u201c\u201d\u2018\u2019"
+
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+
+# Words the vowel-group heuristic gets wrong, with their syllable counts
+SYLLABLE_TABLE = {
+    "the": 1, "are": 1, "were": 1, "there": 1, "where": 1, "here": 1,
+    "one": 1, "done": 1, "gone": 1, "some": 1, "come": 1, "give": 1,
+    "have": 1, "live": 1, "love": 1, "move": 1, "whole": 1, "once": 1,
+    "people": 2, "every": 3, "business": 2, "different": 3, "family": 3,
+    "evening": 2, "several": 3, "interesting": 3, "area": 3, "idea": 3,
+    "being": 2, "going": 2, "doing": 2, "seeing": 2, "create": 2,
+    "created": 3, "science": 2, "quiet": 2, "poem": 2, "real": 1,
+    "really": 2, "naive": 2, "recipe": 3, "simile": 3, "apostrophe": 4,
+}
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word: str) -> int:
+    """
+    Count syllables in a lower-case word.
+    
+    Irregular words come from SYLLABLE_TABLE; others use vowel groups with
+    adjustments for silent trailing "e" and "-le" endings. Results are
+    memoized, so repeated vocabulary costs a dictionary lookup.
+    """
+    if word in SYLLABLE_TABLE:
+        return SYLLABLE_TABLE[word]
+    
+    if not word.isalpha():
+        letters = "".join(c for c in word if c.isalpha())
+        return count_syllables(letters) if letters else 1
+    
+    count = len(_VOWEL_GROUPS.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee", "ye")) and count > 1:
+        count -= 1
+    elif word.endswith("le") and len(word) > 2 and word[-3] not in "aeiouy":
+        count = max(count, 2)
+    if word.endswith("ed") and len(word) > 3 and word[-3] not in "dt" and count > 1:
+        count -= 1
+    
+    return max(1, count)
+
+
+def _ends_sentence(token: str) -> bool:
+    stripped = token.rstrip(_CLOSING_MARKS)
+    return bool(stripped) and stripped[-1] in SENTENCE_TERMINATORS
+
+
+@dataclass
+class TextMetrics:
+    """Readability metrics for a single text"""
+    word_count: int
+    sentence_count: int
+    syllable_count: int
+    long_word_count: int
+    
+    @property
+    def avg_sentence_length(self) -> float:
+        if not self.sentence_count:
+            return 0.0
+        return self.word_count / self.sentence_count
+    
+    @property
+    def flesch_kincaid_grade(self) -> float:
+        """Flesch-Kincaid grade level"""
+        if not self.word_count or not self.sentence_count:
+            return 0.0
+        return (
+            0.39 * self.avg_sentence_length
+            + 11.8 * (self.syllable_count / self.word_count)
+            - 15.59
+        )
+    
+    @property
+    def long_word_percentage(self) -> float:
+        if not self.word_count:
+            return 0.0
+        return 100.0 * self.long_word_count / self.word_count
+
+
+# Per-token tallies are packed into one integer so a text sums in one pass:
+# syllables in the low field, then the long-word flag, then the sentence end.
+# A field can only overflow into the next once a text has 2**21 characters.
+_FIELD_BITS = 21
+_FIELD_MASK = (1 << _FIELD_BITS) - 1
+_LONG_WORD = 1 << _FIELD_BITS
+_SENTENCE_END = 1 << (2 * _FIELD_BITS)
+
+# Distinct tokens whose tallies are remembered before starting over
+TOKEN_CACHE_SIZE = 65536
+
+
+class _TokenTallies(dict):
+    """Packed tallies by token, computed the first time a token is looked up"""
+    
+    def __missing__(self, token: str) -> int:
+        if len(self) >= TOKEN_CACHE_SIZE:
+            self.clear()
+        packed = _SENTENCE_END if _ends_sentence(token) else 0
+        word = token.strip(_WORD_STRIP).lower()
+        if word:
+            packed += count_syllables(word)
+            if _letter_count(word) > LONG_WORD_LETTERS:
+                packed += _LONG_WORD
+        self[token] = packed
+        return packed
+
+
+_token_tallies = _TokenTallies()
+_tally = _token_tallies.__getitem__
+
+
+def _unpack(total: int) -> Tuple[int, int, int]:
+    """Syllables, long words and sentence ends from summed tallies"""
+    return total & _FIELD_MASK, (total >> _FIELD_BITS) & _FIELD_MASK, total >> (2 * _FIELD_BITS)
+
+
+def _sum_long(tokens: List[str]) -> Tuple[int, int, int]:
+    """Tallies of tokens too long to sum packed, summing halves separately until they fit"""
+    if sum(map(len, tokens)) <= _FIELD_MASK:
+        return _unpack(sum(map(_tally, tokens)))
+    middle = len(tokens) // 2
+    first, second = _sum_long(tokens[:middle]), _sum_long(tokens[middle:])
+    return first[0] + second[0], first[1] + second[1], first[2] + second[2]
+
+
+def analyze_text(text: str) -> TextMetrics:
+    """
+    Compute readability metrics in a single pass over the tokens.
+    
+    Each distinct token is analyzed once (sentence end, syllables, long
+    word) and remembered as one packed integer, so the pass over the text
+    is a C-level sum of dictionary lookups.
+    
+    Args:
+        text: Text to analyze
+    
+    Returns:
+        TextMetrics for the text
+    """
+    tokens = text.split()
+    if not tokens:
+        return TextMetrics(0, 0, 0, 0)
+    
+    if len(text) > _FIELD_MASK:
+        syllable_count, long_word_count, sentence_count = _sum_long(tokens)
+    else:
+        syllable_count, long_word_count, sentence_count = _unpack(sum(map(_tally, tokens)))
+    
+    # Text that does not end with a terminator still has a final sentence
+    if not _tally(tokens[-1]) & _SENTENCE_END:
+        sentence_count += 1
+    
+    return TextMetrics(
+        word_count=len(tokens),
+        sentence_count=sentence_count,
+        syllable_count=syllable_count,
+        long_word_count=long_word_count
+    )
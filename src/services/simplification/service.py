@@ -1,34 +1,68 @@
 """Text simplification service using Google Gemini AI"""
 import time
+import asyncio
+import hashlib
 import logging
-from typing import Optional
-from google import genai
-from google.genai import types
+import re
+from typing import AsyncIterable, List, Optional
 
 from core.config import settings
-from core.exceptions import LLMTimeoutException, ValidationException
+from core.metrics import track_upstream
+from core.timing import span
+from core.tracing import traced
+from core.exceptions import (
+    LexyAIException,
+    LLMTimeoutException,
+    TokenLimitException,
+    ValidationException,
+    validate_text_length
+)
 from api.schemas import (
     SimplificationMode,
     SimplificationIntensity,
     SimplificationOptions,
     TextStatistics
 )
-from services.simplification.prompts import get_simplification_prompt
+from services.simplification.prompts import (
+    get_simplification_system_prompt,
+    get_simplification_user_prompt,
+    get_simplification_batch_prompt,
+    split_batch_output
+)
+from services.simplification.readability import meets_targets, analyze_text
+from services.context_cache import generate_with_cached_prefix
+from services.client import get_client
+from utils.tokens import token_estimator, check_input_tokens, batch_paragraphs
+from utils.cache import LRUCache
+from utils.shared_cache import shared_cache
 
 logger = logging.getLogger(__name__)
 
+SIMPLIFICATION_MODEL = "gemini-2.0-flash-lite"
+
+# Expected output tokens per input token. Simplified text can run longer than
+# the source once jargon is defined and lists become bullet points.
+OUTPUT_TOKEN_RATIO = 1.5
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+
 
 class SimplificationService:
     """Service for text simplification using Google Gemini"""
     
-    def __init__(self):
-        self._client = None
+    def __init__(self, client=None):
+        self._client = client
+        # Simplified output per paragraph, keyed by content and settings hash
+        self._paragraph_cache = LRUCache(
+            max_items=settings.simplification_cache_size,
+            name="simplification_paragraphs"
+        )
     
     @property
     def client(self):
-        """Lazy load the Gemini client"""
+        """Gemini client (the shared one unless injected)"""
         if self._client is None:
-            self._client = genai.Client(api_key=settings.gemini_api_key)
+            self._client = get_client()
         return self._client
     
     def _calculate_max_sentence_length(
@@ -61,25 +95,175 @@ class SimplificationService:
             return base_length
     
     def _calculate_statistics(self, original: str, simplified: str) -> TextStatistics:
-        """Calculate text statistics"""
+        """Calculate readability statistics for both texts"""
+        before = analyze_text(original)
+        after = before if simplified is original else analyze_text(simplified)
+        
+        return TextStatistics(
+            original_word_count=before.word_count,
+            simplified_word_count=after.word_count,
+            original_avg_sentence_length=round(before.avg_sentence_length, 2),
+            simplified_avg_sentence_length=round(after.avg_sentence_length, 2),
+            original_sentence_count=before.sentence_count,
+            simplified_sentence_count=after.sentence_count,
+            original_syllable_count=before.syllable_count,
+            simplified_syllable_count=after.syllable_count,
+            original_flesch_kincaid_grade=round(before.flesch_kincaid_grade, 2),
+            simplified_flesch_kincaid_grade=round(after.flesch_kincaid_grade, 2),
+            original_long_word_percentage=round(before.long_word_percentage, 2),
+            simplified_long_word_percentage=round(after.long_word_percentage, 2)
+        )
+    
+    @staticmethod
+    def _options_dict(options: SimplificationOptions) -> dict:
+        """Convert options to the dict used in prompts and cache keys"""
+        return {
+            "break_long_sentences": options.break_long_sentences,
+            "use_active_voice": options.use_active_voice,
+            "replace_complex_words": options.replace_complex_words.value,
+            "jargon_handling": options.jargon_handling.value,
+            "use_bullet_points": options.use_bullet_points,
+            "paragraph_max_sentences": options.paragraph_max_sentences
+        }
+    
+    def cache_stats(self) -> dict:
+        """Counters of the per-paragraph output cache"""
+        return self._paragraph_cache.stats()
+    
+    def prerender_prompts(self) -> int:
+        """
+        Render the system prompt of every mode and preset intensity with default options.
+        
+        Returns:
+            Number of prompts rendered
+        """
+        options_dict = self._options_dict(SimplificationOptions())
+        rendered = 0
+        for mode in SimplificationMode:
+            for intensity in SimplificationIntensity:
+                if intensity == SimplificationIntensity.CUSTOM:
+                    continue
+                get_simplification_system_prompt(
+                    mode=mode,
+                    intensity=intensity,
+                    max_sentence_length=self._calculate_max_sentence_length(mode, intensity),
+                    options=options_dict
+                )
+                rendered += 1
+        return rendered
+    
+    @staticmethod
+    def _paragraph_key(
+        paragraph: str,
+        mode: SimplificationMode,
+        intensity: SimplificationIntensity,
+        max_sentence_length: int,
+        options: dict
+    ) -> str:
+        """Cache key for a simplified paragraph"""
+        settings_key = f"{mode.value}|{intensity.value}|{max_sentence_length}|{sorted(options.items())}"
+        return hashlib.sha256(f"{settings_key}\0{paragraph}".encode("utf-8")).hexdigest()
+    
+    async def _generate(self, contents: str, input_tokens: int, system_prompt: str) -> str:
+        """Call Gemini with an output budget sized to the input"""
+        max_output_tokens = token_estimator.output_budget(
+            input_tokens, SIMPLIFICATION_MODEL, OUTPUT_TOKEN_RATIO
+        )
         
-        def count_words(text: str) -> int:
-            return len(text.split())
+        # Note: Timeout is handled at the client level, not in GenerateContentConfig
+        with span("upstream"), track_upstream(SIMPLIFICATION_MODEL):
+            response = await generate_with_cached_prefix(
+                self.client,
+                SIMPLIFICATION_MODEL,
+                contents=contents,
+                system_instruction=system_prompt,
+                temperature=0.6,
+                max_output_tokens=max_output_tokens
+            )
         
-        def avg_sentence_length(text: str) -> float:
-            sentences = [s.strip() for s in text.replace('!', '.').replace('?', '.').split('.') if s.strip()]
-            if not sentences:
-                return 0.0
-            total_words = sum(len(s.split()) for s in sentences)
-            return total_words / len(sentences)
+        return response.text.strip()
+    
+    async def _simplify_batch(self, paragraphs: List[str], system_prompt: str) -> List[str]:
+        """
+        Simplify paragraphs in one upstream call, returning one output per paragraph.
         
-        return TextStatistics(
-            original_word_count=count_words(original),
-            simplified_word_count=count_words(simplified),
-            original_avg_sentence_length=avg_sentence_length(original),
-            simplified_avg_sentence_length=avg_sentence_length(simplified)
+        A single paragraph too large for one response is split into chunks.
+        If the model drops the batch markers, each paragraph is retried alone.
+        """
+        if len(paragraphs) == 1:
+            max_chunk_tokens = token_estimator.max_chunk_tokens(
+                SIMPLIFICATION_MODEL, OUTPUT_TOKEN_RATIO
+            )
+            chunks = token_estimator.plan_chunks(paragraphs[0], max_chunk_tokens)
+            results = await asyncio.gather(*(
+                self._generate(
+                    get_simplification_user_prompt(chunk),
+                    token_estimator.estimate(chunk),
+                    system_prompt
+                )
+                for chunk in chunks
+            ))
+            return ["\n\n".join(results)]
+        
+        with span("prompt"):
+            contents = get_simplification_batch_prompt(paragraphs)
+        output = await self._generate(
+            contents,
+            sum(token_estimator.estimate(p) for p in paragraphs),
+            system_prompt
         )
+        sections = split_batch_output(output, len(paragraphs))
+        if sections is not None:
+            return sections
+        
+        logger.warning("Batch markers missing from response, simplifying paragraphs individually")
+        results = await asyncio.gather(*(
+            self._simplify_batch([paragraph], system_prompt) for paragraph in paragraphs
+        ))
+        return [result[0] for result in results]
     
+    async def _simplify_shared(self, paragraphs: List[str], system_prompt: str) -> List[str]:
+        """
+        Simplify a batch through the host-wide cache shared by all workers.
+        
+        Paragraphs any worker has simplified with the same prompt are reused
+        and those another worker is simplifying right now are waited for;
+        only the rest go upstream, still as one batch.
+        """
+        prompt_digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        keys = [
+            "simplify:" + hashlib.sha256(
+                f"{SIMPLIFICATION_MODEL}\0{prompt_digest}\0{paragraph}".encode("utf-8")
+            ).hexdigest()
+            for paragraph in paragraphs
+        ]
+        
+        async def simplify(positions: List[int]) -> List[str]:
+            return await self._simplify_batch([paragraphs[i] for i in positions], system_prompt)
+        
+        return await shared_cache.get_or_compute_many(keys, simplify)
+    
+    @staticmethod
+    def _pack_batches(paragraphs: List[str], max_tokens: int) -> List[List[int]]:
+        """Group paragraph indices into batches that fit one response"""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        
+        for index, paragraph in enumerate(paragraphs):
+            tokens = token_estimator.estimate(paragraph)
+            if current and current_tokens + tokens > max_tokens:
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    @traced("simplification.simplify_text")
     async def simplify_text(
         self,
         text: str,
@@ -113,51 +297,198 @@ class SimplificationService:
         )
         
         # Convert options to dict for prompt
-        options_dict = {
-            "break_long_sentences": options.break_long_sentences,
-            "use_active_voice": options.use_active_voice,
-            "replace_complex_words": options.replace_complex_words.value,
-            "jargon_handling": options.jargon_handling.value,
-            "use_bullet_points": options.use_bullet_points,
-            "paragraph_max_sentences": options.paragraph_max_sentences
-        }
+        options_dict = self._options_dict(options)
         
-        # Generate prompt
-        prompt = get_simplification_prompt(
-            text=text,
-            mode=mode,
-            intensity=intensity,
-            max_sentence_length=max_sentence_length,
-            options=options_dict
+        # Return text that already meets the targets without an upstream call.
+        # Interactive mode always needs the model to produce suggestions.
+        if (
+            settings.simplification_fast_path
+            and mode != SimplificationMode.INTERACTIVE
+            and meets_targets(text, max_sentence_length, intensity, options)
+        ):
+            statistics = self._calculate_statistics(text, text)
+            statistics.already_simple = True
+            processing_time_ms = (time.time() - start_time) * 1000
+            logger.info("Text already meets targets, skipped upstream (%.2fms)", processing_time_ms)
+            return text, statistics, processing_time_ms
+        
+        logger.info("Simplifying text with mode=%s, intensity=%s", mode.value, intensity.value)
+        
+        # Reject oversize input before calling upstream
+        await check_input_tokens(text, lambda: self.client, SIMPLIFICATION_MODEL)
+        
+        # Reuse cached paragraphs; only changed or new ones go upstream
+        paragraphs = [p.strip() for p in _PARAGRAPH_SPLIT.split(text) if p.strip()]
+        keys = [
+            self._paragraph_key(p, mode, intensity, max_sentence_length, options_dict)
+            for p in paragraphs
+        ]
+        outputs: List[Optional[str]] = [self._paragraph_cache.get(key) for key in keys]
+        pending = [i for i, output in enumerate(outputs) if output is None]
+        
+        with span("prompt"):
+            system_prompt = get_simplification_system_prompt(
+                mode=mode,
+                intensity=intensity,
+                max_sentence_length=max_sentence_length,
+                options=options_dict
+            )
+        max_chunk_tokens = token_estimator.max_chunk_tokens(
+            SIMPLIFICATION_MODEL, OUTPUT_TOKEN_RATIO
         )
+        batches = [
+            [pending[i] for i in batch]
+            for batch in self._pack_batches([paragraphs[i] for i in pending], max_chunk_tokens)
+        ]
         
-        logger.info(f"Simplifying text with mode={mode.value}, intensity={intensity.value}")
+        logger.info(
+            "Reusing %d of %d paragraphs, %d upstream batch(es)",
+            len(paragraphs) - len(pending), len(paragraphs), len(batches)
+        )
         
         try:
-            # Call Gemini API
-            # Note: Timeout is handled at the client level, not in GenerateContentConfig
-            response = self.client.models.generate_content(
-                model='gemini-2.0-flash-lite',
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.6,
-                    max_output_tokens=8000
-                )
-            )
+            results = await asyncio.gather(*(
+                self._simplify_shared([paragraphs[i] for i in batch], system_prompt)
+                for batch in batches
+            ))
             
-            simplified_text = response.text.strip()
+            for batch, batch_outputs in zip(batches, results):
+                for index, output in zip(batch, batch_outputs):
+                    outputs[index] = output
+                    self._paragraph_cache.set(keys[index], output)
+            
+            # Rebuild the document in its original order
+            simplified_text = "\n\n".join(outputs)
             
             # Calculate statistics
             statistics = self._calculate_statistics(text, simplified_text)
             
             processing_time_ms = (time.time() - start_time) * 1000
             
-            logger.info(f"Simplification completed in {processing_time_ms:.2f}ms")
+            logger.info("Simplification completed in %.2fms", processing_time_ms)
             
             return simplified_text, statistics, processing_time_ms
             
         except Exception as e:
-            logger.error(f"Simplification failed: {str(e)}")
+            logger.error("Simplification failed: %s", e)
             if "timeout" in str(e).lower():
                 raise LLMTimeoutException()
             raise ValidationException(f"Simplification failed: {str(e)}")
+    
+    @traced("simplification.simplify_stream")
+    async def simplify_stream(
+        self,
+        parts: AsyncIterable[str],
+        mode: SimplificationMode = SimplificationMode.GENERAL,
+        intensity: SimplificationIntensity = SimplificationIntensity.MEDIUM,
+        custom_sentence_length: Optional[int] = None,
+        options: Optional[SimplificationOptions] = None
+    ) -> tuple[str, str, TextStatistics, float]:
+        """
+        Simplify a document while it is still being extracted.
+        
+        Paragraphs are grouped into batches as parts arrive and each batch
+        is sent upstream as soon as it is complete, so simplification of
+        early pages overlaps extraction of later ones. Cached paragraphs are
+        reused, batches that already meet the targets are kept as-is, and
+        results are reassembled in document order.
+        
+        Args:
+            parts: Pages or paragraphs in document order (e.g. a DocumentStream)
+            mode: Simplification mode
+            intensity: Simplification intensity
+            custom_sentence_length: Custom sentence length (for custom intensity)
+            options: Advanced options
+        
+        Returns:
+            Tuple of (original_text, simplified_text, statistics, processing_time_ms)
+        """
+        start_time = time.time()
+        
+        if options is None:
+            options = SimplificationOptions()
+        
+        max_sentence_length = self._calculate_max_sentence_length(
+            mode, intensity, custom_sentence_length
+        )
+        options_dict = self._options_dict(options)
+        with span("prompt"):
+            system_prompt = get_simplification_system_prompt(
+                mode=mode,
+                intensity=intensity,
+                max_sentence_length=max_sentence_length,
+                options=options_dict
+            )
+        max_chunk_tokens = token_estimator.max_chunk_tokens(
+            SIMPLIFICATION_MODEL, OUTPUT_TOKEN_RATIO
+        )
+        fast_path = settings.simplification_fast_path and mode != SimplificationMode.INTERACTIVE
+        
+        logger.info("Simplifying document stream with mode=%s, intensity=%s", mode.value, intensity.value)
+        
+        paragraphs: List[str] = []
+        outputs: List[Optional[str]] = []
+        keys: List[str] = []
+        tasks: List[tuple[List[int], asyncio.Task]] = []
+        input_tokens = 0
+        
+        try:
+            async for batch in batch_paragraphs(parts, max_chunk_tokens):
+                input_tokens += sum(token_estimator.estimate(p) for p in batch)
+                if input_tokens > settings.max_input_tokens:
+                    raise TokenLimitException(input_tokens, settings.max_input_tokens)
+                
+                first = len(paragraphs)
+                paragraphs.extend(batch)
+                
+                if fast_path and meets_targets("\n\n".join(batch), max_sentence_length, intensity, options):
+                    outputs.extend(batch)
+                    keys.extend([""] * len(batch))
+                    continue
+                
+                for paragraph in batch:
+                    key = self._paragraph_key(paragraph, mode, intensity, max_sentence_length, options_dict)
+                    keys.append(key)
+                    outputs.append(self._paragraph_cache.get(key))
+                
+                pending = [i for i in range(first, len(paragraphs)) if outputs[i] is None]
+                if pending:
+                    tasks.append((pending, asyncio.create_task(
+                        self._simplify_shared([paragraphs[i] for i in pending], system_prompt)
+                    )))
+            
+            # Batches only hold non-empty paragraphs, so an empty document is
+            # rejected here without any upstream call
+            validate_text_length("\n\n".join(paragraphs))
+            
+            logger.info("Streamed %s paragraphs, %s upstream batch(es)", len(paragraphs), len(tasks))
+            
+            results = await asyncio.gather(*(task for _, task in tasks))
+        except (LexyAIException, asyncio.CancelledError):
+            # Parsing and token-limit errors keep their own status codes
+            for _, task in tasks:
+                task.cancel()
+            raise
+        except Exception as e:
+            for _, task in tasks:
+                task.cancel()
+            logger.error("Simplification failed: %s", e)
+            if "timeout" in str(e).lower():
+                raise LLMTimeoutException()
+            raise ValidationException(f"Simplification failed: {str(e)}")
+        
+        for (pending, _), batch_outputs in zip(tasks, results):
+            for index, output in zip(pending, batch_outputs):
+                outputs[index] = output
+                self._paragraph_cache.set(keys[index], output)
+        
+        original_text = "\n\n".join(paragraphs)
+        simplified_text = "\n\n".join(outputs)
+        
+        statistics = self._calculate_statistics(original_text, simplified_text)
+        statistics.already_simple = bool(paragraphs) and not tasks and simplified_text == original_text
+        
+        processing_time_ms = (time.time() - start_time) * 1000
+        logger.info("Simplification completed in %.2fms", processing_time_ms)
+        
+        return original_text, simplified_text, statistics, processing_time_ms
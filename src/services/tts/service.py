@@ -1,35 +1,51 @@
 """Text-to-Speech service using Google Gemini"""
 import time
+import asyncio
 import logging
 import io
 import wave
 import base64
 from typing import List
 
-from google import genai
-from google.genai import types
-
-from core.config import settings
 from core.exceptions import TTSGenerationException
+from core.metrics import AUDIO_BYTES, AUDIO_SECONDS, track_upstream
+from core.timing import span
+from core.tracing import traced
 from api.schemas.common import TTSVoice, WordTimestamp
 from services.tts.timestamp import calculate_timestamps
+from services.client import get_client
+from utils.tokens import token_estimator, check_input_tokens
 
 logger = logging.getLogger(__name__)
 
+TTS_MODEL = "gemini-2.5-flash-preview-tts"
+
+# Expected audio tokens per text token. Gemini audio runs at 32 tokens per
+# second and speech at roughly 3 text tokens per second, plus headroom for
+# slower voices so the budget never truncates the audio.
+AUDIO_TOKENS_PER_TEXT_TOKEN = 12.0
+
+# Speech runs at roughly 3 text tokens per second
+TEXT_TOKENS_PER_AUDIO_SECOND = 3.0
+
 
 class TTSService:
     """Service for text-to-speech generation using Google Gemini"""
     
-    def __init__(self):
-        self._client = None
+    def __init__(self, client=None):
+        self._client = client
     
     @property
     def client(self):
-        """Lazy load the Gemini client"""
+        """Gemini client (the shared one unless injected)"""
         if self._client is None:
-            self._client = genai.Client(api_key=settings.gemini_api_key)
+            self._client = get_client()
         return self._client
     
+    def estimate_audio_seconds(self, text: str) -> float:
+        """Projected length of the speech for text, before synthesizing it"""
+        return token_estimator.estimate(text) / TEXT_TOKENS_PER_AUDIO_SECOND
+    
     def _get_audio_duration(self, wav_bytes: bytes) -> float:
         """Extract audio duration from WAV file"""
         try:
@@ -39,7 +55,7 @@ class TTSService:
                 duration = frames / float(rate)
                 return duration
         except Exception as e:
-            logger.error(f"Failed to get audio duration: {str(e)}")
+            logger.error("Failed to get audio duration: %s", e)
             return 0.0
     
     def _wrap_in_wav(self, raw_audio: bytes, sample_rate: int = 24000) -> bytes:
@@ -55,9 +71,52 @@ class TTSService:
             
             return buffer.getvalue()
         except Exception as e:
-            logger.error(f"Failed to create WAV file: {str(e)}")
+            logger.error("Failed to create WAV file: %s", e)
             raise TTSGenerationException(f"WAV creation failed: {str(e)}")
     
+    async def _synthesize_chunk(self, text: str, voice: TTSVoice) -> bytes:
+        """Generate raw PCM audio for a single chunk of text"""
+        max_output_tokens = token_estimator.output_budget(
+            token_estimator.estimate(text), TTS_MODEL, AUDIO_TOKENS_PER_TEXT_TOKEN
+        )
+        
+        from google.genai import types
+        
+        # Generate speech using Gemini TTS
+        with span("upstream"), track_upstream(TTS_MODEL):
+            response = await self.client.aio.models.generate_content(
+                model=TTS_MODEL,
+                contents=text,
+                config=types.GenerateContentConfig(
+                    response_modalities=['AUDIO'],
+                    max_output_tokens=max_output_tokens,
+                    speech_config=types.SpeechConfig(
+                        voice_config=types.VoiceConfig(
+                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                                voice_name=voice.value
+                            )
+                        )
+                    )
+                )
+            )
+        
+        # Get raw audio data
+        if not response.candidates or not response.candidates[0].content.parts:
+            raise TTSGenerationException("No audio data in response")
+        
+        # Extract audio from response
+        audio_part = None
+        for part in response.candidates[0].content.parts:
+            if hasattr(part, 'inline_data') and part.inline_data:
+                audio_part = part.inline_data
+                break
+        
+        if not audio_part:
+            raise TTSGenerationException("No audio data found in response")
+        
+        return audio_part.data
+    
+    @traced("tts.generate_speech")
     async def generate_speech(
         self,
         text: str,
@@ -77,49 +136,38 @@ class TTSService:
         """
         start_time = time.time()
         
-        logger.info(f"Generating TTS with voice={voice.value}, sample_rate={sample_rate}")
+        logger.info("Generating TTS with voice=%s, sample_rate=%s", voice.value, sample_rate)
+        
+        # Reject oversize input before calling upstream
+        await check_input_tokens(text, lambda: self.client, TTS_MODEL)
+        
+        # Split text whose audio would not fit in a single response
+        max_chunk_tokens = token_estimator.max_chunk_tokens(
+            TTS_MODEL, AUDIO_TOKENS_PER_TEXT_TOKEN
+        )
+        chunks = token_estimator.plan_chunks(text, max_chunk_tokens)
+        if len(chunks) > 1:
+            logger.info("TTS text split into %s chunks of <= %s tokens", len(chunks), max_chunk_tokens)
         
         try:
-            # Generate speech using Gemini TTS
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash-preview-tts',
-                contents=text,
-                config=types.GenerateContentConfig(
-                    response_modalities=['AUDIO'],
-                    speech_config=types.SpeechConfig(
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                voice_name=voice.value
-                            )
-                        )
-                    )
-                )
-            )
-            
-            # Get raw audio data
-            if not response.candidates or not response.candidates[0].content.parts:
-                raise TTSGenerationException("No audio data in response")
-            
-            # Extract audio from response
-            audio_part = None
-            for part in response.candidates[0].content.parts:
-                if hasattr(part, 'inline_data') and part.inline_data:
-                    audio_part = part.inline_data
-                    break
-            
-            if not audio_part:
-                raise TTSGenerationException("No audio data found in response")
-            
-            raw_audio = audio_part.data
+            # Synthesize each chunk and concatenate the raw PCM in order
+            chunk_audio = await asyncio.gather(*(
+                self._synthesize_chunk(chunk, voice) for chunk in chunks
+            ))
+            raw_audio = b"".join(chunk_audio)
             
             # Wrap in WAV container
-            wav_bytes = self._wrap_in_wav(raw_audio, sample_rate)
+            with span("wav"):
+                wav_bytes = self._wrap_in_wav(raw_audio, sample_rate)
             
             # Get audio duration
             duration = self._get_audio_duration(wav_bytes)
+            AUDIO_SECONDS.inc(duration)
+            AUDIO_BYTES.inc(len(wav_bytes))
             
             # Encode to base64
-            audio_base64 = base64.b64encode(wav_bytes).decode('utf-8')
+            with span("base64"):
+                audio_base64 = base64.b64encode(wav_bytes).decode('utf-8')
             
             # Calculate word-level timestamps
             timestamps = calculate_timestamps(text, duration)
@@ -127,14 +175,14 @@ class TTSService:
             processing_time_ms = (time.time() - start_time) * 1000
             
             logger.info(
-                f"TTS generation completed in {processing_time_ms:.2f}ms, "
-                f"duration={duration:.2f}s, words={len(timestamps)}"
+                "TTS generation completed in %.2fms, duration=%.2fs, words=%d",
+                processing_time_ms, duration, len(timestamps)
             )
             
             return audio_base64, duration, timestamps, processing_time_ms
             
         except Exception as e:
-            logger.error(f"TTS generation failed: {str(e)}")
+            logger.error("TTS generation failed: %s", e)
             if isinstance(e, TTSGenerationException):
                 raise
             raise TTSGenerationException(str(e))
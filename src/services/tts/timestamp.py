@@ -2,6 +2,7 @@
 import re
 from typing import List, Tuple
 from api.schemas.common import WordTimestamp
+from core.tracing import traced
 
 
 # Pause durations for different punctuation marks (in seconds)
@@ -69,6 +70,7 @@ def calculate_total_pause_time(tokens: List[Tuple[str, str]]) -> float:
     return total_pause
 
 
+@traced("tts.timestamps")
 def calculate_timestamps(text: str, audio_duration: float) -> List[WordTimestamp]:
     """
     Calculate word-level timestamps using heuristic algorithm.
@@ -1,5 +1,14 @@
 """Utils package"""
-from .file_parser import FileParser
-from .validators import validate_uploaded_file
+from .file_parser import FileParser, ParsedDocument, DocumentStream
+from .validators import validate_uploaded_file, parse_page_ranges
+from .document_cache import parse_upload, stream_upload
 
-__all__ = ["FileParser", "validate_uploaded_file"]
+__all__ = [
+    "FileParser",
+    "ParsedDocument",
+    "DocumentStream",
+    "validate_uploaded_file",
+    "parse_page_ranges",
+    "parse_upload",
+    "stream_upload"
+]
@@ -0,0 +1,87 @@
+"""In-process caching utilities"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by item count and size.
+    
+    Sizes default to len(value), which is the character count for text and
+    the byte count for bytes.
+    """
+    
+    def __init__(
+        self,
+        max_items: int = 1024,
+        max_size: Optional[int] = None,
+        name: str = "cache"
+    ):
+        self.name = name
+        self.max_items = max_items
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a value and mark it as recently used"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def set(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        """Store a value, evicting least-recently-used entries over the bounds"""
+        if size is None:
+            size = len(value) if hasattr(value, "__len__") else 1
+        if self.max_size is not None and size > self.max_size:
+            return
+        
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._data[key] = (value, size)
+            self._size += size
+            
+            while len(self._data) > self.max_items or (
+                self.max_size is not None and self._size > self.max_size
+            ):
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._size -= evicted_size
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+    
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def stats(self) -> dict:
+        """Cache counters for logging and metrics"""
+        return {
+            "name": self.name,
+            "items": len(self._data),
+            "size": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4)
+        }
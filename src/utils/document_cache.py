@@ -0,0 +1,258 @@
+"""Cache of parsed documents keyed by upload content hash"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional
+
+from core.config import settings
+from utils.cache import LRUCache
+from utils.file_parser import DocumentStream, FileParser, ParsedDocument
+from utils.shared_cache import SharedCache, shared_cache
+from utils.validators import SpooledUpload
+
+logger = logging.getLogger(__name__)
+
+
+def document_key(
+    digest: str,
+    filename: str,
+    max_chars: Optional[int] = None,
+    pages: Optional[List[int]] = None
+) -> str:
+    """
+    Cache key for a parsed upload.
+    
+    The same bytes parse differently with another budget or page selection,
+    so both are part of the key along with the file type.
+    """
+    extension = filename.split(".")[-1].lower()
+    selection = ",".join(str(p) for p in pages) if pages is not None else "all"
+    params = f"{extension}|{max_chars}|{selection}"
+    return f"{digest}-{hashlib.sha256(params.encode('utf-8')).hexdigest()[:16]}"
+
+
+class DocumentCache:
+    """
+    Two-tier cache of extracted document text.
+    
+    Entries live in a size-bounded in-memory LRU. When DOCUMENT_CACHE_DIR
+    is set, they are also written to disk as JSON (bounded by
+    DOCUMENT_CACHE_DISK_MAX_MB, oldest-used first out) so they survive
+    restarts and can be shared by workers on the same host. With the
+    host-wide shared cache enabled, memory misses are looked up there
+    before the disk tier.
+    """
+    
+    def __init__(
+        self,
+        max_bytes: int,
+        directory: Optional[str] = None,
+        disk_max_bytes: int = 0,
+        shared: Optional[SharedCache] = None
+    ):
+        self._memory = LRUCache(max_items=100_000, max_size=max_bytes, name="documents")
+        self._shared = shared
+        self._directory = Path(directory) if directory else None
+        self._disk_max_bytes = disk_max_bytes
+        self._disk_lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+    
+    @property
+    def shared_enabled(self) -> bool:
+        return self._shared is not None and self._shared.enabled
+    
+    @property
+    def disk_enabled(self) -> bool:
+        return self._directory is not None and self._disk_max_bytes > 0
+    
+    async def get(self, key: str, upload_size: int = 0) -> Optional[ParsedDocument]:
+        """
+        Look up a parsed document.
+        
+        Args:
+            key: Key from document_key
+            upload_size: Size of the upload in bytes, counted as saved on a hit
+        
+        Returns:
+            The cached document, or None on a miss
+        """
+        document = self._memory.get(key)
+        if document is None and self.shared_enabled:
+            value = await self._shared.get(f"document:{key}")
+            if value is not None:
+                document = ParsedDocument(**json.loads(value))
+                self.shared_hits += 1
+                self._memory.set(key, document, size=len(document.text))
+        if document is None and self.disk_enabled:
+            document = await asyncio.to_thread(self._read_disk, key)
+            if document is not None:
+                self.disk_hits += 1
+                self._memory.set(key, document, size=len(document.text))
+        
+        if document is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self.bytes_saved += upload_size
+        return document
+    
+    async def set(self, key: str, document: ParsedDocument) -> None:
+        """Store a parsed document in memory and, if enabled, in the shared cache and on disk"""
+        self._memory.set(key, document, size=len(document.text))
+        if self.shared_enabled:
+            await self._shared.set(f"document:{key}", json.dumps(asdict(document)))
+        if self.disk_enabled:
+            await asyncio.to_thread(self._write_disk, key, document)
+    
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}.json"
+    
+    def _read_disk(self, key: str) -> Optional[ParsedDocument]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                document = ParsedDocument(**json.load(f))
+            os.utime(path)  # Mark as recently used for eviction
+            return document
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Discarding unreadable document cache entry %s: %s", path.name, e)
+            path.unlink(missing_ok=True)
+            return None
+    
+    def _write_disk(self, key: str, document: ParsedDocument) -> None:
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see partial JSON
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(asdict(document), f)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError as e:
+            logger.warning("Failed to write document cache entry: %s", e)
+    
+    def _evict_disk(self) -> None:
+        """Delete least-recently-used entries until the disk tier fits its bound"""
+        with self._disk_lock:
+            entries = []
+            for path in self._directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self._disk_max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+    
+    def clear(self) -> None:
+        """Empty the in-memory tier"""
+        self._memory.clear()
+    
+    def stats(self) -> dict:
+        """Cache counters for logging and metrics"""
+        lookups = self.hits + self.misses
+        return {
+            **self._memory.stats(),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "disk_enabled": self.disk_enabled
+        }
+
+
+# Global cache instance
+document_cache = DocumentCache(
+    max_bytes=int(settings.document_cache_max_mb * 1024 * 1024),
+    directory=settings.document_cache_dir,
+    disk_max_bytes=int(settings.document_cache_disk_max_mb * 1024 * 1024),
+    shared=shared_cache
+)
+
+
+async def parse_upload(
+    upload: SpooledUpload,
+    filename: str,
+    max_chars: Optional[int] = None,
+    pages: Optional[List[int]] = None
+) -> ParsedDocument:
+    """
+    Parse a validated upload, reusing the result for repeat uploads.
+    
+    Args:
+        upload: Spooled upload from validate_uploaded_file
+        filename: Original filename
+        max_chars: Stop extracting once this many characters are collected
+        pages: Zero-based page indices to extract (PDF only)
+    
+    Returns:
+        ParsedDocument with the extracted text and metadata
+    """
+    if not settings.document_cache_enabled:
+        return await FileParser.parse_document_async(upload, filename, max_chars, pages)
+    
+    key = document_key(upload.digest, filename, max_chars, pages)
+    document = await document_cache.get(key, upload.size)
+    if document is not None:
+        logger.info("Parsed document cache hit for %s (%s bytes)", filename, upload.size)
+        return document
+    
+    document = await FileParser.parse_document_async(upload, filename, max_chars, pages)
+    await document_cache.set(key, document)
+    return document
+
+
+async def stream_upload(
+    upload: SpooledUpload,
+    filename: str,
+    max_chars: Optional[int] = None,
+    pages: Optional[List[int]] = None
+) -> DocumentStream:
+    """
+    Stream a validated upload's parts, replaying a cached parse for repeat uploads.
+    
+    A freshly parsed document is stored in the cache once its stream has
+    been read to the end.
+    
+    Args:
+        upload: Spooled upload from validate_uploaded_file
+        filename: Original filename
+        max_chars: Stop extracting once this many characters are collected
+        pages: Zero-based page indices to extract (PDF only)
+    
+    Returns:
+        DocumentStream of the upload's pages or paragraphs
+    """
+    if not settings.document_cache_enabled:
+        return FileParser.stream_document(upload, filename, max_chars, pages)
+    
+    key = document_key(upload.digest, filename, max_chars, pages)
+    document = await document_cache.get(key, upload.size)
+    if document is not None:
+        logger.info("Parsed document cache hit for %s (%s bytes)", filename, upload.size)
+        return DocumentStream.from_document(document)
+    
+    async def store(parsed: ParsedDocument) -> None:
+        await document_cache.set(key, parsed)
+    
+    return FileParser.stream_document(upload, filename, max_chars, pages, on_complete=store)
@@ -1,13 +1,319 @@
-"""File parsing utilities for TXT, PDF, and DOCX files"""
+"""File parsing utilities for TXT, PDF, DOCX, HTML, Markdown and EPUB files"""
+import io
+import os
+import time
+import atexit
+import asyncio
 import logging
-from typing import BinaryIO
-import PyPDF2
-from docx import Document
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from typing import (
+    AsyncIterator, Awaitable, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+)
+from xml.etree.ElementTree import ParseError, iterparse
 
+from core.config import settings
 from core.exceptions import UnsupportedFileException, ValidationException
+from core.timing import record as record_timing
+from core.tracing import record_span, traced
+from utils.text_normalizer import PageNormalizer, normalize_pages
+from utils.markup_parser import iter_epub_chapters, iter_html_paragraphs, iter_markdown_paragraphs
 
 logger = logging.getLogger(__name__)
 
+# Separator placed between pages and paragraphs in extracted text
+PART_SEPARATOR = "\n\n"
+
+# Pages in the first PDF range of a stream. It finishes before the full-size
+# ranges, so the first pages reach callers early; at least MIN_REPEAT_PAGES
+# so running headers can still be learned from it.
+FIRST_RANGE_PAGES = 5
+
+# WordprocessingML element tags used by the streaming DOCX extractor
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_PARAGRAPH = _W + "p"
+_W_TEXT = _W + "t"
+_W_TAB = _W + "tab"
+_W_BREAKS = (_W + "br", _W + "cr")
+_W_ROW = _W + "tr"
+_W_CELL = _W + "tc"
+_W_BODY = _W + "body"
+
+# Separator placed between the cells of a table row
+CELL_SEPARATOR = "\t"
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_unavailable = False
+_parse_pool_lock = threading.Lock()
+
+
+@dataclass
+class Chapter:
+    """A chapter's title and its character range in ParsedDocument.text"""
+    title: Optional[str]
+    start: int
+    end: int
+
+
+@dataclass
+class ParsedDocument:
+    """Text extracted from a document, with extraction metadata"""
+    text: str
+    page_count: Optional[int] = None  # Pages in the source (PDF only)
+    pages_parsed: Optional[int] = None  # Pages actually extracted (PDF only)
+    truncated: bool = False  # Extraction stopped at the character budget
+    chars_removed: int = 0  # Characters dropped by normalization
+    chapters: Optional[List[Chapter]] = None  # Chapter boundaries (EPUB only)
+    
+    def __post_init__(self):
+        # Chapters come back as dicts when loaded from JSON
+        if self.chapters:
+            self.chapters = [
+                c if isinstance(c, Chapter) else Chapter(**c) for c in self.chapters
+            ]
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the shared parsing process pool, creating it on first use.
+    
+    Returns None when the pool is disabled (PARSER_WORKERS=0) or the
+    platform cannot start worker processes (e.g. no POSIX semaphores on
+    some serverless runtimes); callers then parse in a thread instead.
+    """
+    global _parse_pool, _parse_pool_unavailable
+    
+    if _parse_pool is not None or _parse_pool_unavailable:
+        return _parse_pool
+    
+    workers = _pool_workers()
+    if workers <= 0:
+        _parse_pool_unavailable = True
+        return None
+    
+    with _parse_pool_lock:
+        if _parse_pool is None and not _parse_pool_unavailable:
+            try:
+                _parse_pool = ProcessPoolExecutor(max_workers=workers)
+                atexit.register(shutdown_parse_pool)
+                logger.info("Started parse pool with %s workers", workers)
+            except (OSError, NotImplementedError) as e:
+                logger.warning("Process pool unavailable, parsing in threads: %s", e)
+                _parse_pool_unavailable = True
+    
+    return _parse_pool
+
+
+def _pool_workers() -> int:
+    workers = settings.parser_workers
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    return workers
+
+
+def shutdown_parse_pool():
+    """Shut down the parsing process pool"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = None
+
+
+def _drop_futures(futures: Dict[int, asyncio.Future]) -> None:
+    """Cancel extraction futures whose results are no longer needed"""
+    for future in futures.values():
+        if future.done() and not future.cancelled():
+            future.exception()  # Retrieved so it is not logged as unhandled
+        future.cancel()
+    futures.clear()
+
+
+def _apply_budget(parts: List[str], max_chars: Optional[int]) -> Tuple[List[str], bool]:
+    """
+    Keep parts until the joined text reaches max_chars.
+    
+    The part that crosses the budget is cut at the last whitespace before it.
+    
+    Returns:
+        Tuple of (kept_parts, truncated)
+    """
+    if max_chars is None:
+        return parts, False
+    
+    kept = []
+    used = 0
+    for part in parts:
+        if kept:
+            used += len(PART_SEPARATOR)
+        if used + len(part) <= max_chars:
+            kept.append(part)
+            used += len(part)
+            continue
+        
+        room = max_chars - used
+        if room > 0:
+            cut = part[:room]
+            boundary = cut.rfind(" ")
+            cut = cut[:boundary] if boundary > 0 else cut
+            if cut.strip():
+                kept.append(cut.rstrip())
+        return kept, True
+    
+    return kept, False
+
+
+def _normalize(parts: List[str], strip_repeated: bool = True) -> Tuple[List[str], int]:
+    """Normalize extracted parts, returning (parts, chars_removed)"""
+    if not settings.normalize_extracted_text:
+        return parts, 0
+    normalized = normalize_pages(parts, strip_repeated)
+    return normalized.pages, normalized.chars_removed
+
+
+def _take_parts(parts: Iterable[str], max_chars: Optional[int] = None) -> List[str]:
+    """Collect parts from an iterator until their joined length exceeds max_chars"""
+    taken = []
+    length = 0
+    for part in parts:
+        length += len(part) + (len(PART_SEPARATOR) if taken else 0)
+        taken.append(part)
+        if max_chars is not None and length > max_chars:
+            break
+    return taken
+
+
+def _budget_document(
+    parts: List[str],
+    max_chars: Optional[int] = None,
+    chars_removed: int = 0
+) -> ParsedDocument:
+    """Build a ParsedDocument from parts cut to the character budget"""
+    parts, truncated = _apply_budget(parts, max_chars)
+    return ParsedDocument(
+        text=PART_SEPARATOR.join(parts),
+        truncated=truncated,
+        chars_removed=chars_removed
+    )
+
+
+def _joined_length(parts: List[str]) -> int:
+    return sum(len(p) for p in parts) + len(PART_SEPARATOR) * max(0, len(parts) - 1)
+
+
+def _count_pdf_pages(data: bytes) -> int:
+    """Count the pages of a PDF"""
+    import PyPDF2
+    
+    return len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+
+
+def _extract_pdf_pages(
+    data: bytes,
+    indices: Sequence[int],
+    max_chars: Optional[int] = None
+) -> List[Tuple[str, float]]:
+    """
+    Extract text from the given PDF pages (runs in a worker process).
+    
+    Stops early once the extracted text exceeds max_chars.
+    
+    Returns:
+        List of (page_text, seconds) tuples, one per extracted page
+    """
+    import PyPDF2
+    
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    results = []
+    extracted = 0
+    for index in indices:
+        page_start = time.perf_counter()
+        text = reader.pages[index].extract_text() or ""
+        results.append((text, time.perf_counter() - page_start))
+        extracted += len(text)
+        if max_chars is not None and extracted > max_chars:
+            break
+    return results
+
+
+def _iter_docx_parts(file: BinaryIO) -> Iterator[str]:
+    """
+    Stream text from a DOCX body without building the python-docx object model.
+    
+    Iterparses word/document.xml straight from the zip archive, yielding
+    each non-empty paragraph and each table row (cells joined by tabs) in
+    document order. Finished elements are cleared as they are consumed, so
+    memory use stays flat however long the document is.
+    
+    Raises:
+        KeyError: If the archive has no word/document.xml
+        zipfile.BadZipFile, ParseError: If the file is not valid DOCX
+    """
+    with zipfile.ZipFile(file) as archive, archive.open("word/document.xml") as xml:
+        runs: List[str] = []
+        rows: List[List[str]] = []  # Cells of the table rows being read (nested tables stack)
+        cells: List[List[str]] = []  # Paragraphs of the table cells being read
+        body = None
+        depth = 0
+        
+        for event, elem in iterparse(xml, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if elem.tag == _W_BODY:
+                    body = elem
+                elif elem.tag == _W_ROW:
+                    rows.append([])
+                elif elem.tag == _W_CELL:
+                    cells.append([])
+                continue
+            
+            depth -= 1
+            tag = elem.tag
+            if tag == _W_TEXT:
+                runs.append(elem.text or "")
+            elif tag == _W_TAB:
+                runs.append("\t")
+            elif tag in _W_BREAKS:
+                runs.append("\n")
+            elif tag == _W_PARAGRAPH:
+                text = "".join(runs)
+                runs.clear()
+                if cells:
+                    if text.strip():
+                        cells[-1].append(text)
+                elif text.strip():
+                    yield text
+            elif tag == _W_CELL:
+                cell = "\n".join(cells.pop())
+                if rows:
+                    rows[-1].append(cell)
+            elif tag == _W_ROW:
+                row = [cell for cell in rows.pop() if cell.strip()]
+                if row:
+                    if cells:
+                        cells[-1].append(CELL_SEPARATOR.join(row))
+                    else:
+                        yield CELL_SEPARATOR.join(row)
+            
+            # Drop consumed elements so the tree never grows past one block
+            if tag in (_W_PARAGRAPH, _W_ROW):
+                elem.clear()
+            if body is not None and depth == 2:
+                body.remove(elem)
+
+
+def _parse_bytes(
+    data: bytes,
+    filename: str,
+    max_chars: Optional[int] = None,
+    pages: Optional[List[int]] = None
+) -> ParsedDocument:
+    """Parse a whole file from bytes (runs in a worker process)"""
+    return FileParser.parse_document(io.BytesIO(data), filename, max_chars, pages)
+
 
 class FileParser:
     """Parse text from various file formats"""
@@ -24,53 +330,242 @@ class FileParser:
                 # Fallback to Latin-1
                 return content.decode('latin-1')
         except Exception as e:
-            logger.error(f"Failed to parse TXT file: {str(e)}")
+            logger.error("Failed to parse TXT file: %s", e)
             raise ValidationException(f"Failed to read TXT file: {str(e)}")
     
     @staticmethod
     def parse_pdf(file: BinaryIO) -> str:
         """Parse text from PDF file"""
+        return FileParser.parse_pdf_document(file).text
+    
+    @staticmethod
+    def parse_pdf_document(
+        file: BinaryIO,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> ParsedDocument:
+        """
+        Parse text from selected PDF pages, stopping at a character budget.
+        
+        Args:
+            file: PDF file object
+            max_chars: Stop extracting once this many characters are collected
+            pages: Zero-based page indices to extract (all pages if None)
+        
+        Returns:
+            ParsedDocument with page counts and truncation flag
+        """
+        # PDF and DOCX libraries are imported on first use to keep cold starts light
+        import PyPDF2
+        
         try:
             pdf_reader = PyPDF2.PdfReader(file)
+            page_count = len(pdf_reader.pages)
+            indices = FileParser._select_pages(pages, page_count)
             text_parts = []
+            pages_parsed = 0
             
-            for page in pdf_reader.pages:
-                text = page.extract_text()
+            for index in indices:
+                text = pdf_reader.pages[index].extract_text()
+                pages_parsed += 1
                 if text:
                     text_parts.append(text)
+                if max_chars is not None and _joined_length(text_parts) > max_chars:
+                    break
+            
+            text_parts, chars_removed = _normalize(text_parts)
+            text_parts, truncated = _apply_budget(text_parts, max_chars)
+            truncated = truncated or pages_parsed < len(indices)
             
             if not text_parts:
                 raise ValidationException("No text found in PDF file")
             
-            return "\n\n".join(text_parts)
-            
+            return ParsedDocument(
+                text=PART_SEPARATOR.join(text_parts),
+                page_count=page_count,
+                pages_parsed=pages_parsed,
+                truncated=truncated,
+                chars_removed=chars_removed
+            )
+        
+        except ValidationException:
+            raise
         except PyPDF2.errors.PdfReadError as e:
-            logger.error(f"Failed to parse PDF file: {str(e)}")
+            logger.error("Failed to parse PDF file: %s", e)
             raise ValidationException(f"Corrupted or invalid PDF file: {str(e)}")
         except Exception as e:
-            logger.error(f"Failed to parse PDF file: {str(e)}")
+            logger.error("Failed to parse PDF file: %s", e)
             raise ValidationException(f"Failed to read PDF file: {str(e)}")
     
     @staticmethod
-    def parse_docx(file: BinaryIO) -> str:
-        """Parse text from DOCX file"""
+    def _select_pages(pages: Optional[List[int]], page_count: int) -> List[int]:
+        """Resolve requested page indices against the document's page count"""
+        if pages is None:
+            return list(range(page_count))
+        
+        out_of_range = [p + 1 for p in pages if p >= page_count]
+        if out_of_range:
+            raise ValidationException(
+                f"Requested pages exceed the document's {page_count} pages",
+                details={"field": "pages", "page_count": page_count, "invalid_pages": out_of_range}
+            )
+        return pages
+    
+    @staticmethod
+    def parse_docx(file: BinaryIO, max_chars: Optional[int] = None) -> str:
+        """
+        Parse text from DOCX file, stopping once max_chars are collected.
+        
+        Paragraphs and table rows are streamed from the document XML. Files
+        the streaming extractor cannot read are retried with python-docx.
+        """
         try:
-            doc = Document(file)
-            text_parts = []
-            
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
+            try:
+                text_parts = _take_parts(_iter_docx_parts(file), max_chars)
+            except (zipfile.BadZipFile, KeyError, ParseError) as e:
+                logger.warning("Streaming DOCX extraction failed, falling back to python-docx: %s", e)
+                text_parts = FileParser._parse_docx_document(file, max_chars)
             
             if not text_parts:
                 raise ValidationException("No text found in DOCX file")
             
-            return "\n\n".join(text_parts)
-            
+            return PART_SEPARATOR.join(text_parts)
+        
+        except ValidationException:
+            raise
         except Exception as e:
-            logger.error(f"Failed to parse DOCX file: {str(e)}")
+            logger.error("Failed to parse DOCX file: %s", e)
             raise ValidationException(f"Failed to read DOCX file: {str(e)}")
     
+    @staticmethod
+    def _parse_docx_document(file: BinaryIO, max_chars: Optional[int] = None) -> List[str]:
+        """Read DOCX paragraphs through the python-docx object model"""
+        from docx import Document
+        
+        file.seek(0)
+        doc = Document(file)
+        text_parts = []
+        
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                text_parts.append(paragraph.text)
+            if max_chars is not None and _joined_length(text_parts) > max_chars:
+                break
+        
+        return text_parts
+    
+    @staticmethod
+    def parse_html(file: BinaryIO, max_chars: Optional[int] = None) -> str:
+        """Parse visible text from an HTML file, stopping once max_chars are collected"""
+        try:
+            text_parts = _take_parts(iter_html_paragraphs(file), max_chars)
+        except Exception as e:
+            logger.error("Failed to parse HTML file: %s", e)
+            raise ValidationException(f"Failed to read HTML file: {str(e)}")
+        
+        if not text_parts:
+            raise ValidationException("No text found in HTML file")
+        return PART_SEPARATOR.join(text_parts)
+    
+    @staticmethod
+    def parse_markdown(file: BinaryIO, max_chars: Optional[int] = None) -> str:
+        """Parse plain text from a Markdown file, stopping once max_chars are collected"""
+        try:
+            text_parts = _take_parts(iter_markdown_paragraphs(file), max_chars)
+        except Exception as e:
+            logger.error("Failed to parse Markdown file: %s", e)
+            raise ValidationException(f"Failed to read Markdown file: {str(e)}")
+        
+        if not text_parts:
+            raise ValidationException("No text found in Markdown file")
+        return PART_SEPARATOR.join(text_parts)
+    
+    @staticmethod
+    def parse_epub_document(file: BinaryIO, max_chars: Optional[int] = None) -> ParsedDocument:
+        """
+        Parse an EPUB book chapter by chapter, stopping at a character budget.
+        
+        Args:
+            file: EPUB file object
+            max_chars: Stop reading chapters once this many characters are collected
+        
+        Returns:
+            ParsedDocument with chapter boundaries
+        """
+        text_parts: List[str] = []
+        chapters: List[Chapter] = []
+        length = 0
+        truncated = False
+        
+        try:
+            for chapter in iter_epub_chapters(file):
+                if text_parts:
+                    length += len(PART_SEPARATOR)
+                start = length
+                text_parts.extend(chapter.paragraphs)
+                length += _joined_length(chapter.paragraphs)
+                chapters.append(Chapter(title=chapter.title, start=start, end=length))
+                if max_chars is not None and length > max_chars:
+                    truncated = True
+                    break
+        except Exception as e:
+            logger.error("Failed to parse EPUB file: %s", e)
+            raise ValidationException(f"Failed to read EPUB file: {str(e)}")
+        
+        text_parts, cut = _apply_budget(text_parts, max_chars)
+        text = PART_SEPARATOR.join(text_parts)
+        if not text:
+            raise ValidationException("No text found in EPUB file")
+        
+        # Clamp chapter ranges to the text kept within the budget
+        chapters = [
+            Chapter(title=c.title, start=c.start, end=min(c.end, len(text)))
+            for c in chapters if c.start < len(text)
+        ]
+        return ParsedDocument(text=text, truncated=truncated or cut, chapters=chapters)
+    
+    @staticmethod
+    def _parse_epub_book(
+        file: BinaryIO,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> ParsedDocument:
+        return FileParser.parse_epub_document(file, max_chars)
+    
+    @staticmethod
+    def _parse_text_document(
+        file: BinaryIO,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> ParsedDocument:
+        # Plain text has no pages, so only reflow and whitespace apply
+        parts, chars_removed = _normalize([FileParser.parse_txt(file)], strip_repeated=False)
+        return _budget_document(parts, max_chars, chars_removed)
+    
+    @staticmethod
+    def _parse_docx_text_document(
+        file: BinaryIO,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> ParsedDocument:
+        return _budget_document([FileParser.parse_docx(file, max_chars)], max_chars)
+    
+    @staticmethod
+    def _parse_html_document(
+        file: BinaryIO,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> ParsedDocument:
+        return _budget_document([FileParser.parse_html(file, max_chars)], max_chars)
+    
+    @staticmethod
+    def _parse_markdown_document(
+        file: BinaryIO,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> ParsedDocument:
+        return _budget_document([FileParser.parse_markdown(file, max_chars)], max_chars)
+    
     @staticmethod
     def parse_file(file: BinaryIO, filename: str) -> str:
         """
@@ -83,15 +578,351 @@ class FileParser:
         Returns:
             Extracted text
         """
+        return FileParser.parse_document(file, filename).text
+    
+    @staticmethod
+    def parse_document(
+        file: BinaryIO,
+        filename: str,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> ParsedDocument:
+        """
+        Parse a file based on extension, stopping at a character budget.
+        
+        Args:
+            file: File object
+            filename: Original filename
+            max_chars: Stop extracting once this many characters are collected
+            pages: Zero-based page indices to extract (PDF only)
+        
+        Returns:
+            ParsedDocument with the extracted text and metadata
+        """
         # Get file extension
         extension = filename.split(".")[-1].lower()
         
+        if pages is not None and extension != "pdf":
+            raise ValidationException(
+                "Page selection is only supported for PDF files",
+                details={"field": "pages", "file_type": extension}
+            )
+        
         # Parse based on extension
-        if extension == "txt":
-            return FileParser.parse_txt(file)
-        elif extension == "pdf":
-            return FileParser.parse_pdf(file)
-        elif extension == "docx":
-            return FileParser.parse_docx(file)
+        parser = DOCUMENT_PARSERS.get(extension)
+        if parser is None:
+            raise UnsupportedFileException(extension, SUPPORTED_EXTENSIONS)
+        return parser(file, max_chars, pages)
+    
+    @staticmethod
+    async def parse_file_async(file: BinaryIO, filename: str) -> str:
+        """Parse text from a file without blocking the event loop"""
+        document = await FileParser.parse_document_async(file, filename)
+        return document.text
+    
+    @staticmethod
+    @traced("file_parser.parse")
+    async def parse_document_async(
+        file: BinaryIO,
+        filename: str,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> ParsedDocument:
+        """
+        Parse a file without blocking the event loop.
+        
+        Parsing runs in the shared process pool (or a thread reading the file
+        directly when the pool is unavailable). PDF pages are split into
+        ranges of PARSER_PAGES_PER_TASK pages extracted in parallel and merged
+        in order; no further ranges are started once max_chars is reached.
+        
+        Args:
+            file: File object (e.g. a spooled upload)
+            filename: Original filename
+            max_chars: Stop extracting once this many characters are collected
+            pages: Zero-based page indices to extract (PDF only)
+        
+        Returns:
+            ParsedDocument with the extracted text and metadata
+        """
+        extension = filename.split(".")[-1].lower()
+        if extension not in SUPPORTED_EXTENSIONS:
+            raise UnsupportedFileException(extension, SUPPORTED_EXTENSIONS)
+        
+        pool = get_parse_pool()
+        if pool is None:
+            return await asyncio.to_thread(
+                FileParser.parse_document, file, filename, max_chars, pages
+            )
+        
+        if extension == "pdf":
+            return await FileParser.stream_document(file, filename, max_chars, pages).read()
+        
+        # Worker processes need their own copy of the (size-limited) content
+        content = await asyncio.to_thread(file.read)
+        
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                pool, _parse_bytes, content, filename, max_chars, pages
+            )
+        except BrokenProcessPool:
+            logger.warning("Parse pool broken, retrying in a thread")
+            shutdown_parse_pool()
+            return await asyncio.to_thread(_parse_bytes, content, filename, max_chars, pages)
+    
+    @staticmethod
+    def stream_document(
+        file: BinaryIO,
+        filename: str,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None,
+        on_complete: Optional[Callable[[ParsedDocument], Awaitable[None]]] = None
+    ) -> "DocumentStream":
+        """
+        Parse a file into a stream of parts yielded as they are extracted.
+        
+        PDF pages are yielded in order as each page range finishes in the
+        process pool, so callers can start work on early pages while
+        later ones are still being extracted. Other formats (and PDFs when
+        the pool is unavailable) are parsed whole and then yielded paragraph
+        by paragraph.
+        
+        Args:
+            file: File object (e.g. a spooled upload)
+            filename: Original filename
+            max_chars: Stop extracting once this many characters are collected
+            pages: Zero-based page indices to extract (PDF only)
+            on_complete: Awaited with the full ParsedDocument once the stream ends
+        
+        Returns:
+            DocumentStream to iterate once
+        """
+        extension = filename.split(".")[-1].lower()
+        if extension not in SUPPORTED_EXTENSIONS:
+            raise UnsupportedFileException(extension, SUPPORTED_EXTENSIONS)
+        
+        document = ParsedDocument(text="")
+        pool = get_parse_pool()
+        if extension == "pdf" and pool is not None:
+            parts = FileParser._iter_pdf_parallel(file, pool, document, max_chars, pages)
         else:
-            raise UnsupportedFileException(extension)
+            parts = FileParser._iter_parsed(file, filename, document, max_chars, pages)
+        return DocumentStream(parts, document, on_complete)
+    
+    @staticmethod
+    async def _iter_parsed(
+        file: BinaryIO,
+        filename: str,
+        document: ParsedDocument,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> AsyncIterator[str]:
+        """Parse a whole file, then yield its parts"""
+        parsed = await FileParser.parse_document_async(file, filename, max_chars, pages)
+        document.page_count = parsed.page_count
+        document.pages_parsed = parsed.pages_parsed
+        document.truncated = parsed.truncated
+        document.chars_removed = parsed.chars_removed
+        document.chapters = parsed.chapters
+        for part in parsed.text.split(PART_SEPARATOR):
+            yield part
+    
+    @staticmethod
+    async def _iter_pdf_parallel(
+        file: BinaryIO,
+        pool: Optional[ProcessPoolExecutor],
+        document: ParsedDocument,
+        max_chars: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> AsyncIterator[str]:
+        """Extract PDF page ranges in parallel worker processes, yielding pages in order"""
+        import PyPDF2
+        
+        loop = asyncio.get_running_loop()
+        start_time = time.perf_counter()
+        
+        def run(fn, *args):
+            if pool is None:
+                return asyncio.to_thread(fn, *args)
+            return loop.run_in_executor(pool, fn, *args)
+        
+        # Worker processes need their own copy of the (size-limited) content
+        content = await asyncio.to_thread(file.read)
+        normalizer = PageNormalizer() if settings.normalize_extracted_text else None
+        page_ms: List[float] = []
+        in_flight: Dict[int, asyncio.Future] = {}
+        used = 0
+        yielded = 0
+        tasks = 0
+        
+        try:
+            try:
+                page_count = await run(_count_pdf_pages, content)
+            except BrokenProcessPool:
+                logger.warning("Parse pool broken, extracting in a thread")
+                shutdown_parse_pool()
+                pool = None
+                page_count = await run(_count_pdf_pages, content)
+            
+            indices = FileParser._select_pages(pages, page_count)
+            document.page_count = page_count
+            document.pages_parsed = 0
+            
+            pages_per_task = max(1, settings.parser_pages_per_task)
+            first_pages = min(FIRST_RANGE_PAGES, pages_per_task)
+            ranges = [indices[:first_pages]] if indices else []
+            ranges += [
+                indices[start:start + pages_per_task]
+                for start in range(first_pages, len(indices), pages_per_task)
+            ]
+            
+            def submit(position: int) -> None:
+                nonlocal tasks
+                in_flight[position] = asyncio.ensure_future(
+                    run(_extract_pdf_pages, content, ranges[position], max_chars)
+                )
+                tasks += 1
+            
+            # Keep a range per worker in flight and consume them in order, so
+            # each range's pages are yielded as soon as it and those before it
+            # are done; stop once the budget is met
+            workers = max(1, _pool_workers())
+            for position, page_range in enumerate(ranges):
+                for ahead in range(position, min(position + workers, len(ranges))):
+                    if ahead not in in_flight:
+                        submit(ahead)
+                try:
+                    chunk = await in_flight.pop(position)
+                except BrokenProcessPool:
+                    logger.warning("Parse pool broken, extracting remaining pages in a thread")
+                    shutdown_parse_pool()
+                    pool = None
+                    _drop_futures(in_flight)
+                    submit(position)
+                    chunk = await in_flight.pop(position)
+                
+                # A range that stopped early hit the budget; later ranges are not used
+                stopped = len(chunk) < len(page_range)
+                document.pages_parsed += len(chunk)
+                page_ms.extend(seconds * 1000 for _, seconds in chunk)
+                texts = [text for text, _ in chunk if text]
+                
+                for part in normalizer.feed(texts) if normalizer else texts:
+                    room = None
+                    if max_chars is not None:
+                        room = max_chars - used - (len(PART_SEPARATOR) if yielded else 0)
+                    kept, truncated = _apply_budget([part], room)
+                    if kept:
+                        used += len(kept[0]) + (len(PART_SEPARATOR) if yielded else 0)
+                        yielded += 1
+                        yield kept[0]
+                    if truncated:
+                        document.truncated = True
+                        break
+                
+                if document.truncated or stopped:
+                    break
+        except ValidationException:
+            raise
+        except PyPDF2.errors.PdfReadError as e:
+            logger.error("Failed to parse PDF file: %s", e)
+            raise ValidationException(f"Corrupted or invalid PDF file: {str(e)}")
+        except Exception as e:
+            logger.error("Failed to parse PDF file: %s", e)
+            raise ValidationException(f"Failed to read PDF file: {str(e)}")
+        finally:
+            _drop_futures(in_flight)
+        
+        document.truncated = document.truncated or document.pages_parsed < len(indices)
+        document.chars_removed = normalizer.chars_removed if normalizer else 0
+        
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            "Parsed %d of %d PDF pages in %.2fms using %d task(s), %.2fms/page avg, %.2fms max",
+            len(page_ms), page_count, elapsed_ms, tasks,
+            sum(page_ms) / max(1, len(page_ms)), max(page_ms, default=0)
+        )
+        
+        if not yielded:
+            raise ValidationException("No text found in PDF file")
+
+
+# Document parsers by file extension. Each takes (file, max_chars, pages)
+# and returns a ParsedDocument; only the PDF parser accepts a page selection.
+DOCUMENT_PARSERS: Dict[str, Callable[..., ParsedDocument]] = {
+    "txt": FileParser._parse_text_document,
+    "pdf": FileParser.parse_pdf_document,
+    "docx": FileParser._parse_docx_text_document,
+    "html": FileParser._parse_html_document,
+    "htm": FileParser._parse_html_document,
+    "md": FileParser._parse_markdown_document,
+    "markdown": FileParser._parse_markdown_document,
+    "epub": FileParser._parse_epub_book,
+}
+
+SUPPORTED_EXTENSIONS = tuple(DOCUMENT_PARSERS)
+
+
+class DocumentStream:
+    """
+    Parts of a document (pages or paragraphs) yielded in order as they are extracted.
+    
+    Iterate once with `async for`. Page counts are filled in as extraction
+    progresses; once iteration finishes, `document` holds the complete
+    ParsedDocument including its text.
+    """
+    
+    def __init__(
+        self,
+        parts: AsyncIterator[str],
+        document: ParsedDocument,
+        on_complete: Optional[Callable[[ParsedDocument], Awaitable[None]]] = None
+    ):
+        self._parts = parts
+        self._on_complete = on_complete
+        self.document = document
+    
+    @classmethod
+    def from_document(cls, document: ParsedDocument) -> "DocumentStream":
+        """Stream the parts of an already parsed document"""
+        async def parts():
+            for part in document.text.split(PART_SEPARATOR):
+                yield part
+        
+        return cls(parts(), replace(document, text=""))
+    
+    async def __aiter__(self) -> AsyncIterator[str]:
+        collected = []
+        parts = aiter(self._parts)
+        # Only time spent producing parts counts; the consumer's work between them does not
+        parse_seconds = 0.0
+        stream_start_ns = time.time_ns()
+        while True:
+            started = time.perf_counter()
+            try:
+                part = await anext(parts)
+            except StopAsyncIteration:
+                break
+            finally:
+                parse_seconds += time.perf_counter() - started
+            collected.append(part)
+            yield part
+        record_timing("parse", parse_seconds * 1000)
+        record_span(
+            "file_parser.stream",
+            stream_start_ns,
+            time.time_ns(),
+            parts=len(collected),
+            parse_ms=round(parse_seconds * 1000, 2)
+        )
+        
+        self.document.text = PART_SEPARATOR.join(collected)
+        if self._on_complete is not None:
+            await self._on_complete(self.document)
+    
+    async def read(self) -> ParsedDocument:
+        """Consume the stream and return the complete document"""
+        async for _ in self:
+            pass
+        return self.document
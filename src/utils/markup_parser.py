@@ -0,0 +1,301 @@
+"""Streaming text extraction from HTML, Markdown and EPUB documents"""
+import codecs
+import io
+import posixpath
+import re
+import zipfile
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import BinaryIO, Iterator, List, Optional
+from urllib.parse import unquote
+from xml.etree import ElementTree
+
+# Bytes read from the source per iteration
+READ_CHUNK_SIZE = 64 * 1024
+
+# Elements that end the current paragraph
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "caption", "dd", "div",
+    "dl", "dt", "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5",
+    "h6", "header", "hr", "li", "main", "ol", "p", "pre", "section", "table",
+    "tbody", "td", "th", "thead", "tr", "ul",
+})
+
+# Elements whose content is never reader-facing text
+SKIPPED_TAGS = frozenset({
+    "head", "script", "style", "noscript", "template", "svg", "math", "nav",
+})
+
+HEADING_TAGS = frozenset({"h1", "h2", "h3"})
+
+_WHITESPACE = re.compile(r"\s+")
+
+_CONTAINER_NS = "{urn:oasis:names:tc:opendocument:xmlns:container}"
+_OPF_NS = "{http://www.idpf.org/2007/opf}"
+_EPUB_DOCUMENT_TYPES = ("application/xhtml+xml", "text/html")
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collect paragraphs from fed HTML, tracking the first heading"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self.title: Optional[str] = None
+        self._current: List[str] = []
+        self._skip_depth = 0
+        self._heading: Optional[List[str]] = None
+    
+    def _flush(self):
+        text = _WHITESPACE.sub(" ", "".join(self._current)).strip()
+        self._current = []
+        if text:
+            self.paragraphs.append(text)
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            if tag in HEADING_TAGS and self.title is None:
+                self._heading = []
+    
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._flush()
+    
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            if tag in HEADING_TAGS and self._heading is not None:
+                self.title = _WHITESPACE.sub(" ", "".join(self._heading)).strip() or None
+                self._heading = None
+    
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self._current.append(data)
+        if self._heading is not None:
+            self._heading.append(data)
+    
+    def drain(self) -> List[str]:
+        """Return and forget the paragraphs completed so far"""
+        paragraphs, self.paragraphs = self.paragraphs, []
+        return paragraphs
+    
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def iter_html_paragraphs(
+    file: BinaryIO,
+    extractor: Optional[_HTMLTextExtractor] = None
+) -> Iterator[str]:
+    """
+    Stream paragraphs of visible text from an HTML document.
+    
+    The document is decoded and fed to the parser in chunks, and each
+    paragraph is yielded as soon as its closing block element is seen, so
+    memory stays bounded by the longest paragraph. Scripts, styles and
+    navigation are skipped.
+    
+    Args:
+        file: HTML file object
+        extractor: Parser to use (lets callers read the first heading)
+    
+    Yields:
+        Whitespace-collapsed paragraph texts in document order
+    """
+    extractor = extractor or _HTMLTextExtractor()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    
+    while chunk := file.read(READ_CHUNK_SIZE):
+        extractor.feed(decoder.decode(chunk))
+        yield from extractor.drain()
+    
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    yield from extractor.drain()
+
+
+# Markdown syntax stripped from each line, in order
+_MD_FENCE = re.compile(r"^\s*(```|~~~)")
+_MD_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_MD_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+_MD_SETEXT = re.compile(r"^\s*(=+|-+)\s*$")
+_MD_QUOTE = re.compile(r"^\s*>\s?")
+_MD_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_MD_TABLE_DIVIDER = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+_MD_INLINE = (
+    (re.compile(r"!\[([^\]]*)\]\([^)]*\)"), r"\1"),  # Images keep their alt text
+    (re.compile(r"\[([^\]]+)\]\([^)]*\)"), r"\1"),  # Links keep their label
+    (re.compile(r"\[([^\]]+)\]\[[^\]]*\]"), r"\1"),  # Reference links
+    (re.compile(r"`([^`]+)`"), r"\1"),
+    (re.compile(r"(\*\*|__)(.+?)\1"), r"\2"),
+    (re.compile(r"(\*|_)(.+?)\1"), r"\2"),
+    (re.compile(r"~~(.+?)~~"), r"\1"),
+    (re.compile(r"<[^>]+>"), ""),
+)
+
+
+def _strip_inline_markdown(line: str) -> str:
+    for pattern, replacement in _MD_INLINE:
+        line = pattern.sub(replacement, line)
+    return line.strip()
+
+
+def iter_markdown_paragraphs(file: BinaryIO) -> Iterator[str]:
+    """
+    Stream paragraphs of plain text from a Markdown document.
+    
+    Reads line by line, dropping front matter, horizontal rules, table
+    dividers and inline markup (links keep their labels, images their alt
+    text). Headings, list items and table rows become paragraphs of their
+    own; fenced code blocks are kept verbatim.
+    
+    Args:
+        file: Markdown file object
+    
+    Yields:
+        Paragraph texts in document order
+    """
+    lines = io.TextIOWrapper(file, encoding="utf-8", errors="replace")
+    paragraph: List[str] = []
+    fence: Optional[str] = None
+    first_line = True
+    in_front_matter = False
+    
+    try:
+        for raw in lines:
+            line = raw.rstrip("\n")
+            
+            if first_line:
+                first_line = False
+                if line.strip() == "---":
+                    in_front_matter = True
+                    continue
+            if in_front_matter:
+                if line.strip() in ("---", "..."):
+                    in_front_matter = False
+                continue
+            
+            fence_match = _MD_FENCE.match(line)
+            if fence is not None:
+                if fence_match and fence_match.group(1) == fence:
+                    fence = None
+                    if paragraph:
+                        yield "\n".join(paragraph)
+                        paragraph = []
+                else:
+                    paragraph.append(line)
+                continue
+            if fence_match:
+                if paragraph:
+                    yield " ".join(paragraph)
+                    paragraph = []
+                fence = fence_match.group(1)
+                continue
+            
+            if not line.strip() or _MD_RULE.match(line) or _MD_TABLE_DIVIDER.match(line):
+                if paragraph:
+                    yield " ".join(paragraph)
+                    paragraph = []
+                continue
+            
+            # "Title" followed by "=====" is a heading; the title is already buffered
+            if _MD_SETEXT.match(line) and len(paragraph) == 1:
+                yield paragraph.pop()
+                continue
+            
+            heading = _MD_HEADING.match(line)
+            line = _MD_QUOTE.sub("", line)
+            if heading or _MD_LIST_ITEM.match(line) or line.lstrip().startswith("|"):
+                if paragraph:
+                    yield " ".join(paragraph)
+                    paragraph = []
+                if heading:
+                    text = heading.group(1)
+                elif line.lstrip().startswith("|"):
+                    text = "\t".join(cell.strip() for cell in line.strip().strip("|").split("|"))
+                else:
+                    text = _MD_LIST_ITEM.sub("- ", line, count=1)
+                text = _strip_inline_markdown(text)
+                if text:
+                    yield text
+                continue
+            
+            text = _strip_inline_markdown(line)
+            if text:
+                paragraph.append(text)
+        
+        if paragraph:
+            yield ("\n" if fence is not None else " ").join(paragraph)
+    finally:
+        # Leave the underlying file open for the caller
+        lines.detach()
+
+
+@dataclass
+class EpubChapter:
+    """Text of one EPUB spine document"""
+    title: Optional[str]
+    paragraphs: List[str]
+
+
+def _epub_spine(archive: zipfile.ZipFile) -> List[str]:
+    """Paths of the EPUB's content documents in reading order"""
+    container = ElementTree.fromstring(archive.read("META-INF/container.xml"))
+    rootfile = container.find(f".//{_CONTAINER_NS}rootfile")
+    if rootfile is None:
+        raise ValueError("EPUB container has no rootfile")
+    opf_path = rootfile.get("full-path")
+    opf_dir = posixpath.dirname(opf_path)
+    
+    package = ElementTree.fromstring(archive.read(opf_path))
+    manifest = {
+        item.get("id"): item
+        for item in package.iterfind(f"{_OPF_NS}manifest/{_OPF_NS}item")
+    }
+    
+    paths = []
+    for itemref in package.iterfind(f"{_OPF_NS}spine/{_OPF_NS}itemref"):
+        item = manifest.get(itemref.get("idref"))
+        if item is None or item.get("media-type") not in _EPUB_DOCUMENT_TYPES:
+            continue
+        href = unquote(item.get("href", "").split("#")[0])
+        paths.append(posixpath.normpath(posixpath.join(opf_dir, href)))
+    return paths
+
+
+def iter_epub_chapters(file: BinaryIO) -> Iterator[EpubChapter]:
+    """
+    Stream chapters of an EPUB book in reading order.
+    
+    Spine documents are read one at a time straight from the zip and run
+    through the streaming HTML extractor, so only the current chapter is
+    held in memory. Each chapter's title is its first heading.
+    
+    Args:
+        file: EPUB file object
+    
+    Yields:
+        EpubChapter per spine document with text
+    
+    Raises:
+        zipfile.BadZipFile, KeyError, ElementTree.ParseError, ValueError:
+            If the file is not a readable EPUB
+    """
+    with zipfile.ZipFile(file) as archive:
+        for path in _epub_spine(archive):
+            try:
+                source = archive.open(path)
+            except KeyError:
+                continue
+            extractor = _HTMLTextExtractor()
+            with source:
+                paragraphs = list(iter_html_paragraphs(source, extractor))
+            if paragraphs:
+                yield EpubChapter(title=extractor.title, paragraphs=paragraphs)
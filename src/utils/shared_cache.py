@@ -0,0 +1,342 @@
+"""Host-wide cache shared by worker processes, stored in a SQLite file"""
+import asyncio
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Hits refresh an entry's last-used time at most this often, so reads rarely write
+TOUCH_INTERVAL_SECONDS = 60.0
+
+# Polling interval while waiting for another worker's result (doubles up to the max)
+POLL_MIN_SECONDS = 0.02
+POLL_MAX_SECONDS = 0.25
+
+# Least-recently-used entries deleted per step while over the size bound
+EVICT_BATCH = 64
+
+# SQLite limits the number of parameters in one statement
+MAX_KEYS_PER_QUERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (id, size) VALUES (0, 0);
+"""
+
+Compute = Callable[[List[int]], Awaitable[List[str]]]
+
+
+def _chunks(keys: Sequence[str]) -> List[Sequence[str]]:
+    return [keys[i:i + MAX_KEYS_PER_QUERY] for i in range(0, len(keys), MAX_KEYS_PER_QUERY)]
+
+
+class SharedCache:
+    """
+    Second-tier cache of text values shared by all workers on a host.
+    
+    Entries live in one SQLite file (WAL mode), so gets and sets are
+    atomic across processes and a value stored by one worker is a hit for
+    every other. The total size is bounded, evicting least-recently-used
+    entries first. Concurrent misses for the same key are computed once:
+    the first worker takes a lease on the key and the others wait for its
+    result, until the lease expires.
+    
+    Every cache error is logged and treated as a miss, so a broken or
+    locked file slows requests down instead of failing them.
+    
+    Without a path the file is the shared_cache_path setting, read at use:
+    the server sets it after the application may already be imported.
+    """
+    
+    def __init__(self, path: Optional[str], max_bytes: int, lease_seconds: float = 30.0):
+        self._path = path
+        self.max_bytes = max_bytes
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0  # Keys another worker was computing when we missed
+        self.errors = 0
+    
+    @property
+    def path(self) -> Optional[str]:
+        return self._path or settings.shared_cache_path
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.max_bytes > 0
+    
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection; connections are not carried across a fork"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")  # Losing recent entries in a crash is fine
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+    
+    def _failed(self, action: str, error: sqlite3.Error) -> None:
+        self.errors += 1
+        logger.warning("Shared cache %s failed: %s", action, error)
+    
+    def _get_many(self, keys: Sequence[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        stale: List[str] = []
+        now = time.time()
+        try:
+            connection = self._connection()
+            for chunk in _chunks(keys):
+                rows = connection.execute(
+                    f"SELECT key, value, used FROM entries WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, value, used in rows:
+                    found[key] = value
+                    if now - used > TOUCH_INTERVAL_SECONDS:
+                        stale.append(key)
+            if stale:
+                connection.executemany("UPDATE entries SET used = ? WHERE key = ?", [(now, key) for key in stale])
+        except sqlite3.Error as e:
+            self._failed("read", e)
+        return found
+    
+    def _set_many(self, items: Dict[str, str]) -> None:
+        now = time.time()
+        rows = [(key, value, len(value.encode("utf-8"))) for key, value in items.items()]
+        rows = [row for row in rows if row[2] <= self.max_bytes]
+        if not rows:
+            return
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                replaced = 0
+                for chunk in _chunks([key for key, _, _ in rows]):
+                    replaced += connection.execute(
+                        f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchone()[0]
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, size, used) VALUES (?, ?, ?, ?)",
+                    [(key, value, size, now) for key, value, size in rows]
+                )
+                total = connection.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+                total += sum(size for _, _, size in rows) - replaced
+                while total > self.max_bytes:
+                    oldest = connection.execute(
+                        "SELECT key, size FROM entries ORDER BY used LIMIT ?", (EVICT_BATCH,)
+                    ).fetchall()
+                    if not oldest:
+                        total = 0
+                        break
+                    for key, size in oldest:
+                        if total <= self.max_bytes:
+                            break
+                        connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                        total -= size
+                connection.execute("UPDATE totals SET size = ? WHERE id = 0", (total,))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._failed("write", e)
+    
+    def _lease(self, keys: Sequence[str]) -> Tuple[str, Set[str]]:
+        """Take leases on the keys nobody else holds; returns the token and the keys taken"""
+        token = secrets.token_hex(8)
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM leases WHERE expires < ?", (now,))  # Left by crashed workers
+                connection.executemany(
+                    "INSERT INTO leases (key, token, expires) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET token = excluded.token, expires = excluded.expires "
+                    "WHERE leases.expires < ?",
+                    [(key, token, now + self.lease_seconds, now) for key in keys]
+                )
+                leased = {key for (key,) in connection.execute("SELECT key FROM leases WHERE token = ?", (token,))}
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._failed("lease", e)
+            return token, set(keys)  # Compute everything ourselves
+        return token, leased
+    
+    def _release(self, token: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM leases WHERE token = ?", (token,))
+        except sqlite3.Error as e:
+            self._failed("release", e)
+    
+    def _leased(self, keys: Sequence[str]) -> Set[str]:
+        """Keys with an unexpired lease"""
+        now = time.time()
+        leased: Set[str] = set()
+        try:
+            connection = self._connection()
+            for chunk in _chunks(keys):
+                leased.update(key for (key,) in connection.execute(
+                    f"SELECT key FROM leases WHERE expires >= ? AND key IN ({','.join('?' * len(chunk))})",
+                    (now, *chunk)
+                ))
+        except sqlite3.Error as e:
+            self._failed("read", e)
+        return leased
+    
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, str]:
+        """Values of the keys that are cached"""
+        if not self.enabled or not keys:
+            return {}
+        found = await asyncio.to_thread(self._get_many, keys)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+    
+    async def get(self, key: str) -> Optional[str]:
+        return (await self.get_many([key])).get(key)
+    
+    async def set_many(self, items: Dict[str, str]) -> None:
+        """Store values, evicting least-recently-used entries over the size bound"""
+        if self.enabled and items:
+            await asyncio.to_thread(self._set_many, items)
+    
+    async def set(self, key: str, value: str) -> None:
+        await self.set_many({key: value})
+    
+    async def _wait_for(self, keys: List[str]) -> Dict[str, str]:
+        """
+        Wait for other workers to store the keys they hold leases on.
+        
+        Stops waiting for a key once its lease is released or expires
+        without a value (the holder failed); those are left out.
+        """
+        found: Dict[str, str] = {}
+        remaining = list(keys)
+        delay = POLL_MIN_SECONDS
+        while remaining:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, POLL_MAX_SECONDS)
+            found.update(await asyncio.to_thread(self._get_many, remaining))
+            remaining = [key for key in remaining if key not in found]
+            if remaining:
+                leased = await asyncio.to_thread(self._leased, remaining)
+                released = [key for key in remaining if key not in leased]
+                if released:
+                    # The holder may have stored its value just before releasing
+                    found.update(await asyncio.to_thread(self._get_many, released))
+                remaining = [key for key in remaining if key in leased]
+        return found
+    
+    async def get_or_compute_many(self, keys: Sequence[str], compute: Compute) -> List[str]:
+        """
+        Values for the keys, computing missing ones at most once across workers.
+        
+        Args:
+            keys: Cache keys
+            compute: Called with positions in keys, returns their values in order
+        
+        Returns:
+            One value per key
+        """
+        if not self.enabled:
+            return await compute(list(range(len(keys))))
+        
+        values: List[Optional[str]] = [None] * len(keys)
+        found = await self.get_many(keys)
+        for position, key in enumerate(keys):
+            values[position] = found.get(key)
+        missing = [position for position, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+        
+        token, leased = await asyncio.to_thread(self._lease, list({keys[p] for p in missing}))
+        mine = [p for p in missing if keys[p] in leased]
+        theirs = [p for p in missing if keys[p] not in leased]
+        self.waits += len(theirs)
+        
+        waiting = asyncio.create_task(self._wait_for([keys[p] for p in theirs])) if theirs else None
+        try:
+            if mine:
+                try:
+                    outputs = await compute(mine)
+                    await self.set_many({keys[p]: output for p, output in zip(mine, outputs)})
+                finally:
+                    await asyncio.to_thread(self._release, token)
+                for position, output in zip(mine, outputs):
+                    values[position] = output
+            
+            if waiting is not None:
+                found = await waiting
+                for position in theirs:
+                    values[position] = found.get(keys[position])
+        except BaseException:
+            if waiting is not None:
+                waiting.cancel()
+            raise
+        
+        # Their holder failed or gave up; compute these ourselves
+        leftover = [position for position in theirs if values[position] is None]
+        if leftover:
+            outputs = await compute(leftover)
+            await self.set_many({keys[p]: output for p, output in zip(leftover, outputs)})
+            for position, output in zip(leftover, outputs):
+                values[position] = output
+        return values
+    
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Single-key form of get_or_compute_many"""
+        async def compute_one(positions: List[int]) -> List[str]:
+            return [await compute()]
+        return (await self.get_or_compute_many([key], compute_one))[0]
+    
+    def stats(self) -> dict:
+        """Cache counters for logging and metrics"""
+        lookups = self.hits + self.misses
+        return {
+            "name": "shared",
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "waits": self.waits,
+            "errors": self.errors
+        }
+
+
+# Global cache instance
+shared_cache = SharedCache(
+    path=None,
+    max_bytes=int(settings.shared_cache_max_mb * 1024 * 1024),
+    lease_seconds=settings.shared_cache_lease_seconds
+)
@@ -0,0 +1,172 @@
+"""Normalization of extracted document text before it is sent upstream"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Lines near the top or bottom of a page checked for running headers and footers
+EDGE_LINES = 3
+
+# A line must repeat on at least this share of pages (and 3 pages) to be stripped
+REPEAT_PAGE_RATIO = 0.5
+MIN_REPEAT_PAGES = 3
+
+# Lines shorter than this share of the page's longest line may end a paragraph
+SHORT_LINE_RATIO = 0.75
+
+# A non-empty roman numeral. Alone it must be lowercase (front matter is
+# numbered i, ii, iii), so headings like "Mix" or "CD" are not page numbers;
+# after "Page" any case is accepted.
+_ROMAN = r"(?=[mdclxvi])m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})"
+_PAGE_NUMBER = re.compile(
+    r"^(?:(?i:page)\s*(?:\d+|(?i:" + _ROMAN + r"))|\d+|" + _ROMAN + r")"
+    r"(?:\s*(?i:of|/)\s*\d+)?$|^[-–—\s]*\d+[-–—\s]*$"
+)
+_DIGITS = re.compile(r"\d+")
+_HYPHENATED_BREAK = re.compile(r"(\w)-\n[ \t]*(?=[a-z])")
+_SPACES = re.compile(r"[  ]{2,}")
+_LIST_ITEM = re.compile(r"^(?:[-*•▪●]|\d+[.)]|[a-z][.)])\s", re.IGNORECASE)
+_PARAGRAPH_END = ".!?:\"'”)"
+
+
+@dataclass
+class NormalizedText:
+    """Normalized page texts and how many characters normalization removed"""
+    pages: List[str]
+    chars_removed: int
+
+
+def _line_signature(line: str) -> str:
+    """Compare lines ignoring page numbers ("Chapter 2 - 14" vs "Chapter 2 - 15")"""
+    return _DIGITS.sub("#", line.strip().lower())
+
+
+def find_repeated_lines(pages: List[List[str]]) -> set:
+    """
+    Find signatures of lines repeated at the edges of many pages.
+    
+    Args:
+        pages: Lines of each page
+    
+    Returns:
+        Set of line signatures that are running headers or footers
+    """
+    threshold = max(MIN_REPEAT_PAGES, int(len(pages) * REPEAT_PAGE_RATIO))
+    if len(pages) < threshold:
+        return set()
+    
+    counts = Counter()
+    for lines in pages:
+        edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+        counts.update({_line_signature(line) for line in edges if line.strip()})
+    
+    return {signature for signature, count in counts.items() if count >= threshold}
+
+
+def _strip_edges(lines: List[str], repeated: set) -> List[str]:
+    """Drop page numbers and repeated lines from the top and bottom of a page"""
+    def removable(line: str) -> bool:
+        stripped = line.strip()
+        return (
+            not stripped
+            or _PAGE_NUMBER.match(stripped) is not None
+            or _line_signature(line) in repeated
+        )
+    
+    start = 0
+    while start < min(EDGE_LINES, len(lines)) and removable(lines[start]):
+        start += 1
+    end = len(lines)
+    while end > max(start, len(lines) - EDGE_LINES) and removable(lines[end - 1]):
+        end -= 1
+    return lines[start:end]
+
+
+def reflow(lines: List[str]) -> str:
+    """
+    Join hard-wrapped lines into paragraphs.
+    
+    A line break is kept when a blank line follows, when the next line is a
+    list item, or when the line ends a sentence well short of the page's
+    usual line width.
+    """
+    width = max((len(line) for line in lines), default=0)
+    paragraphs: List[List[str]] = [[]]
+    
+    for index, line in enumerate(lines):
+        if not line:
+            if paragraphs[-1]:
+                paragraphs.append([])
+            continue
+        
+        paragraphs[-1].append(line)
+        next_line = lines[index + 1] if index + 1 < len(lines) else ""
+        ends_short = (
+            line.endswith(tuple(_PARAGRAPH_END))
+            and len(line) < width * SHORT_LINE_RATIO
+        )
+        if next_line and (ends_short or _LIST_ITEM.match(next_line)):
+            paragraphs.append([])
+    
+    return "\n\n".join(" ".join(p) for p in paragraphs if p)
+
+
+class PageNormalizer:
+    """
+    Normalize pages in batches as they are extracted.
+    
+    Running headers and footers are learned from the first batch of at
+    least MIN_REPEAT_PAGES pages and stripped from that batch and every
+    later one, so streamed documents are normalized without waiting for
+    the last page.
+    """
+    
+    def __init__(self, strip_repeated: bool = True):
+        self.strip_repeated = strip_repeated
+        self.chars_removed = 0
+        self._repeated: Optional[set] = None
+    
+    def feed(self, pages: List[str]) -> List[str]:
+        """
+        Normalize a batch of page texts.
+        
+        Returns:
+            Normalized text of each non-empty page
+        """
+        page_lines = [
+            [_SPACES.sub(" ", line).strip() for line in _HYPHENATED_BREAK.sub(r"\1", page).splitlines()]
+            for page in pages
+        ]
+        
+        if self.strip_repeated:
+            if self._repeated is None and len(pages) >= MIN_REPEAT_PAGES:
+                self._repeated = find_repeated_lines(page_lines)
+            repeated = self._repeated or set()
+            # A page whose every line looks repeated is content, not a header
+            page_lines = [_strip_edges(lines, repeated) or lines for lines in page_lines]
+        
+        normalized = [text for text in (reflow(lines) for lines in page_lines) if text]
+        self.chars_removed += max(
+            0, sum(len(page) for page in pages) - sum(len(page) for page in normalized)
+        )
+        return normalized
+
+
+def normalize_pages(pages: List[str], strip_repeated: bool = True) -> NormalizedText:
+    """
+    Remove layout noise from extracted page texts.
+    
+    Strips running headers, footers and page numbers (lines repeated at the
+    edges of many pages), joins words hyphenated across line breaks, reflows
+    hard-wrapped lines into paragraphs and collapses runs of spaces.
+    
+    Args:
+        pages: Extracted text of each page
+        strip_repeated: Detect and strip running headers and footers
+    
+    Returns:
+        NormalizedText with one entry per non-empty page
+    """
+    normalizer = PageNormalizer(strip_repeated)
+    normalized = normalizer.feed(pages)
+    return NormalizedText(pages=normalized, chars_removed=normalizer.chars_removed)
@@ -0,0 +1,334 @@
+"""Local token estimation, output budgeting and chunk planning for Gemini requests"""
+import hashlib
+import logging
+import math
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional
+
+from core.config import settings
+from core.exceptions import TokenLimitException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Context window limits of an upstream model"""
+    input_tokens: int
+    output_tokens: int
+
+
+# Published context limits of the models we call
+MODEL_LIMITS: Dict[str, ModelLimits] = {
+    "gemini-2.0-flash-lite": ModelLimits(input_tokens=1_048_576, output_tokens=8_192),
+    "gemini-2.5-flash-preview-tts": ModelLimits(input_tokens=8_192, output_tokens=16_384),
+}
+
+DEFAULT_MODEL_LIMITS = ModelLimits(input_tokens=32_768, output_tokens=8_192)
+
+# Characters per token for each script class. Seeded with the Gemini rule of
+# thumb (about 4 characters per token for English, denser for other scripts)
+# and refined at runtime from count_tokens() results via record().
+DEFAULT_CHARS_PER_TOKEN: Dict[str, float] = {
+    "ascii": 4.0,
+    "non_ascii": 2.5,
+}
+
+# Weight (in characters) given to the seed ratios when blending in recordings
+_SEED_WEIGHT_CHARS = 4000
+
+# Token budget of the first streamed batch (about a page), so upstream work
+# starts as soon as the first page is extracted
+FIRST_BATCH_TOKENS = 512
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def get_model_limits(model: str) -> ModelLimits:
+    """Get context limits for a model, falling back to conservative defaults"""
+    return MODEL_LIMITS.get(model, DEFAULT_MODEL_LIMITS)
+
+
+class TokenEstimator:
+    """
+    Fast local token estimator calibrated against the upstream tokenizer.
+    
+    Estimates are a linear function of the character count per script class.
+    The per-class ratios live in a recorded table that starts from defaults and
+    is updated every time an exact count is obtained from the upstream
+    tokenizer, so estimates converge on what Gemini actually bills.
+    """
+    
+    def __init__(self, cache_size: int = 256):
+        self._lock = threading.Lock()
+        self._table: Dict[str, List[float]] = {
+            name: [_SEED_WEIGHT_CHARS, _SEED_WEIGHT_CHARS / ratio]
+            for name, ratio in DEFAULT_CHARS_PER_TOKEN.items()
+        }
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._cache_size = cache_size
+    
+    @staticmethod
+    def _class_counts(text: str) -> Dict[str, int]:
+        """Split the character count of a text into script classes"""
+        if text.isascii():
+            return {"ascii": len(text), "non_ascii": 0}
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        return {"ascii": ascii_chars, "non_ascii": len(text) - ascii_chars}
+    
+    def chars_per_token(self, script: str = "ascii") -> float:
+        """Current calibrated characters-per-token ratio for a script class"""
+        chars, tokens = self._table[script]
+        return chars / tokens
+    
+    def estimate(self, text: str) -> int:
+        """Estimate the number of tokens in a text"""
+        if not text:
+            return 0
+        counts = self._class_counts(text)
+        tokens = sum(
+            count / self.chars_per_token(script)
+            for script, count in counts.items()
+            if count
+        )
+        return max(1, math.ceil(tokens))
+    
+    def record(self, text: str, actual_tokens: int) -> None:
+        """
+        Record an exact token count from the upstream tokenizer.
+        
+        The error between estimate and actual count is attributed to each
+        script class in proportion to its share of the estimate.
+        """
+        if not text or actual_tokens <= 0:
+            return
+        counts = self._class_counts(text)
+        with self._lock:
+            shares = {
+                script: count / (self._table[script][0] / self._table[script][1])
+                for script, count in counts.items()
+                if count
+            }
+            estimated = sum(shares.values())
+            factor = actual_tokens / estimated
+            for script, share in shares.items():
+                self._table[script][0] += counts[script]
+                self._table[script][1] += share * factor
+    
+    def calibration_table(self) -> Dict[str, float]:
+        """Snapshot of the recorded characters-per-token table"""
+        with self._lock:
+            return {
+                script: round(chars / tokens, 4)
+                for script, (chars, tokens) in self._table.items()
+            }
+    
+    async def count_tokens(self, client, model: str, text: str) -> int:
+        """
+        Get an exact token count from the upstream tokenizer.
+        
+        Results are cached by content hash and fed back into the calibration
+        table. Falls back to the local estimate if the call fails.
+        """
+        key = f"{model}:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+        with self._lock:
+            if key in self._counts:
+                self._counts.move_to_end(key)
+                return self._counts[key]
+        
+        try:
+            response = await client.aio.models.count_tokens(model=model, contents=text)
+            total = response.total_tokens
+        except Exception as e:
+            logger.warning("count_tokens failed, using local estimate: %s", e)
+            return self.estimate(text)
+        
+        self.record(text, total)
+        with self._lock:
+            self._counts[key] = total
+            while len(self._counts) > self._cache_size:
+                self._counts.popitem(last=False)
+        return total
+    
+    def output_budget(
+        self,
+        input_tokens: int,
+        model: str,
+        ratio: float,
+        overhead: int = 256
+    ) -> int:
+        """
+        Calculate max_output_tokens proportional to the input size.
+        
+        Args:
+            input_tokens: Estimated tokens of the text being transformed
+            model: Model that will produce the output
+            ratio: Expected output tokens per input token
+            overhead: Fixed allowance for short inputs and formatting
+        
+        Returns:
+            Output token budget, capped at the model's output limit
+        """
+        limit = get_model_limits(model).output_tokens
+        return min(limit, math.ceil(input_tokens * ratio) + overhead)
+    
+    def max_chunk_tokens(self, model: str, ratio: float, overhead: int = 256) -> int:
+        """Largest input (in tokens) whose output still fits in one call"""
+        limits = get_model_limits(model)
+        by_output = int((limits.output_tokens - overhead) / ratio)
+        return max(1, min(limits.input_tokens, by_output))
+    
+    def plan_chunks(self, text: str, max_tokens: int) -> List[str]:
+        """
+        Split text into chunks of at most max_tokens estimated tokens.
+        
+        Splits on paragraph boundaries first, then sentences, then words, so
+        each chunk can be processed by a separate upstream call.
+        """
+        if self.estimate(text) <= max_tokens:
+            return [text]
+        
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        
+        def flush():
+            nonlocal current, current_tokens
+            if current:
+                chunks.append("\n\n".join(current))
+            current = []
+            current_tokens = 0
+        
+        for unit in self._split_units(text, max_tokens):
+            unit_tokens = self.estimate(unit)
+            if current and current_tokens + unit_tokens > max_tokens:
+                flush()
+            current.append(unit)
+            current_tokens += unit_tokens
+        flush()
+        
+        return chunks
+    
+    def _split_units(self, text: str, max_tokens: int) -> List[str]:
+        """Break text into paragraph-sized units that each fit in max_tokens"""
+        units: List[str] = []
+        for paragraph in _PARAGRAPH_SPLIT.split(text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if self.estimate(paragraph) <= max_tokens:
+                units.append(paragraph)
+                continue
+            units.extend(self._split_long(paragraph, max_tokens))
+        return units
+    
+    def _split_long(self, paragraph: str, max_tokens: int) -> List[str]:
+        """Split an oversize paragraph on sentences, then on words"""
+        pieces: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        
+        for sentence in _SENTENCE_SPLIT.split(paragraph):
+            if self.estimate(sentence) <= max_tokens:
+                parts = [sentence]
+            else:
+                parts = sentence.split()
+            
+            for piece in parts:
+                piece_tokens = self.estimate(piece) + 1
+                if current and current_tokens + piece_tokens > max_tokens:
+                    pieces.append(" ".join(current))
+                    current = []
+                    current_tokens = 0
+                current.append(piece)
+                current_tokens += piece_tokens
+        if current:
+            pieces.append(" ".join(current))
+        
+        return pieces
+
+
+# Global estimator instance
+token_estimator = TokenEstimator()
+
+
+async def batch_paragraphs(parts: AsyncIterable[str], max_tokens: int) -> AsyncIterator[List[str]]:
+    """
+    Group streamed text into paragraph batches of at most max_tokens estimated tokens.
+    
+    A batch is yielded as soon as it is full or the next paragraph would
+    overflow it, so work on it can start while later parts are still
+    arriving. The first batch is capped at FIRST_BATCH_TOKENS so that work
+    starts after about a page. A paragraph larger than the budget forms a
+    batch of its own.
+    
+    Args:
+        parts: Pages or paragraphs in document order
+        max_tokens: Token budget of one batch
+    
+    Yields:
+        Lists of non-empty paragraphs
+    """
+    batch: List[str] = []
+    batch_tokens = 0
+    budget = min(max_tokens, FIRST_BATCH_TOKENS)
+    
+    async for part in parts:
+        for paragraph in _PARAGRAPH_SPLIT.split(part):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            tokens = token_estimator.estimate(paragraph)
+            if batch and batch_tokens + tokens > budget:
+                yield batch
+                batch = []
+                batch_tokens = 0
+                budget = max_tokens
+            batch.append(paragraph)
+            batch_tokens += tokens
+            if batch_tokens >= budget:
+                yield batch
+                batch = []
+                batch_tokens = 0
+                budget = max_tokens
+    
+    if batch:
+        yield batch
+
+
+async def check_input_tokens(
+    text: str,
+    get_client: Optional[Callable[[], Any]] = None,
+    model: Optional[str] = None,
+    max_tokens: Optional[int] = None
+) -> int:
+    """
+    Estimate input tokens and reject text above the configured limit.
+    
+    When token verification is enabled and get_client is given, estimates
+    near the limit are confirmed with the upstream tokenizer before
+    rejecting. The client is only requested then, so ordinary requests
+    never create it here.
+    
+    Returns:
+        Estimated (or counted) number of input tokens
+    """
+    limit = max_tokens or settings.max_input_tokens
+    tokens = token_estimator.estimate(text)
+    
+    if (
+        settings.verify_token_counts
+        and get_client is not None
+        and model is not None
+        and tokens > limit * 0.9
+    ):
+        tokens = await token_estimator.count_tokens(get_client(), model, text)
+    
+    if tokens > limit:
+        raise TokenLimitException(tokens, limit)
+    
+    return tokens
@@ -1,30 +1,106 @@
 """Input validation utilities"""
+import hashlib
+import tempfile
+from typing import List, Optional
 from fastapi import UploadFile
 from core.config import settings
 from core.exceptions import (
+    ValidationException,
     validate_text_length,
     validate_file_size,
     validate_file_type
 )
+from utils.file_parser import SUPPORTED_EXTENSIONS
 
+# Bytes read from the upload per iteration
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
-async def validate_uploaded_file(file: UploadFile) -> bytes:
+
+class SpooledUpload(tempfile.SpooledTemporaryFile):
+    """Spooled upload content with its size and SHA-256 digest"""
+    
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size=max_size)
+        self.size = 0
+        self.digest = ""
+
+
+async def validate_uploaded_file(file: UploadFile) -> SpooledUpload:
     """
-    Validate uploaded file and return content.
+    Validate uploaded file and spool its content.
+    
+    The upload is copied in bounded chunks into a spooled temporary file
+    that stays in memory up to UPLOAD_SPOOL_MAX_BYTES and rolls over to
+    disk beyond that, hashing the content in the same pass. The request
+    body has already been received and spooled by the multipart parser
+    (UploadSizeLimitMiddleware bounds it); the size limit is checked
+    again here as chunks are copied.
     
     Args:
         file: Uploaded file
     
     Returns:
-        File content as bytes
+        Spooled upload positioned at the start (caller closes it)
     """
     # Validate file type
-    validate_file_type(file.filename)
+    validate_file_type(file.filename, SUPPORTED_EXTENSIONS)
+    
+    # Reject on the declared size before reading anything
+    max_bytes = settings.max_file_size_bytes
+    if file.size is not None:
+        validate_file_size(file.size, max_bytes)
     
-    # Read file content
-    content = await file.read()
+    spooled = SpooledUpload(max_size=settings.upload_spool_max_bytes)
+    digest = hashlib.sha256()
+    try:
+        total = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            validate_file_size(total, max_bytes)
+            digest.update(chunk)
+            spooled.write(chunk)
+    except Exception:
+        spooled.close()
+        raise
+    
+    spooled.size = total
+    spooled.digest = digest.hexdigest()
+    spooled.seek(0)
+    return spooled
+
+
+def parse_page_ranges(spec: Optional[str]) -> Optional[List[int]]:
+    """
+    Parse a page selection such as "1-5,8,10-12".
+    
+    Args:
+        spec: Comma-separated 1-based pages and inclusive ranges
+    
+    Returns:
+        Sorted zero-based page indices, or None if no selection was given
+    """
+    if spec is None or not spec.strip():
+        return None
     
-    # Validate file size
-    validate_file_size(len(content), settings.max_file_size_bytes)
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        try:
+            if "-" in part:
+                start, end = (int(value) for value in part.split("-", 1))
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise ValidationException(
+                f"Invalid page range: '{part}'",
+                details={"field": "pages", "expected": "e.g. 1-5,8"}
+            )
+        
+        if start < 1 or end < start:
+            raise ValidationException(
+                f"Invalid page range: '{part}'",
+                details={"field": "pages", "expected": "1-based pages, start <= end"}
+            )
+        pages.update(range(start - 1, end))
     
-    return content
+    return sorted(pages)
@@ -0,0 +1,15 @@
+"""Integration test fixtures: the app runs against the in-process fake upstream"""
+import importlib
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fake_upstream(monkeypatch):
+    """Serve every upstream call from a FakeGeminiClient instead of the Gemini API"""
+    client_module = importlib.import_module("services.client")
+    fake = importlib.import_module("services.fake_upstream").FakeGeminiClient(seed=0)
+    monkeypatch.setattr(client_module, "_client", fake)
+    # Services keep the client they were built with, so rebuild them around the fake
+    monkeypatch.setattr(importlib.import_module("api.dependencies").registry, "_services", {})
+    return fake
@@ -1,13 +1,13 @@
 """Integration tests for API endpoints"""
 import pytest
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from src.main import app
 
 
 @pytest.mark.asyncio
 async def test_root_endpoint():
     """Test root endpoint"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         response = await client.get("/")
     
     assert response.status_code == 200
@@ -19,7 +19,7 @@ async def test_root_endpoint():
 @pytest.mark.asyncio
 async def test_health_endpoint():
     """Test health check endpoint"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         response = await client.get("/health")
     
     assert response.status_code == 200
@@ -31,7 +31,7 @@ async def test_health_endpoint():
 @pytest.mark.asyncio
 async def test_simplify_text_endpoint(sample_text):
     """Test text simplification endpoint"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         response = await client.post(
             "/simplify/text",
             json={
@@ -51,7 +51,7 @@ async def test_simplify_text_endpoint(sample_text):
 @pytest.mark.asyncio
 async def test_simplify_text_validation():
     """Test text validation"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         # Empty text
         response = await client.post(
             "/simplify/text",
@@ -78,7 +78,7 @@ async def test_simplify_text_validation():
 @pytest.mark.asyncio
 async def test_get_modes_endpoint():
     """Test get modes endpoint"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         response = await client.get("/simplify/modes")
     
     assert response.status_code == 200
@@ -91,7 +91,7 @@ async def test_get_modes_endpoint():
 @pytest.mark.asyncio
 async def test_get_voices_endpoint():
     """Test get voices endpoint"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         response = await client.get("/tts/voices")
     
     assert response.status_code == 200
@@ -104,7 +104,7 @@ async def test_get_voices_endpoint():
 @pytest.mark.asyncio
 async def test_cors_headers():
     """Test CORS headers"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         response = await client.options(
             "/simplify/text",
             headers={"Origin": "http://localhost:3000"}
@@ -0,0 +1,120 @@
+"""Unit tests for memory-aware admission control"""
+import asyncio
+import importlib
+import threading
+
+import pytest
+
+from src.core import admission as admission_module
+from src.core.admission import AdmissionController, estimate_request_mb
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    """Controller on an instance steadily using 100 MB with a 150 MB limit"""
+    monkeypatch.setattr(admission_module, "process_memory_mb", lambda: 100.0)
+    return AdmissionController(limit_mb=150, max_queue=1, queue_timeout=0.2, retry_after=7)
+
+
+def test_estimate_scales_with_file_type_and_audio():
+    """Test that PDFs and projected audio raise the memory estimate"""
+    size = 5 * 1024 * 1024
+    
+    assert estimate_request_mb(file_bytes=size, file_type="pdf") > estimate_request_mb(
+        file_bytes=size, file_type="txt"
+    )
+    assert estimate_request_mb(audio_seconds=600) > estimate_request_mb(audio_seconds=60) + 10
+
+
+async def test_waiter_admitted_when_memory_is_released(controller):
+    """Test that a request that doesn't fit waits for an earlier one to finish"""
+    first = await controller.acquire(40, "tts")
+    waiting = asyncio.create_task(controller.acquire(40, "tts"))
+    await asyncio.sleep(0)
+    
+    assert controller.queued == 1
+    assert not waiting.done()
+    
+    controller.release(first)
+    second = await waiting
+    
+    assert controller.in_flight == 1
+    assert second.cost_mb == 40
+    controller.release(second)
+
+
+async def test_full_queue_and_timeout_are_refused_with_retry_after(controller):
+    """Test that overload surfaces as 503 with Retry-After"""
+    first = await controller.acquire(40)
+    waiting = asyncio.create_task(controller.acquire(40))
+    await asyncio.sleep(0)
+    
+    with pytest.raises(Exception) as queue_full:
+        await controller.acquire(40)
+    with pytest.raises(Exception) as timed_out:
+        await waiting
+    
+    for exc_info in (queue_full, timed_out):
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "7"}
+    assert controller.queued == 0
+    controller.release(first)
+
+
+async def test_idle_instance_admits_oversized_request(controller):
+    """Test that a request larger than the headroom still runs alone"""
+    ticket = await controller.acquire(500)
+    
+    assert controller.in_flight == 1
+    controller.release(ticket)
+
+
+async def test_memory_is_sampled_off_the_event_loop(monkeypatch):
+    """Test that admission reads a sample taken in a thread instead of scanning per call"""
+    threads = []
+    
+    def sample():
+        threads.append(threading.current_thread())
+        return 100.0
+    
+    monkeypatch.setattr(admission_module, "process_memory_mb", sample)
+    controller = AdmissionController(limit_mb=150, max_queue=1, queue_timeout=0.2, retry_after=7)
+    for _ in range(20):
+        controller.release(await controller.acquire(10))
+    
+    assert 0 < len(threads) < 20
+    assert threading.main_thread() not in threads
+
+
+async def test_timed_out_waiter_lets_the_next_one_in(monkeypatch):
+    """Test that a waiter giving up admits smaller requests queued behind it"""
+    monkeypatch.setattr(admission_module, "process_memory_mb", lambda: 100.0)
+    controller = AdmissionController(limit_mb=150, max_queue=2, queue_timeout=0.2, retry_after=7)
+    first = await controller.acquire(40)
+    large = asyncio.create_task(controller.acquire(40))
+    await asyncio.sleep(0.05)
+    small = asyncio.create_task(controller.acquire(5))
+    
+    with pytest.raises(Exception):
+        await large
+    ticket = await asyncio.wait_for(small, timeout=0.1)
+    
+    assert controller.in_flight == 2
+    controller.release(ticket)
+    controller.release(first)
+
+
+def test_route_returns_503_when_overloaded(client, monkeypatch):
+    """Test that a refused request gets a 503 response with Retry-After"""
+    app_admission = importlib.import_module("core.admission").admission
+    
+    async def refuse(cost_mb, kind="request"):
+        raise app_admission._overloaded("not enough free memory")
+    
+    monkeypatch.setattr(app_admission, "acquire", refuse)
+    
+    response = client.post("/simplify/text", json={"text": "A short sentence."})
+    
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(app_admission.retry_after)
+    assert response.json()["error"] == "ServiceOverloadedException"
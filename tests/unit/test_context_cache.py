@@ -0,0 +1,95 @@
+"""Unit tests for the context cache registry"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from src.services import context_cache as context_cache_module
+from src.services.context_cache import ContextCacheRegistry
+from src.services.simplification.prompts import (
+    get_simplification_prompt,
+    get_simplification_system_prompt
+)
+from src.api.schemas import SimplificationMode, SimplificationIntensity
+
+
+class FakeCaches:
+    """Stand-in for client.aio.caches"""
+    def __init__(self, fail=False):
+        self.created = []
+        self.fail = fail
+    
+    async def create(self, model, config):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("cached content too small")
+        self.created.append(config)
+        return SimpleNamespace(
+            name=f"cachedContents/{len(self.created)}",
+            expire_time=datetime.now(timezone.utc) + timedelta(hours=1)
+        )
+
+
+def make_client(fail=False):
+    return SimpleNamespace(aio=SimpleNamespace(caches=FakeCaches(fail=fail)))
+
+
+@pytest.fixture
+def cache_settings(monkeypatch):
+    settings = context_cache_module.settings
+    monkeypatch.setattr(settings, "context_cache_enabled", True)
+    monkeypatch.setattr(settings, "context_cache_min_tokens", 0)
+    return settings
+
+
+async def test_registers_each_prefix_once(cache_settings):
+    """Test concurrent requests share a single registration"""
+    registry = ContextCacheRegistry()
+    client = make_client()
+    
+    handles = await asyncio.gather(*(
+        registry.get_handle(client, "gemini-2.0-flash-lite", "rules") for _ in range(5)
+    ))
+    
+    assert len(client.aio.caches.created) == 1
+    assert {h.name for h in handles} == {"cachedContents/1"}
+    assert registry.stats()["fresh"] == 1
+
+
+async def test_small_prefix_is_sent_inline(cache_settings, monkeypatch):
+    """Test prefixes below the provider minimum are not registered"""
+    monkeypatch.setattr(cache_settings, "context_cache_min_tokens", 4096)
+    registry = ContextCacheRegistry()
+    client = make_client()
+    
+    assert await registry.get_handle(client, "gemini-2.0-flash-lite", "rules") is None
+    assert client.aio.caches.created == []
+
+
+async def test_failed_registration_falls_back(cache_settings):
+    """Test a failed registration returns None and is not retried immediately"""
+    registry = ContextCacheRegistry()
+    client = make_client(fail=True)
+    
+    assert await registry.get_handle(client, "gemini-2.0-flash-lite", "rules") is None
+    assert await registry.get_handle(client, "gemini-2.0-flash-lite", "rules") is None
+    assert registry.stats()["failed"] == 1
+
+
+def test_system_prompt_is_memoized():
+    """Test the static rules are rendered once and exclude the user text"""
+    options = {"paragraph_max_sentences": 3}
+    first = get_simplification_system_prompt(
+        SimplificationMode.NARRATIVE, SimplificationIntensity.MEDIUM, 12, options
+    )
+    second = get_simplification_system_prompt(
+        SimplificationMode.NARRATIVE, SimplificationIntensity.MEDIUM, 12, options
+    )
+    inline = get_simplification_prompt(
+        "Some text.", SimplificationMode.NARRATIVE, SimplificationIntensity.MEDIUM, 12, options
+    )
+    
+    assert first is second
+    assert "max 12 words" in first
+    assert "Some text." not in first
+    assert inline.startswith(first) and inline.endswith("Some text.")
@@ -0,0 +1,75 @@
+"""Unit tests for the lifespan-managed service registry"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api import dependencies as dependencies_module
+from src.api.dependencies import ServiceRegistry, SERVICE_TYPES
+
+
+def test_registry_builds_each_service_once_across_threads():
+    """Test that concurrent first lookups share one instance"""
+    registry = ServiceRegistry()
+    service_type = SERVICE_TYPES[0]
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        services = list(pool.map(lambda _: registry.get(service_type), range(32)))
+    
+    assert all(service is services[0] for service in services)
+
+
+async def test_startup_warms_services_and_shutdown_releases_them(monkeypatch):
+    """Test that startup builds and warms every service and shutdown closes the client"""
+    warmed = []
+    closed = []
+    
+    async def fake_warm_up(model, timeout=None):
+        warmed.append(model)
+        return True
+    
+    async def fake_close():
+        closed.append(True)
+    
+    monkeypatch.setattr(dependencies_module, "warm_up_client", fake_warm_up)
+    monkeypatch.setattr(dependencies_module, "close_client", fake_close)
+    monkeypatch.setattr(dependencies_module, "get_client", lambda: object())
+    registry = ServiceRegistry()
+    
+    await registry.startup(warm_up=True)
+    await registry._warm_up_task
+    services = [registry.get(service_type) for service_type in SERVICE_TYPES]
+    
+    assert warmed == [dependencies_module.SIMPLIFICATION_MODEL]
+    assert all(registry.get(type(s)) is s for s in services)
+    
+    await registry.shutdown()
+    
+    assert closed == [True]
+    assert registry.get(SERVICE_TYPES[0]) is not services[0]
+
+
+async def test_startup_does_not_wait_for_warm_up(monkeypatch):
+    """Test that a slow upstream warm-up runs in the background and is cancelled at shutdown"""
+    started = asyncio.Event()
+    cancelled = []
+    
+    async def slow_warm_up(model, timeout=None):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+    
+    async def fake_close():
+        pass
+    
+    monkeypatch.setattr(dependencies_module, "warm_up_client", slow_warm_up)
+    monkeypatch.setattr(dependencies_module, "close_client", fake_close)
+    monkeypatch.setattr(dependencies_module, "get_client", lambda: object())
+    registry = ServiceRegistry()
+    
+    await asyncio.wait_for(registry.startup(warm_up=True), timeout=1)
+    await asyncio.wait_for(started.wait(), timeout=1)
+    await registry.shutdown()
+    
+    assert cancelled == [True]
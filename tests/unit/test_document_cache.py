@@ -0,0 +1,92 @@
+"""Unit tests for the parsed-document cache"""
+import io
+import pytest
+from starlette.datastructures import UploadFile
+from src.utils import document_cache as document_cache_module
+from src.utils.document_cache import DocumentCache, document_key, parse_upload
+from src.utils.file_parser import ParsedDocument
+from src.utils.shared_cache import SharedCache
+from src.utils.validators import validate_uploaded_file
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    """Replace the global cache with an empty in-memory one"""
+    cache = DocumentCache(max_bytes=1024 * 1024)
+    monkeypatch.setattr(document_cache_module, "document_cache", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_repeat_upload_skips_parsing(fresh_cache, monkeypatch):
+    """Test a second upload of the same bytes is served from the cache"""
+    calls = []
+    parse = document_cache_module.FileParser.parse_document_async
+    
+    async def counting_parse(*args, **kwargs):
+        calls.append(args[1])
+        return await parse(*args, **kwargs)
+    
+    monkeypatch.setattr(document_cache_module.FileParser, "parse_document_async", counting_parse)
+    
+    for _ in range(2):
+        upload = UploadFile(file=io.BytesIO(b"syllabus text"), filename="syllabus.txt")
+        with await validate_uploaded_file(upload) as spooled:
+            document = await parse_upload(spooled, "syllabus.txt")
+        assert document.text == "syllabus text"
+    
+    assert calls == ["syllabus.txt"]
+    stats = fresh_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bytes_saved"] == len(b"syllabus text")
+
+
+def test_document_key_includes_selection():
+    """Test the budget and page selection change the cache key"""
+    digest = "a" * 64
+    
+    assert document_key(digest, "a.pdf") != document_key(digest, "a.pdf", pages=[0])
+    assert document_key(digest, "a.pdf") != document_key(digest, "a.pdf", max_chars=100)
+    assert document_key(digest, "a.pdf") == document_key(digest, "b.PDF")
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_memory_eviction(tmp_path):
+    """Test entries are reloaded from disk once dropped from memory"""
+    cache = DocumentCache(max_bytes=1024, directory=str(tmp_path), disk_max_bytes=1024 * 1024)
+    document = ParsedDocument(text="cached text", page_count=3, pages_parsed=3)
+    
+    await cache.set("key", document)
+    cache.clear()
+    
+    cached = await cache.get("key")
+    
+    assert (cached.text, cached.page_count, cached.pages_parsed) == ("cached text", 3, 3)
+    assert cache.stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_evicts_oldest(tmp_path):
+    """Test the disk tier stays within its size bound"""
+    cache = DocumentCache(max_bytes=1024, directory=str(tmp_path), disk_max_bytes=150)
+    
+    for i in range(3):
+        await cache.set(f"key{i}", ParsedDocument(text=f"text {i} " * 5))
+    
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.json")) <= 150
+    assert (tmp_path / "key2.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_serves_other_workers(tmp_path):
+    """Test a document parsed by one worker is a hit for another on the same host"""
+    path = str(tmp_path / "shared.sqlite3")
+    worker_a = DocumentCache(max_bytes=1024, shared=SharedCache(path, max_bytes=1024 * 1024))
+    worker_b = DocumentCache(max_bytes=1024, shared=SharedCache(path, max_bytes=1024 * 1024))
+    
+    await worker_a.set("key", ParsedDocument(text="shared text", page_count=2, pages_parsed=1, truncated=True))
+    cached = await worker_b.get("key")
+    
+    assert (cached.text, cached.page_count, cached.pages_parsed, cached.truncated) == ("shared text", 2, 1, True)
+    assert worker_b.stats()["shared_hits"] == 1
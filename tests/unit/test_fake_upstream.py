@@ -0,0 +1,75 @@
+"""Unit tests for the fake upstream client and backend selection"""
+import importlib
+import random
+
+import pytest
+from google.genai import errors, types
+
+from src.services.fake_upstream import SAMPLE_RATE, FakeGeminiClient, LatencyDistribution
+
+
+def test_latency_distribution_parsing():
+    """Test parsing each distribution and rejecting malformed specs"""
+    rng = random.Random(0)
+    
+    assert LatencyDistribution.parse("fixed:250").sample_seconds(rng) == 0.25
+    assert 0.1 <= LatencyDistribution.parse("uniform:100,200").sample_seconds(rng) <= 0.2
+    
+    lognormal = LatencyDistribution.parse("lognormal:800,0.5")
+    samples = sorted(lognormal.sample_seconds(rng) for _ in range(2001))
+    assert 0.7 < samples[1000] < 0.9
+    
+    for spec in ("fixed", "uniform:100", "gamma:1,2", "lognormal:800,x"):
+        with pytest.raises(ValueError):
+            LatencyDistribution.parse(spec)
+
+
+async def test_text_is_echoed_and_speech_is_synthetic_pcm():
+    """Test that text calls echo the contents and audio calls return PCM of speaking length"""
+    client = FakeGeminiClient()
+    
+    response = await client.aio.models.generate_content(model="m", contents="Hello there")
+    assert response.text == "Hello there"
+    
+    config = types.GenerateContentConfig(response_modalities=["AUDIO"])
+    response = await client.aio.models.generate_content(model="m", contents="one two three four five", config=config)
+    blob = response.candidates[0].content.parts[0].inline_data
+    assert len(blob.data) == 2 * SAMPLE_RATE * 2  # Five words at 2.5 words a second
+    assert client.calls == 2
+
+
+async def test_streaming_yields_the_whole_text_in_chunks():
+    """Test that a streamed response reassembles to the echoed contents"""
+    text = " ".join(f"word{i}" for i in range(45))
+    client = FakeGeminiClient()
+    
+    stream = await client.aio.models.generate_content_stream(model="m", contents=text)
+    chunks = [chunk.text async for chunk in stream]
+    
+    assert len(chunks) == 3
+    assert "".join(chunks) == text
+
+
+async def test_injected_rate_limits_and_errors_raise_genai_errors():
+    """Test that injected failures use the same errors as the real client"""
+    with pytest.raises(errors.ClientError) as rate_limited:
+        await FakeGeminiClient(rate_limit_rate=1.0).aio.models.generate_content(model="m", contents="x")
+    assert rate_limited.value.code == 429
+    
+    with pytest.raises(errors.ServerError) as failed:
+        await FakeGeminiClient(error_rate=1.0).aio.models.generate_content(model="m", contents="x")
+    assert failed.value.code == 500
+
+
+def test_upstream_backend_selection(monkeypatch):
+    """Test that UPSTREAM_BACKEND picks the client and unknown names are rejected"""
+    client_module = importlib.import_module("services.client")
+    monkeypatch.setattr(client_module, "_client", None)
+    
+    monkeypatch.setattr(client_module.settings, "upstream_backend", "fake")
+    assert type(client_module.get_client()).__name__ == "FakeGeminiClient"
+    
+    monkeypatch.setattr(client_module, "_client", None)
+    monkeypatch.setattr(client_module.settings, "upstream_backend", "other")
+    with pytest.raises(ValueError):
+        client_module.get_client()
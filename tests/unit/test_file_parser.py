@@ -0,0 +1,136 @@
+"""Unit tests for file parsing"""
+import io
+from xml.etree.ElementTree import ParseError
+import pytest
+from docx import Document
+from src.utils import file_parser
+from src.utils.file_parser import FileParser
+
+
+def test_parse_pdf(make_pdf):
+    """Test synchronous PDF parsing"""
+    text = FileParser.parse_pdf(io.BytesIO(make_pdf(["First page.", "Second page."])))
+    
+    assert text == "First page.\n\nSecond page."
+
+
+@pytest.mark.asyncio
+async def test_parse_pdf_in_parallel_page_ranges(make_pdf, monkeypatch):
+    """Test page ranges extracted in worker processes are merged in order"""
+    monkeypatch.setattr(file_parser.settings, "parser_workers", 2)
+    monkeypatch.setattr(file_parser.settings, "parser_pages_per_task", 3)
+    pages = [f"Page number {i}." for i in range(10)]
+    
+    try:
+        text = await FileParser.parse_file_async(io.BytesIO(make_pdf(pages)), "book.pdf")
+    finally:
+        file_parser.shutdown_parse_pool()
+    
+    assert text == "\n\n".join(pages)
+
+
+@pytest.mark.asyncio
+async def test_parse_file_async_thread_fallback(monkeypatch):
+    """Test parsing falls back to a thread when the pool is disabled"""
+    monkeypatch.setattr(file_parser, "_parse_pool", None)
+    monkeypatch.setattr(file_parser, "_parse_pool_unavailable", True)
+    
+    text = await FileParser.parse_file_async(io.BytesIO(b"plain text"), "notes.txt")
+    
+    assert text == "plain text"
+
+
+@pytest.mark.asyncio
+async def test_parse_file_async_rejects_unknown_type():
+    """Test unsupported extensions are rejected before dispatch"""
+    with pytest.raises(Exception) as exc_info:
+        await FileParser.parse_file_async(io.BytesIO(b"data"), "image.png")
+    
+    assert exc_info.value.status_code == 415
+
+
+def test_parse_pdf_stops_at_budget(make_pdf):
+    """Test extraction stops once the character budget is reached"""
+    pages = [f"Page {i} " + "word " * 20 for i in range(20)]
+    
+    document = FileParser.parse_document(io.BytesIO(make_pdf(pages)), "book.pdf", max_chars=250)
+    
+    assert document.truncated
+    assert len(document.text) <= 250
+    assert document.page_count == 20
+    assert document.pages_parsed < 20
+
+
+def test_parse_pdf_selected_pages(make_pdf):
+    """Test only the requested pages are extracted"""
+    pages = [f"Page number {i}." for i in range(6)]
+    
+    document = FileParser.parse_document(io.BytesIO(make_pdf(pages)), "book.pdf", pages=[1, 4])
+    
+    assert document.text == "Page number 1.\n\nPage number 4."
+    assert document.pages_parsed == 2
+    assert not document.truncated
+
+
+def test_parse_pdf_pages_out_of_range(make_pdf):
+    """Test selecting pages past the end of the document is rejected"""
+    with pytest.raises(Exception) as exc_info:
+        FileParser.parse_document(io.BytesIO(make_pdf(["Only page."])), "book.pdf", pages=[3])
+    
+    assert exc_info.value.status_code == 400
+
+
+def make_docx(paragraphs, table=None):
+    """Build a DOCX with the given paragraphs followed by an optional table"""
+    doc = Document()
+    for paragraph in paragraphs:
+        doc.add_paragraph(paragraph)
+    if table:
+        grid = doc.add_table(rows=len(table), cols=len(table[0]))
+        for row, values in zip(grid.rows, table):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_parse_docx_streams_paragraphs_and_tables():
+    """Test the streaming extractor reads paragraphs and table rows in order"""
+    file = make_docx(["Intro.", "", "Body."], table=[["Name", "Score"], ["Ada", "10"]])
+    
+    text = FileParser.parse_docx(file)
+    
+    assert text == "Intro.\n\nBody.\n\nName\tScore\n\nAda\t10"
+
+
+def test_parse_docx_falls_back_to_python_docx(monkeypatch):
+    """Test files the streaming extractor rejects are read with python-docx"""
+    def broken(file):
+        raise ParseError("unexpected element")
+        yield
+    
+    monkeypatch.setattr(file_parser, "_iter_docx_parts", broken)
+    
+    assert FileParser.parse_docx(make_docx(["Only paragraph."])) == "Only paragraph."
+
+
+@pytest.mark.asyncio
+async def test_stream_document_yields_pages_in_order(make_pdf, monkeypatch):
+    """Test PDF pages are streamed in order and metadata is filled in"""
+    monkeypatch.setattr(file_parser.settings, "parser_workers", 2)
+    monkeypatch.setattr(file_parser.settings, "parser_pages_per_task", 2)
+    pages = [f"Page number {i}." for i in range(7)]
+    
+    try:
+        stream = FileParser.stream_document(io.BytesIO(make_pdf(pages)), "book.pdf")
+        parts = [part async for part in stream]
+    finally:
+        file_parser.shutdown_parse_pool()
+    
+    assert parts == pages
+    assert stream.document.text == "\n\n".join(pages)
+    assert stream.document.page_count == 7
+    assert stream.document.pages_parsed == 7
+    assert not stream.document.truncated
@@ -0,0 +1,57 @@
+"""Unit tests for application cold-start import cost"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+# Import time owned by the app itself, excluding the web framework, in ms
+IMPORT_BUDGET_MS = 500
+
+# Dependencies only some endpoints need; loading them must wait for first use
+DEFERRED_MODULES = ("google.genai", "PyPDF2", "docx", "psutil")
+
+
+def _import_main(code: str = "import main") -> subprocess.CompletedProcess:
+    """Import the app in a fresh interpreter with -X importtime enabled"""
+    env = {**os.environ, "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "test-key")}
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def _cumulative_us(report: str) -> dict:
+    """Cumulative microseconds per module from an -X importtime report"""
+    totals = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            totals[name.strip()] = int(cumulative)
+    return totals
+
+
+def test_main_import_skips_heavy_dependencies():
+    """Test that importing the app does not load endpoint-specific libraries"""
+    result = _import_main(
+        "import sys, main; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    
+    assert result.stdout.strip() == ""
+
+
+def test_main_import_within_budget():
+    """Test that the app's own import cost stays under the cold-start budget"""
+    totals = _cumulative_us(_import_main().stderr)
+    
+    app_ms = (totals["main"] - totals.get("fastapi", 0)) / 1000
+    
+    assert app_ms < IMPORT_BUDGET_MS, f"App imports took {app_ms:.0f} ms"
@@ -0,0 +1,115 @@
+"""Unit tests for queued, sampled JSON logging"""
+import io
+import json
+import logging
+import os
+import queue
+
+import pytest
+
+from src.core.logging_config import (
+    JSONFormatter,
+    LazyQueueHandler,
+    SamplingFilter,
+    configure_logging,
+    parse_sample_rates,
+    stop_logging
+)
+
+
+def _record(name="core.middleware", level=logging.INFO, msg="Request started: %s %s", args=("GET", "/health")):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def restore_logging():
+    """Put back the application's logging configuration after the test"""
+    yield
+    stop_logging()
+    configure_logging()
+
+
+def test_json_formatter_includes_extra_fields():
+    """Test that messages are rendered with their extra= fields"""
+    record = _record()
+    record.status_code = 200
+    
+    payload = json.loads(JSONFormatter().format(record))
+    
+    assert payload["message"] == "Request started: GET /health"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "core.middleware"
+    assert payload["status_code"] == 200
+    assert "args" not in payload
+
+
+def test_queue_handler_defers_formatting_of_plain_args():
+    """Test that plain-value records are enqueued unformatted and others are rendered"""
+    log_queue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    
+    handler.handle(_record())
+    handler.handle(_record(msg="Options: %s", args=({"mode": "plain"},)))
+    deferred, rendered = log_queue.get(), log_queue.get()
+    
+    assert deferred.args == ("GET", "/health")
+    assert not hasattr(deferred, "message")
+    assert rendered.msg == "Options: {'mode': 'plain'}"
+    assert rendered.args is None
+
+
+def test_sampling_keeps_one_in_n_info_records():
+    """Test that sampled loggers keep every Nth INFO record and all warnings"""
+    sampler = SamplingFilter(parse_sample_rates("core=0.5, core.middleware=0.25"))
+    
+    kept = [sampler.filter(_record()) for _ in range(8)]
+    other = [sampler.filter(_record(name="core.admission")) for _ in range(4)]
+    
+    assert kept.count(True) == 2
+    assert other.count(True) == 2
+    assert sampler.filter(_record(level=logging.WARNING))
+    assert sampler.filter(_record(name="services.tts.service"))
+
+
+def test_sampling_counts_each_message_separately():
+    """Test that alternating lines from one logger are sampled independently"""
+    sampler = SamplingFilter({"core.middleware": 0.5})
+    
+    started = []
+    for _ in range(4):
+        started.append(sampler.filter(_record()))
+        sampler.filter(_record(msg="Request completed: %s %s"))
+    
+    assert started == [True, False, True, False]
+
+
+def test_configure_logging_writes_json_from_listener(restore_logging):
+    """Test that records logged through the root logger reach the stream as JSON"""
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+    
+    logging.getLogger("test.logging").info("Parsed %d pages", 3, extra={"file": "a.pdf"})
+    stop_logging()
+    
+    payload = json.loads(stream.getvalue().strip())
+    assert payload["message"] == "Parsed 3 pages"
+    assert payload["file"] == "a.pdf"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_child_gets_its_own_listener(restore_logging, tmp_path):
+    """Test that a child forked after configuration still writes its records"""
+    path = tmp_path / "log.jsonl"
+    with open(path, "w", buffering=1) as stream:
+        configure_logging(stream=stream)
+        
+        pid = os.fork()
+        if pid == 0:
+            logging.getLogger("worker").info("Worker %s started", 1)
+            stop_logging()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        stop_logging()
+    
+    messages = [json.loads(line)["message"] for line in path.read_text().splitlines()]
+    assert messages == ["Worker 1 started"]
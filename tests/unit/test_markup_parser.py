@@ -0,0 +1,114 @@
+"""Unit tests for HTML, Markdown and EPUB extraction"""
+import io
+import zipfile
+from src.core.exceptions import validate_file_type
+from src.utils import markup_parser
+from src.utils.file_parser import FileParser, SUPPORTED_EXTENSIONS
+from src.utils.markup_parser import iter_html_paragraphs, iter_markdown_paragraphs
+
+
+def build_epub(chapters):
+    """Build a minimal EPUB with one XHTML document per (title, paragraphs) chapter"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("mimetype", "application/epub+zip")
+        archive.writestr(
+            "META-INF/container.xml",
+            '<container xmlns="urn:oasis:names:tc:opendocument:xmlns:container" version="1.0">'
+            '<rootfiles><rootfile full-path="OEBPS/content.opf" '
+            'media-type="application/oebps-package+xml"/></rootfiles></container>'
+        )
+        # Manifest order is reversed so reading order must come from the spine
+        items = "".join(
+            f'<item id="c{i}" href="text/ch{i}.xhtml" media-type="application/xhtml+xml"/>'
+            for i in reversed(range(len(chapters)))
+        )
+        spine = "".join(f'<itemref idref="c{i}"/>' for i in range(len(chapters)))
+        archive.writestr(
+            "OEBPS/content.opf",
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0">'
+            f'<manifest>{items}</manifest><spine>{spine}</spine></package>'
+        )
+        for i, (title, paragraphs) in enumerate(chapters):
+            body = "".join(f"<p>{p}</p>" for p in paragraphs)
+            archive.writestr(
+                f"OEBPS/text/ch{i}.xhtml",
+                f"<html><head><title>ignored</title></head><body><h1>{title}</h1>{body}</body></html>"
+            )
+    buffer.seek(0)
+    return buffer
+
+
+def test_supported_types_match_parsers(client):
+    """Test upload validation accepts exactly the registered parsers and lists them"""
+    for extension in SUPPORTED_EXTENSIONS:
+        validate_file_type(f"upload.{extension}", SUPPORTED_EXTENSIONS)
+    
+    response = client.post("/simplify/file", files={"file": ("book.mobi", b"text", "application/octet-stream")})
+    
+    assert response.status_code == 415
+    assert response.json()["details"]["supported"] == list(SUPPORTED_EXTENSIONS)
+    assert "epub" in response.json()["message"]
+
+
+def test_html_paragraphs_streamed_across_chunks(monkeypatch):
+    """Test block elements split paragraphs and hidden content is skipped"""
+    monkeypatch.setattr(markup_parser, "READ_CHUNK_SIZE", 7)
+    html = (
+        "<html><head><style>p { color: red }</style></head><body>"
+        "<nav>Menu</nav><h1>Caf&eacute; guide</h1><p>First   line<br>second line.</p>"
+        "<script>var x = 1;</script><ul><li>One</li><li>Two</li></ul></body></html>"
+    )
+    
+    paragraphs = list(iter_html_paragraphs(io.BytesIO(html.encode("utf-8"))))
+    
+    assert paragraphs == ["Café guide", "First line", "second line.", "One", "Two"]
+
+
+def test_markdown_markup_stripped():
+    """Test Markdown syntax is removed while structure is kept"""
+    markdown = (
+        "---\ntitle: Notes\n---\n"
+        "# Week *one*\n\n"
+        "Read the [syllabus](http://example.com) and\nthe **notes**.\n\n"
+        "- First `item`\n- Second item\n\n"
+        "```\ncode line\n```\n"
+        "| A | B |\n|---|---|\n| 1 | 2 |\n"
+    )
+    
+    paragraphs = list(iter_markdown_paragraphs(io.BytesIO(markdown.encode("utf-8"))))
+    
+    assert paragraphs == [
+        "Week one",
+        "Read the syllabus and the notes.",
+        "- First item",
+        "- Second item",
+        "code line",
+        "A\tB",
+        "1\t2",
+    ]
+
+
+def test_epub_chapters_have_boundaries():
+    """Test EPUB chapters are read in spine order with their text ranges"""
+    epub = build_epub([("Chapter One", ["Alpha.", "Beta."]), ("Chapter Two", ["Gamma."])])
+    
+    document = FileParser.parse_document(epub, "book.epub")
+    
+    assert document.text == "Chapter One\n\nAlpha.\n\nBeta.\n\nChapter Two\n\nGamma."
+    titles = [c.title for c in document.chapters]
+    assert titles == ["Chapter One", "Chapter Two"]
+    second = document.chapters[1]
+    assert document.text[second.start:second.end] == "Chapter Two\n\nGamma."
+
+
+def test_epub_budget_clamps_chapters():
+    """Test chapters past the character budget are dropped"""
+    epub = build_epub([("One", ["x" * 50]), ("Two", ["y" * 50]), ("Three", ["z" * 50])])
+    
+    document = FileParser.parse_document(epub, "book.epub", max_chars=70)
+    
+    assert document.truncated
+    assert len(document.text) <= 70
+    assert [c.title for c in document.chapters] == ["One", "Two"]
+    assert document.chapters[-1].end == len(document.text)
@@ -0,0 +1,79 @@
+"""Unit tests for the metrics registry and /metrics endpoint"""
+import importlib
+
+import pytest
+
+from src.core.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that observations land in cumulative le buckets with sum and count"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", labels=("route",), buckets=(0.1, 1.0))
+    
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(3.0, route="/a")
+    text = registry.render()
+    
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{route="/a"} 3.55' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_counters_and_gauges_render_labels():
+    """Test counter increments, gauge updates and label escaping"""
+    registry = MetricsRegistry()
+    errors = registry.counter("errors_total", "Errors", labels=("model",))
+    in_flight = registry.gauge("in_flight", "In flight")
+    
+    errors.inc(model='gemini "flash"')
+    errors.inc(model='gemini "flash"')
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    text = registry.render()
+    
+    assert 'errors_total{model="gemini \\"flash\\""} 2' in text
+    assert "in_flight 1" in text
+
+
+def test_track_upstream_counts_failures():
+    """Test that failed upstream calls are timed and counted by error type"""
+    from src.core import metrics as metrics_module
+    
+    before = metrics_module.UPSTREAM_DURATION.count(model="test-model")
+    
+    with pytest.raises(TimeoutError):
+        with metrics_module.track_upstream("test-model"):
+            raise TimeoutError()
+    
+    assert metrics_module.UPSTREAM_DURATION.count(model="test-model") == before + 1
+    assert metrics_module.UPSTREAM_ERRORS.value(model="test-model", error="TimeoutError") >= 1
+
+
+def test_metrics_endpoint_reports_requests_and_process(client):
+    """Test that /metrics exposes route latency, caches and memory"""
+    client.get("/simplify/modes")
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'lexy_request_duration_seconds_count{method="GET",route="/simplify/modes",status="200"}' in response.text
+    assert "lexy_requests_in_flight 1" in response.text
+    assert 'lexy_cache_hit_ratio{cache="documents"}' in response.text
+    assert "lexy_process_resident_memory_bytes " in response.text
+
+
+def test_metrics_endpoint_reports_document_cache_bytes_saved(client, monkeypatch):
+    """Test that upload bytes saved by document cache hits are exported"""
+    document_cache = importlib.import_module("utils.document_cache").document_cache
+    monkeypatch.setattr(document_cache, "bytes_saved", 12345)
+    
+    response = client.get("/metrics")
+    
+    assert "# TYPE lexy_document_cache_bytes_saved_total counter" in response.text
+    assert "lexy_document_cache_bytes_saved_total 12345" in response.text
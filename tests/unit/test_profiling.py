@@ -0,0 +1,103 @@
+"""Unit tests for opt-in request profiling and the admin endpoints"""
+import importlib
+import pstats
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.profiling import ProfileRecord, ProfileStore, ProfilingMiddleware
+
+ADMIN_TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    """Configure an admin token for the application's settings"""
+    monkeypatch.setattr(importlib.import_module("core.config").settings, "admin_token", ADMIN_TOKEN)
+    return ADMIN_TOKEN
+
+
+@pytest.fixture
+def profiled():
+    """A small app behind the profiling middleware, and its profile store"""
+    store = ProfileStore(max_profiles=5)
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store)
+    
+    @app.get("/work")
+    def work():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"done": True}
+    
+    return TestClient(app), store
+
+
+def test_cprofile_mode_stores_pstats_profile(profiled, admin_token, tmp_path):
+    """Test that a profiled request returns a profile id and stores loadable stats"""
+    client, store = profiled
+    
+    response = client.get("/work", headers={"X-Admin-Token": admin_token, "X-Profile": "cprofile"})
+    
+    record = store.get(response.headers["x-profile-id"])
+    assert record.mode == "cprofile"
+    assert record.status_code == 200
+    
+    path = tmp_path / record.filename
+    path.write_bytes(record.data)
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_sample_mode_via_query_captures_worker_thread_stacks(profiled, admin_token):
+    """Test that the stack sampler sees handlers running in the threadpool"""
+    client, store = profiled
+    
+    response = client.get("/work?profile=sample", headers={"X-Admin-Token": admin_token})
+    
+    record = store.get(response.headers["x-profile-id"])
+    assert record.filename.endswith(".collapsed")
+    assert "work (test_profiling.py" in record.data.decode()
+
+
+def test_requests_without_valid_token_are_not_profiled(profiled, admin_token):
+    """Test that the profile flag is ignored without the admin token"""
+    client, store = profiled
+    
+    response = client.get("/work", headers={"X-Admin-Token": "wrong", "X-Profile": "cprofile"})
+    
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert store.list() == []
+
+
+def test_admin_profile_endpoints(client, admin_token):
+    """Test listing and downloading profiles, and rejecting missing tokens"""
+    app_store = importlib.import_module("core.profiling").profile_store
+    app_store.add(ProfileRecord(
+        id="test-1",
+        mode="sample",
+        method="POST",
+        path="/tts/generate",
+        status_code=200,
+        duration_ms=12.5,
+        created_at=time.time(),
+        filename="profile-test-1.collapsed",
+        content_type="text/plain; charset=utf-8",
+        data=b"main;work 3\n"
+    ))
+    headers = {"X-Admin-Token": admin_token}
+    
+    assert client.get("/admin/profiles").status_code == 403
+    
+    listing = client.get("/admin/profiles", headers=headers).json()["profiles"]
+    assert listing[0]["id"] == "test-1"
+    assert listing[0]["size_bytes"] == 12
+    
+    download = client.get("/admin/profiles/test-1", headers=headers)
+    assert download.content == b"main;work 3\n"
+    assert download.headers["content-disposition"] == 'attachment; filename="profile-test-1.collapsed"'
+    
+    assert client.get("/admin/profiles/missing", headers=headers).status_code == 404
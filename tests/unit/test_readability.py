@@ -0,0 +1,93 @@
+"""Unit tests for readability statistics and the fast-path gate"""
+import pytest
+from src.services.simplification.readability import (
+    meets_targets,
+    analyze_text,
+    count_syllables
+)
+from src.api.schemas import SimplificationIntensity, SimplificationOptions
+
+
+def test_plain_text_meets_targets():
+    """Test short plain UI strings pass the gate"""
+    assert meets_targets("Click the blue button.", 15)
+    assert meets_targets("Save your work. Then close the file.", 15)
+
+
+def test_long_sentence_fails():
+    """Test sentences over the limit fail the gate"""
+    text = "The cat sat on the mat and then it ran to the door and out into the big wide yard."
+    
+    assert not meets_targets(text, 10)
+    assert meets_targets(text, 25, SimplificationIntensity.LIGHT)
+
+
+def test_long_words_fail():
+    """Test a high share of long words fails the gate"""
+    text = "Comprehensive documentation facilitates understanding."
+    
+    assert not meets_targets(text, 15)
+
+
+def test_passive_voice_fails_when_active_voice_required():
+    """Test passive constructions fail unless active voice is disabled"""
+    text = "The form was signed by the team."
+    
+    assert not meets_targets(text, 15)
+    assert meets_targets(text, 15, options=SimplificationOptions(use_active_voice=False))
+
+
+def test_paragraph_sentence_limit():
+    """Test paragraphs with too many sentences fail the gate"""
+    text = "Go home. Eat food. Read a book. Go to bed."
+    
+    assert not meets_targets(text, 15)
+    assert meets_targets(text, 15, options=SimplificationOptions(paragraph_max_sentences=5))
+
+
+def test_analyze_text_counts():
+    """Test single-pass word, sentence and syllable counts"""
+    metrics = analyze_text('The cat sat. "Is it happy?" Yes, the family is happy')
+    
+    assert metrics.word_count == 11
+    assert metrics.sentence_count == 3
+    assert metrics.syllable_count == 15
+    assert metrics.long_word_count == 0
+    assert metrics.avg_sentence_length == pytest.approx(11 / 3)
+
+
+def test_analyze_text_grade_and_long_words():
+    """Test Flesch-Kincaid grade and long-word percentage"""
+    simple = analyze_text("The dog ran. The cat sat.")
+    complex_ = analyze_text("Comprehensive documentation facilitates organizational understanding.")
+    
+    assert simple.flesch_kincaid_grade < complex_.flesch_kincaid_grade
+    assert simple.long_word_percentage == 0.0
+    assert complex_.long_word_percentage == 100.0
+
+
+def test_analyze_text_very_long():
+    """Test counts stay exact when the text is too long to sum packed tallies"""
+    metrics = analyze_text("Information organization. " * 300_000)
+    
+    assert metrics.word_count == 600_000
+    assert metrics.sentence_count == 300_000
+    assert metrics.syllable_count == 2_700_000
+    assert metrics.long_word_count == 600_000
+
+
+def test_analyze_text_empty():
+    """Test empty text yields zero metrics"""
+    metrics = analyze_text("   ")
+    
+    assert metrics.word_count == 0
+    assert metrics.flesch_kincaid_grade == 0.0
+
+
+def test_count_syllables():
+    """Test syllable table and heuristic"""
+    assert count_syllables("cat") == 1
+    assert count_syllables("table") == 2
+    assert count_syllables("people") == 2
+    assert count_syllables("make") == 1
+    assert count_syllables("understanding") == 4
@@ -0,0 +1,102 @@
+"""Unit tests for the pre-fork production server"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+SERVER = Path(__file__).resolve().parents[2] / "src" / "server.py"
+MAIN = SERVER.with_name("main.py")
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(*args, script=SERVER, **env):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(script), "--host", "127.0.0.1", "--port", str(port), *args],
+        env={**os.environ, "GEMINI_API_KEY": "test", "UPSTREAM_BACKEND": "fake", "LOG_FORMAT": "text", **env},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def _wait_until_serving(process, url, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.poll() is None, process.stdout.read()
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise AssertionError("server did not start")
+
+
+def test_workers_are_recycled_reloaded_and_stopped():
+    """Test request-count recycling, SIGHUP reload and graceful SIGTERM shutdown"""
+    process, url = _start("--workers", "2", "--max-requests", "3", WARM_UP_ON_STARTUP="false")
+    try:
+        _wait_until_serving(process, url)
+        for _ in range(12):
+            response = httpx.get(f"{url}/health")
+            assert response.status_code == 200
+        
+        process.send_signal(signal.SIGHUP)
+        time.sleep(1.5)
+        _wait_until_serving(process, url)
+        
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=20)
+    finally:
+        if process.poll() is None:
+            process.kill()
+    
+    assert process.returncode == 0
+    assert "recycled" in output
+    assert "Reloading: replacing 2 workers" in output
+    assert "Server stopped" in output
+
+
+def test_master_exits_when_workers_cannot_start():
+    """Test that a failing application startup stops the master instead of looping"""
+    process, _ = _start("--workers", "2", UPSTREAM_BACKEND="unknown")
+    try:
+        output, _ = process.communicate(timeout=30)
+    finally:
+        if process.poll() is None:
+            process.kill()
+    
+    assert process.returncode == 3
+    assert "failed to start" in output
+
+
+def test_main_script_starts_the_server_with_the_shared_cache(tmp_path):
+    """Test that starting through src/main.py uses the cache path the server sets"""
+    process, url = _start("--workers", "1", script=MAIN, WARM_UP_ON_STARTUP="false", TMPDIR=str(tmp_path))
+    try:
+        _wait_until_serving(process, url)
+        response = httpx.post(f"{url}/simplify/text", json={"text": "A short sentence to simplify."}, timeout=20)
+        assert response.status_code == 200, response.text
+        metrics = httpx.get(f"{url}/metrics").text
+        process.send_signal(signal.SIGTERM)
+        process.communicate(timeout=20)
+    finally:
+        if process.poll() is None:
+            process.kill()
+    
+    assert 'cache="shared"' in metrics
+    assert list(tmp_path.glob("lexy-cache-*.sqlite3"))
@@ -0,0 +1,124 @@
+"""Unit tests for the host-wide shared cache"""
+import asyncio
+
+import pytest
+
+from src.utils.shared_cache import SharedCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared.sqlite3")
+
+
+def workers(path, count=2, **kwargs):
+    """Caches on one file, standing in for workers on one host"""
+    return [SharedCache(path, max_bytes=kwargs.pop("max_bytes", 1024 * 1024), **kwargs) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_values_set_by_one_worker_are_hits_for_another(path):
+    """Test that gets and sets go through the shared file"""
+    worker_a, worker_b = workers(path)
+    
+    await worker_a.set_many({"k1": "one", "k2": "two"})
+    
+    assert await worker_b.get_many(["k1", "k2", "k3"]) == {"k1": "one", "k2": "two"}
+    assert worker_b.stats()["hits"] == 2
+    assert worker_b.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_size_bound_evicts_least_recently_used(path):
+    """Test that the total size stays within the bound, dropping the oldest entries"""
+    cache, = workers(path, count=1, max_bytes=1000)
+    
+    for i in range(10):
+        await cache.set(f"key{i}", str(i) * 200)
+    
+    found = await cache.get_many([f"key{i}" for i in range(10)])
+    assert sum(len(value) for value in found.values()) <= 1000
+    assert set(found) == {"key5", "key6", "key7", "key8", "key9"}
+
+
+@pytest.mark.asyncio
+async def test_only_missing_keys_are_computed(path):
+    """Test that get_or_compute_many passes just the misses to compute"""
+    cache, = workers(path, count=1)
+    await cache.set("b", "cached b")
+    computed = []
+    
+    async def compute(positions):
+        computed.append(positions)
+        return [f"computed {p}" for p in positions]
+    
+    values = await cache.get_or_compute_many(["a", "b", "c"], compute)
+    
+    assert values == ["computed 0", "cached b", "computed 2"]
+    assert computed == [[0, 2]]
+    assert await cache.get_or_compute_many(["a", "c"], compute) == ["computed 0", "computed 2"]
+    assert len(computed) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_computed_once(path):
+    """Test stampede protection: other workers wait for the one holding the lease"""
+    caches = workers(path, count=4)
+    calls = 0
+    
+    async def compute(positions):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return ["expensive"]
+    
+    values = await asyncio.gather(*(cache.get_or_compute_many(["k"], compute) for cache in caches))
+    
+    assert values == [["expensive"]] * 4
+    assert calls == 1
+    assert sum(cache.stats()["waits"] for cache in caches) == 3
+
+
+@pytest.mark.asyncio
+async def test_waiters_compute_themselves_when_the_holder_fails(path):
+    """Test that a failed computation releases its lease instead of blocking others"""
+    holder, waiter = workers(path)
+    computing = asyncio.Event()
+    fail = asyncio.Event()
+    
+    async def failing(positions):
+        computing.set()
+        await fail.wait()
+        raise RuntimeError("upstream error")
+    
+    async def working(positions):
+        return ["recovered"]
+    
+    # The holder takes the lease before the waiter starts
+    holding = asyncio.create_task(holder.get_or_compute_many(["k"], failing))
+    await asyncio.wait_for(computing.wait(), timeout=5)
+    waiting = asyncio.create_task(waiter.get_or_compute_many(["k"], working))
+    
+    async def waiter_blocked():
+        while not waiter.waits:
+            await asyncio.sleep(0.01)
+    
+    await asyncio.wait_for(waiter_blocked(), timeout=5)
+    fail.set()
+    
+    with pytest.raises(RuntimeError):
+        await holding
+    assert await asyncio.wait_for(waiting, timeout=5) == ["recovered"]
+    assert waiter.waits == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_computes():
+    """Test that without a path every value is computed and nothing is stored"""
+    cache = SharedCache(None, max_bytes=1024)
+    
+    async def compute(positions):
+        return ["value"] * len(positions)
+    
+    assert await cache.get_or_compute_many(["a", "b"], compute) == ["value", "value"]
+    assert await cache.get("a") is None
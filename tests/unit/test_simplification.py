@@ -1,8 +1,15 @@
 """Unit tests for SimplificationService"""
+import asyncio
+import importlib
+import io
+import threading
 import pytest
 from src.services.simplification import SimplificationService
+from src.services.simplification import service as service_module
 from src.api.schemas import SimplificationMode, SimplificationIntensity
 from src.core.exceptions import ValidationException
+from src.utils import file_parser
+from src.utils.file_parser import FileParser, ParsedDocument
 
 
 @pytest.mark.asyncio
@@ -71,3 +78,140 @@ def test_calculate_statistics(sample_text):
     assert stats.simplified_word_count > 0
     assert stats.original_avg_sentence_length > 0
     assert stats.simplified_avg_sentence_length > 0
+
+
+@pytest.mark.asyncio
+async def test_simplify_skips_upstream_for_simple_text():
+    """Test text that already meets the targets is returned unchanged"""
+    service = SimplificationService()
+    
+    simplified, stats, time_ms = await service.simplify_text(
+        text="Click the blue button.",
+        mode=SimplificationMode.GENERAL,
+        intensity=SimplificationIntensity.MEDIUM
+    )
+    
+    assert simplified == "Click the blue button."
+    assert stats.already_simple
+    assert service._client is None
+
+
+@pytest.mark.asyncio
+async def test_resubmitted_document_only_sends_changed_paragraphs():
+    """Test paragraph caching makes an edited resubmission cost one call"""
+    service = SimplificationService()
+    calls = []
+    
+    async def fake_generate(contents, input_tokens, system_prompt):
+        calls.append(contents)
+        separator = "\n\n" if "<<<P1>>>" in contents else "\n"
+        body = contents.split(separator, 1)[1]
+        return body.replace("Consequently", "So")
+    
+    service._generate = fake_generate
+    paragraphs = [
+        f"Consequently paragraph {i} explains the considerably complicated "
+        f"administrative arrangements that were established previously."
+        for i in range(30)
+    ]
+    
+    first, _, _ = await service.simplify_text(text="\n\n".join(paragraphs))
+    assert len(calls) == 1
+    assert first.split("\n\n")[0].startswith("So paragraph 0")
+    
+    paragraphs[12] = paragraphs[12].replace("explains", "describes")
+    second, _, _ = await service.simplify_text(text="\n\n".join(paragraphs))
+    
+    assert len(calls) == 2
+    assert "<<<P1>>>" not in calls[1]
+    assert "describes" in calls[1]
+    assert second.split("\n\n")[12].startswith("So paragraph 12 describes")
+    assert second.split("\n\n")[13] == first.split("\n\n")[13]
+
+
+@pytest.mark.asyncio
+async def test_simplify_stream_starts_before_extraction_finishes(monkeypatch):
+    """Test the first batch goes upstream while later pages are still pending"""
+    service = SimplificationService()
+    first_batch_sent = asyncio.Event()
+    
+    async def fake_batch(paragraphs, system_prompt):
+        first_batch_sent.set()
+        return [p.upper() for p in paragraphs]
+    
+    service._simplify_batch = fake_batch
+    monkeypatch.setattr(service_module.token_estimator, "max_chunk_tokens", lambda *args: 20)
+    page = (
+        "Consequently the committee established considerably complicated "
+        "administrative arrangements for the organization."
+    )
+    
+    async def pages():
+        yield page
+        # Deadlocks unless the first page was sent upstream already
+        await asyncio.wait_for(first_batch_sent.wait(), timeout=1)
+        yield page.replace("committee", "board")
+    
+    original, simplified, stats, _ = await service.simplify_stream(pages())
+    
+    assert original == f"{page}\n\n{page.replace('committee', 'board')}"
+    assert simplified == original.upper()
+    assert not stats.already_simple
+
+
+@pytest.mark.asyncio
+async def test_first_upstream_call_starts_before_last_page_is_extracted(make_pdf, monkeypatch):
+    """Test a PDF's first pages go upstream while its last range is still being extracted"""
+    monkeypatch.setattr(file_parser.settings, "parser_workers", 2)
+    monkeypatch.setattr(file_parser.settings, "parser_pages_per_task", 25)
+    service = SimplificationService()
+    upstream_started = threading.Event()
+    started_before_last_range = []
+    
+    async def fake_batch(paragraphs, system_prompt):
+        upstream_started.set()
+        return paragraphs
+    
+    service._simplify_batch = fake_batch
+    extract = file_parser._extract_pdf_pages
+    
+    def extract_last_range_slowly(data, indices, max_chars=None):
+        if indices[-1] == 11:
+            started_before_last_range.append(upstream_started.wait(timeout=5))
+        return extract(data, indices, max_chars)
+    
+    monkeypatch.setattr(file_parser, "_extract_pdf_pages", extract_last_range_slowly)
+    pages = [
+        f"Page {i}. " + "Consequently the committee established considerably complicated "
+        "administrative arrangements for the organization. " * 20
+        for i in range(12)
+    ]
+    
+    parts = FileParser._iter_pdf_parallel(io.BytesIO(make_pdf(pages)), None, ParsedDocument(text=""))
+    original, _, _, _ = await service.simplify_stream(parts)
+    
+    assert started_before_last_range == [True]
+    assert original.count("Page ") == 12
+
+
+@pytest.mark.asyncio
+async def test_simplify_stream_rejects_empty_document():
+    """Test a document without text is rejected without any upstream call"""
+    service = SimplificationService()
+    calls = []
+    
+    async def fake_batch(paragraphs, system_prompt):
+        calls.append(paragraphs)
+        return paragraphs
+    
+    service._simplify_batch = fake_batch
+    
+    async def pages():
+        yield "   "
+        yield "\n\n"
+    
+    # The service raises the app's copy of the exception class
+    app_validation_exception = importlib.import_module("core.exceptions").ValidationException
+    with pytest.raises(app_validation_exception, match="empty"):
+        await service.simplify_stream(pages())
+    assert calls == []
@@ -0,0 +1,60 @@
+"""Unit tests for extracted text normalization"""
+from src.utils.text_normalizer import normalize_pages, reflow
+
+
+def make_page(number, body):
+    return f"Annual Report 2024\n{body}\nConfidential - Page {number}\n{number}"
+
+
+def test_repeated_headers_and_footers_stripped():
+    """Test running headers, footers and page numbers are removed"""
+    bodies = ["Alpha section.", "Beta section.", "Gamma section.", "Delta section.", "Omega section."]
+    pages = [make_page(i, body) for i, body in enumerate(bodies, start=1)]
+    
+    result = normalize_pages(pages)
+    
+    assert result.pages == bodies
+    assert result.chars_removed == sum(len(p) for p in pages) - sum(len(p) for p in result.pages)
+
+
+def test_headers_kept_on_too_few_pages():
+    """Test lines are not treated as headers with fewer than three pages"""
+    result = normalize_pages(["Title\nFirst.", "Title\nSecond."])
+    
+    assert result.pages == ["Title First.", "Title Second."]
+
+
+def test_dehyphenation_and_whitespace():
+    """Test hyphenated line breaks are joined and space runs collapsed"""
+    result = normalize_pages(["The infor-\nmation   was  well-\nKnown here."], strip_repeated=False)
+    
+    assert result.pages == ["The information was well- Known here."]
+
+
+def test_reflow_keeps_paragraph_and_list_breaks():
+    """Test hard wraps are joined while paragraph ends and list items stay"""
+    lines = [
+        "This is a long hard-wrapped line of text that",
+        "continues on the next line of the page here.",
+        "Short end.",
+        "A new paragraph starts with another long line",
+        "- first item",
+        "- second item",
+    ]
+    
+    assert reflow(lines) == (
+        "This is a long hard-wrapped line of text that continues on the next line of the page here. "
+        "Short end.\n\nA new paragraph starts with another long line\n\n- first item\n\n- second item"
+    )
+
+
+def test_short_headings_are_not_page_numbers():
+    """Test headings spelled with roman numeral letters survive while page numbers go"""
+    for heading in ["Mix", "I", "CD", "DC", "Vi", "Page"]:
+        result = normalize_pages([f"{heading}\nBlend the flour and the sugar."])
+        
+        assert result.pages[0].startswith(f"{heading} "), heading
+    
+    result = normalize_pages(["xiv\nPreface text here.\nPage IV"])
+    
+    assert result.pages == ["Preface text here."]
@@ -0,0 +1,42 @@
+"""Unit tests for request timing spans and the Server-Timing header"""
+import asyncio
+
+from src.core.timing import record, request_timings, span
+
+
+async def test_spans_accumulate_across_tasks():
+    """Test that spans from child tasks add up under one name with a call count"""
+    async def upstream_call():
+        with span("upstream"):
+            await asyncio.sleep(0)
+    
+    with request_timings() as timings:
+        await asyncio.gather(upstream_call(), upstream_call(), upstream_call())
+        record("parse", 12.0)
+    
+    header = timings.server_timing(total_ms=20.0)
+    
+    assert timings.counts == {"upstream": 3, "parse": 1}
+    assert 'upstream;desc="3 calls";dur=' in header
+    assert "parse;dur=12.0" in header
+    assert header.endswith("total;dur=20.0")
+
+
+def test_record_outside_request_is_ignored():
+    """Test that spans recorded with no request in progress are dropped"""
+    record("parse", 5.0)
+    
+    with request_timings() as timings:
+        pass
+    
+    assert timings.spans == {}
+
+
+def test_response_carries_server_timing(client):
+    """Test that route responses report serialization and total time"""
+    response = client.get("/simplify/modes")
+    
+    assert response.status_code == 200
+    assert "serialize;dur=" in response.headers["server-timing"]
+    assert "total;dur=" in response.headers["server-timing"]
+    assert response.headers["x-process-time"].endswith("ms")
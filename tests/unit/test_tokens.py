@@ -0,0 +1,82 @@
+"""Unit tests for token estimation and chunk planning"""
+from types import SimpleNamespace
+
+import pytest
+from src.utils import tokens
+from src.utils.tokens import TokenEstimator, check_input_tokens, get_model_limits
+
+
+def test_estimate_scales_with_length():
+    """Test that estimates grow with input size"""
+    estimator = TokenEstimator()
+    
+    assert estimator.estimate("") == 0
+    assert estimator.estimate("Hi") == 1
+    assert estimator.estimate("word " * 1000) == pytest.approx(1250, rel=0.01)
+
+
+def test_record_calibrates_ratio():
+    """Test that recorded upstream counts move the estimate"""
+    estimator = TokenEstimator()
+    text = "a" * 8000
+    
+    before = estimator.estimate(text)
+    estimator.record(text, 4000)
+    after = estimator.estimate(text)
+    
+    assert before == 2000
+    assert after > before
+    assert estimator.calibration_table()["ascii"] < 4.0
+
+
+def test_output_budget_is_capped():
+    """Test output budget is proportional but capped at the model limit"""
+    estimator = TokenEstimator()
+    model = "gemini-2.0-flash-lite"
+    
+    assert estimator.output_budget(100, model, ratio=1.5, overhead=256) == 406
+    assert estimator.output_budget(100000, model, ratio=1.5) == get_model_limits(model).output_tokens
+
+
+def test_plan_chunks_respects_budget():
+    """Test chunks stay within the token budget and keep order"""
+    estimator = TokenEstimator()
+    paragraphs = [f"Paragraph {i} " + "word " * 100 for i in range(20)]
+    text = "\n\n".join(paragraphs)
+    
+    chunks = estimator.plan_chunks(text, max_tokens=300)
+    
+    assert len(chunks) > 1
+    assert all(estimator.estimate(chunk) <= 300 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_plan_chunks_splits_long_paragraph():
+    """Test an oversize paragraph is split on sentences"""
+    estimator = TokenEstimator()
+    text = " ".join(["This is a sentence with several words."] * 200)
+    
+    chunks = estimator.plan_chunks(text, max_tokens=100)
+    
+    assert len(chunks) > 1
+    assert all(estimator.estimate(chunk) <= 100 for chunk in chunks)
+
+
+async def test_client_requested_only_for_near_limit_counts(monkeypatch):
+    """Test that the upstream client is created only when an estimate needs confirming"""
+    monkeypatch.setattr(tokens.settings, "verify_token_counts", True)
+    monkeypatch.setattr(tokens, "token_estimator", TokenEstimator())
+    requested = []
+    
+    async def count_tokens(model, contents):
+        return SimpleNamespace(total_tokens=900)
+    
+    def get_client():
+        requested.append(True)
+        return SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(count_tokens=count_tokens)))
+    
+    await check_input_tokens("A short request.", get_client, "model", max_tokens=1000)
+    assert requested == []
+    
+    assert await check_input_tokens("word " * 1000, get_client, "model", max_tokens=1000) == 900
+    assert requested == [True]
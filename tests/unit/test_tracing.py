@@ -0,0 +1,114 @@
+"""Unit tests for request tracing and trace export"""
+import importlib
+import json
+
+from src.core.tracing import TraceExporter, Tracer, trace_span, traced
+
+
+class CollectingExporter:
+    """Keeps exported traces in memory"""
+    
+    def __init__(self):
+        self.traces = []
+    
+    def export(self, spans):
+        self.traces.append(spans)
+
+
+def test_spans_nest_under_the_request_and_unsampled_fast_traces_are_dropped():
+    """Test parent links across sync and async spans, and the keep decision"""
+    exporter = CollectingExporter()
+    tracer = Tracer(exporter, sample_rate=1.0)
+    
+    @traced("timestamps")
+    def timestamps():
+        with trace_span("inner", words=3):
+            pass
+    
+    with tracer.trace("POST /tts/simplify") as root:
+        with trace_span("tts.generate_speech") as child:
+            timestamps()
+    
+    spans = {span.name: span for span in exporter.traces[0]}
+    assert spans["tts.generate_speech"].parent_id == root.span_id
+    assert spans["timestamps"].parent_id == child.span_id
+    assert spans["inner"].attributes == {"words": 3}
+    assert all(span.end_ns is not None for span in spans.values())
+    
+    unsampled = Tracer(CollectingExporter(), sample_rate=0.0, slow_ms=10_000)
+    with unsampled.trace("GET /health"):
+        pass
+    assert unsampled.exporter.traces == []
+
+
+async def test_slow_and_failed_traces_are_always_kept():
+    """Test tail sampling of slow requests and requests with errors"""
+    slow = Tracer(CollectingExporter(), sample_rate=0.0, slow_ms=0)
+    with slow.trace("GET /slow"):
+        pass
+    
+    failed = Tracer(CollectingExporter(), sample_rate=0.0, slow_ms=10_000)
+    
+    @traced("upstream")
+    async def upstream():
+        raise TimeoutError("deadline")
+    
+    with failed.trace("POST /simplify/text"):
+        try:
+            await upstream()
+        except TimeoutError:
+            pass
+    
+    assert len(slow.exporter.traces) == 1
+    (error_span,) = [span for span in failed.exporter.traces[0] if span.name == "upstream"]
+    assert error_span.error == "TimeoutError: deadline"
+
+
+def test_incoming_traceparent_is_continued():
+    """Test that a sampled W3C traceparent sets the trace id and parent"""
+    tracer = Tracer(CollectingExporter(), sample_rate=0.0)
+    traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    
+    with tracer.trace("GET /", traceparent) as root:
+        pass
+    
+    assert root.trace.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert root.parent_id == "00f067aa0ba902b7"
+    assert len(tracer.exporter.traces) == 1
+
+
+def test_exporter_writes_otlp_json_lines(tmp_path):
+    """Test that each kept trace is one OTLP/JSON export request per line"""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(TraceExporter(str(path)), sample_rate=1.0)
+    
+    for _ in range(2):
+        with tracer.trace("GET /health", **{"http.route": "/health"}):
+            with trace_span("parse"):
+                pass
+    tracer.shutdown()
+    
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    
+    scope_spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]
+    root, child = sorted(scope_spans["spans"], key=lambda span: span["parentSpanId"] != "")
+    assert child["parentSpanId"] == root["spanId"]
+    assert root["kind"] == 2
+    assert root["attributes"] == [{"key": "http.route", "value": {"stringValue": "/health"}}]
+    assert int(root["endTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+
+
+def test_requests_are_traced_by_route(client, monkeypatch):
+    """Test that the middleware records a root span named by route template"""
+    app_tracer = importlib.import_module("core.tracing").tracer
+    exporter = CollectingExporter()
+    monkeypatch.setattr(app_tracer, "exporter", exporter)
+    monkeypatch.setattr(app_tracer, "sample_rate", 1.0)
+    
+    response = client.get("/simplify/modes")
+    
+    assert response.status_code == 200
+    root = exporter.traces[0][0]
+    assert root.name == "GET /simplify/modes"
+    assert root.attributes["http.response.status_code"] == 200
@@ -0,0 +1,93 @@
+"""Unit tests for upload validation"""
+import io
+import pytest
+from starlette.datastructures import UploadFile
+from src.main import app
+from src.utils import validators
+from src.utils.validators import validate_uploaded_file, parse_page_ranges
+
+
+@pytest.fixture
+def small_limit(monkeypatch):
+    """Limit uploads to 1000 bytes, spooling to disk above 100 bytes"""
+    monkeypatch.setattr(validators.settings, "max_file_size_mb", 1000 / (1024 * 1024))
+    monkeypatch.setattr(validators.settings, "upload_spool_max_bytes", 100)
+
+
+@pytest.mark.asyncio
+async def test_upload_is_spooled(small_limit):
+    """Test uploads are copied into a spooled file that rolls over to disk"""
+    upload = UploadFile(file=io.BytesIO(b"x" * 500), filename="notes.txt")
+    
+    with await validate_uploaded_file(upload) as spooled:
+        assert spooled._rolled
+        assert spooled.read() == b"x" * 500
+
+
+@pytest.mark.asyncio
+async def test_oversize_upload_rejected_while_reading(small_limit):
+    """Test the limit is enforced on bytes read when no size is declared"""
+    upload = UploadFile(file=io.BytesIO(b"x" * 200_000), filename="notes.txt")
+    
+    with pytest.raises(Exception) as exc_info:
+        await validate_uploaded_file(upload)
+    
+    assert exc_info.value.status_code == 413
+    assert upload.file.tell() <= validators.UPLOAD_CHUNK_SIZE
+
+
+def test_oversize_declared_body_rejected_early(client, small_limit):
+    """Test multipart requests over the limit are refused before parsing"""
+    response = client.post(
+        "/simplify/file",
+        files={"file": ("notes.txt", b"x" * 100_000, "text/plain")}
+    )
+    
+    assert response.status_code == 413
+    assert response.json()["error"] == "FileSizeException"
+
+
+@pytest.mark.asyncio
+async def test_oversize_chunked_body_rejected_while_arriving(small_limit):
+    """Test a multipart body without Content-Length is refused once it passes the limit"""
+    chunks = [b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"notes.txt\"\r\n\r\n"]
+    chunks += [b"x" * 10_000] * 20
+    sent = []
+    
+    async def receive():
+        if not chunks:
+            return {"type": "http.disconnect"}
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+    
+    async def send(message):
+        sent.append(message)
+    
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/simplify/file", "raw_path": b"/simplify/file", "query_string": b"",
+        "root_path": "", "headers": [(b"content-type", b"multipart/form-data; boundary=b")],
+        "client": ("127.0.0.1", 1), "server": ("testserver", 80)
+    }
+    await app(scope, receive, send)
+    
+    starts = [message for message in sent if message["type"] == "http.response.start"]
+    assert [message["status"] for message in starts] == [413]
+    assert len(chunks) >= 10  # Stopped reading well before the end
+    assert b"FileSizeException" in b"".join(message.get("body", b"") for message in sent)
+
+
+def test_parse_page_ranges():
+    """Test page selections are converted to sorted zero-based indices"""
+    assert parse_page_ranges("3, 1-2,2") == [0, 1, 2]
+    assert parse_page_ranges(None) is None
+    assert parse_page_ranges("  ") is None
+
+
+@pytest.mark.parametrize("spec", ["a-b", "0", "5-2", "1,,2"])
+def test_parse_page_ranges_invalid(spec):
+    """Test malformed page selections are rejected"""
+    with pytest.raises(Exception) as exc_info:
+        parse_page_ranges(spec)
+    
+    assert exc_info.value.status_code == 400